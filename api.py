@@ -0,0 +1,353 @@
+"""Headless HTTP/JSON API for the cost model and the simulation.
+
+Stdlib-only asyncio server. Concurrent ``/costs`` requests are coalesced
+into one vectorized engine call per batch (flushed after ``max_delay`` or
+at ``max_batch`` requests), and results are kept in an in-process LRU.
+
+    python api.py serve --port 8000
+    python api.py loadtest --port 8000 --concurrency 64 --requests 50000
+
+Endpoints (JSON bodies use the sidebar input names, see ``batch.INPUT_COLUMNS``):
+
+    POST /costs      one site  -> {"no_fc": {...}, "with_fc": {...}, "annual_savings": ...}
+    POST /simulate   one site + optional "paths", "seed", "granularity", "sampling" -> Monte Carlo summary
+    GET  /health
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+
+import numpy as np
+
+import engine
+import simulation
+from batch import INPUT_COLUMNS
+
+DEFAULT_MAX_BATCH = 4096
+DEFAULT_MAX_DELAY = 0.002
+DEFAULT_CACHE_SIZE = 100_000
+# Fewer paths leave the standard error undefined for some samplings.
+MIN_SIMULATION_PATHS = 100
+MAX_SIMULATION_PATHS = 1_000_000
+# Inputs whose sidebar minimum is above zero; the others may be zero.
+POSITIVE_INPUTS = (
+    "units_per_week", "units_per_worker_per_week", "hourly_rate", "hours_per_week", "overtime_multiplier",
+)
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class _LRU(OrderedDict):
+    def __init__(self, maxsize):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def put(self, key, value):
+        self[key] = value
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+def parse_inputs(payload) -> tuple:
+    """Sidebar inputs from a request body, as a hashable tuple of floats."""
+    if not isinstance(payload, dict):
+        raise BadRequest("Request body must be a JSON object")
+    missing = [c for c in INPUT_COLUMNS if c not in payload]
+    if missing:
+        raise BadRequest(f"Missing fields: {', '.join(missing)}")
+    try:
+        inputs = tuple(float(payload[c]) for c in INPUT_COLUMNS)
+    except (TypeError, ValueError) as exc:
+        raise BadRequest(f"Inputs must be numbers: {exc}") from None
+    for column, value in zip(INPUT_COLUMNS, inputs):
+        if not math.isfinite(value) or value < 0 or (value == 0 and column in POSITIVE_INPUTS):
+            bound = "positive" if column in POSITIVE_INPUTS else "non-negative"
+            raise BadRequest(f"{column} must be a finite, {bound} number")
+    return inputs
+
+
+def _choice(payload, field, default, options):
+    value = payload.get(field, default)
+    if not isinstance(value, str) or value not in options:
+        raise BadRequest(f"{field} must be one of {', '.join(options)}")
+    return value
+
+
+def cost_many(rows) -> list:
+    """Cost both scenarios for a list of input tuples in one engine call each."""
+    (
+        units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+        overtime_multiplier, misalloc_no_fc, misalloc_with_fc, sla_penalty_per_miss,
+    ) = np.array(rows, dtype=float).T
+    common = (units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week, overtime_multiplier)
+    no_fc = engine.scenario_costs(*common, misalloc_no_fc, sla_penalty_per_miss)
+    with_fc = engine.scenario_costs(*common, misalloc_with_fc, sla_penalty_per_miss)
+    savings = (no_fc["annual_total"] - with_fc["annual_total"]).tolist()
+
+    no_fc_cols = [no_fc[f].tolist() for f in engine.COST_FIELDS]
+    with_fc_cols = [with_fc[f].tolist() for f in engine.COST_FIELDS]
+    return [
+        {
+            "no_fc": dict(zip(engine.COST_FIELDS, no_fc_row)),
+            "with_fc": dict(zip(engine.COST_FIELDS, with_fc_row)),
+            "annual_savings": s,
+        }
+        for no_fc_row, with_fc_row, s in zip(zip(*no_fc_cols), zip(*with_fc_cols), savings)
+    ]
+
+
+class CostBatcher:
+    """Coalesces concurrent cost requests into vectorized engine calls."""
+
+    def __init__(self, max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY, cache_size=DEFAULT_CACHE_SIZE):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.cache = _LRU(cache_size)
+        self._pending = []
+        self._timer = None
+
+    async def costs(self, inputs: tuple) -> dict:
+        cached = self.cache.get(inputs)
+        if cached is not None:
+            return cached
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((inputs, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self.flush)
+        return await future
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            results = cost_many([inputs for inputs, _ in pending])
+        except Exception as exc:  # pragma: no cover - surfaced to every waiter
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (inputs, future), result in zip(pending, results):
+            self.cache.put(inputs, result)
+            if not future.done():
+                future.set_result(result)
+
+
+class Server:
+    def __init__(self, batcher=None, cache_size=1_024):
+        self.batcher = batcher or CostBatcher()
+        self.simulations = _LRU(cache_size)
+
+    async def simulate(self, payload) -> dict:
+        inputs = parse_inputs(payload)
+        n_paths = payload.get("paths", 10_000)
+        seed = payload.get("seed", simulation.SEED)
+        granularity = _choice(payload, "granularity", "weekly", simulation.GRANULARITIES)
+        sampling = _choice(payload, "sampling", "independent", simulation.SAMPLINGS)
+        # bool is an int subclass, but true/false is no count or seed.
+        if type(n_paths) is not int or not MIN_SIMULATION_PATHS <= n_paths <= MAX_SIMULATION_PATHS:
+            raise BadRequest(
+                f"paths must be an integer between {MIN_SIMULATION_PATHS} and {MAX_SIMULATION_PATHS:,}"
+            )
+        if seed is not None and (type(seed) is not int or seed < 0):
+            raise BadRequest("seed must be a non-negative integer or null")
+
+        key = (inputs, n_paths, seed, granularity, sampling)
+        cached = self.simulations.get(key) if seed is not None else None
+        if cached is not None:
+            return cached
+        mc = await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: simulation.monte_carlo(
+                *inputs, n_paths=n_paths, seed=seed, granularity=granularity, sampling=sampling,
+            ),
+        )
+        result = {
+            "paths": n_paths,
+            "seed": mc["seed"],
+            "granularity": granularity,
+            "sampling": sampling,
+            "no_fc": simulation.expected_costs(mc, "no_fc"),
+            "with_fc": simulation.expected_costs(mc, "with_fc"),
+            "annual_savings": simulation.summarize(mc["annual_savings"], mc["replicate_paths"]),
+        }
+        if seed is not None:
+            self.simulations.put(key, result)
+        return result
+
+    async def dispatch(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return HTTPStatus.OK, {"status": "ok"}
+        if method != "POST" or path not in ("/costs", "/simulate"):
+            return HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {path}"}
+        try:
+            payload = json.loads(body or b"null")
+            if path == "/costs":
+                return HTTPStatus.OK, await self.batcher.costs(parse_inputs(payload))
+            return HTTPStatus.OK, await self.simulate(payload)
+        except json.JSONDecodeError as exc:
+            return HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON: {exc}"}
+        except (ValueError, TypeError) as exc:
+            # BadRequest, or inputs the checks above let through but the model rejects.
+            return HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one keep-alive connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self.dispatch(method, path, body)
+                try:
+                    # Strict JSON: no NaN or Infinity tokens.
+                    data = json.dumps(payload, allow_nan=False).encode()
+                except ValueError:
+                    status = HTTPStatus.INTERNAL_SERVER_ERROR
+                    data = json.dumps({"error": "Result is not a finite number"}).encode()
+                writer.write(
+                    b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                    % (status.value, status.phrase.encode(), len(data))
+                    + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+# ---------------------------------------------------------------------------
+# Load generator
+# ---------------------------------------------------------------------------
+def _random_site(rng) -> dict:
+    return {
+        "units_per_week": rng.randrange(1_000, 500_001, 1_000),
+        "units_per_worker_per_week": rng.randrange(100, 5_001, 50),
+        "hourly_rate": rng.randrange(10, 101) / 2,
+        "hours_per_week": rng.randrange(20, 61),
+        "overtime_multiplier": rng.randrange(20, 61) / 20,
+        "misallocation_no_forecast": rng.randrange(10, 51),
+        "misallocation_with_forecast": rng.randrange(0, 21),
+        "sla_penalty_per_miss": rng.randrange(0, 50_001, 100),
+    }
+
+
+async def _client(host, port, bodies, n_requests, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(n_requests):
+            body = bodies[i % len(bodies)]
+            start = time.perf_counter()
+            writer.write(
+                b"POST /costs HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                % (host.encode(), len(body))
+                + body
+            )
+            await writer.drain()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def load_test(host, port, concurrency, n_requests, distinct, seed=0) -> dict:
+    """Fire ``n_requests`` at ``/costs`` over ``concurrency`` keep-alive connections.
+
+    Bodies are drawn from ``distinct`` random sites, so the share of cache
+    hits can be tuned.
+    """
+    rng = random.Random(seed)
+    sites = [json.dumps(_random_site(rng)).encode() for _ in range(distinct)]
+    per_client = -(-n_requests // concurrency)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, rng.sample(sites, len(sites)), per_client, latencies)
+        for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1_000
+    return {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "latency_ms_p50": p50,
+        "latency_ms_p99": p99,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Staffing cost API.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="run the API server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    serve.add_argument("--max-delay-ms", type=float, default=DEFAULT_MAX_DELAY * 1_000)
+    serve.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+
+    load = sub.add_parser("loadtest", help="hammer a running server's /costs endpoint")
+    load.add_argument("--host", default="127.0.0.1")
+    load.add_argument("--port", type=int, default=8000)
+    load.add_argument("--concurrency", type=int, default=64)
+    load.add_argument("--requests", type=int, default=50_000)
+    load.add_argument("--distinct", type=int, default=10_000, help="distinct request bodies")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        batcher = CostBatcher(args.max_batch, args.max_delay_ms / 1_000, args.cache_size)
+        print(f"Serving on http://{args.host}:{args.port}")
+        asyncio.run(Server(batcher).serve(args.host, args.port))
+    else:
+        report = asyncio.run(load_test(args.host, args.port, args.concurrency, args.requests, args.distinct))
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,24 @@
+import io
+import os
+import tempfile
+from pathlib import Path
+
 import streamlit as st
 import numpy as np
-import plotly.graph_objects as go
+
+import backtest
+import batch
+import charts
+import demand
+import engine
+import profiling
+import simulation
+import solver
+import streaming
+import surface
+import workspace
+from assets import CSS, TRANSLATIONS
+from charts import GREEN, RED
 
 # ---------------------------------------------------------------------------
 # Page config & constants
@@ -11,224 +29,67 @@ st.set_page_config(
     layout="wide",
 )
 
-RED = "#E74C3C"
-RED_LIGHT = "rgba(231,76,60,0.12)"
-GREEN = "#27AE60"
-GREEN_LIGHT = "rgba(39,174,96,0.12)"
-GREY = "#95A5A6"
-
-# ---------------------------------------------------------------------------
-# Translations
-# ---------------------------------------------------------------------------
-TRANSLATIONS = {
-    "es": {
-        "lang_label": "🌐 Idioma / Language",
-        "page_title": "📦 ¿Cuánto te cuesta una mala planificación de personal?",
-        "page_subtitle": (
-            "Ajusta los números en la barra lateral para que coincidan con tu operación. "
-            "Descubre exactamente cuánto dinero pierdes sin un pronóstico de demanda — "
-            "y cuánto ahorras con uno."
-        ),
-        "sidebar_warehouse": "Tu Almacén",
-        "units_per_week": "Unidades movidas por semana",
-        "units_per_week_help": "Total de unidades (picks, packs, envíos) que tu almacén maneja semanalmente.",
-        "units_per_worker": "Unidades que maneja un operario por semana",
-        "units_per_worker_help": "Productividad media de un operario de almacén a tiempo completo.",
-        "sidebar_labor": "Costes Laborales",
-        "hourly_rate": "Salario por hora (€)",
-        "hours_per_week": "Horas por semana",
-        "overtime_mult": "Multiplicador de horas extra",
-        "overtime_mult_help": "Ej: 1.25 significa que las horas extra cuestan un 25% más que las normales.",
-        "sidebar_accuracy": "Precisión del Staffing",
-        "error_no_fc": "Error de personal SIN pronóstico (%)",
-        "error_no_fc_help": "Cuánto se desvía tu plantilla de la necesidad real en una semana típica, sin pronóstico de demanda.",
-        "error_with_fc": "Error de personal CON pronóstico (%)",
-        "error_with_fc_help": "Cuánto se desvía tu plantilla cuando usas un buen pronóstico de demanda.",
-        "sidebar_penalties": "Penalizaciones",
-        "sla_penalty": "Penalización SLA por semana incumplida (€)",
-        "sla_penalty_help": "Coste medio de penalización cuando no cumples objetivos por falta de personal.",
-        "banner_with_forecast": "Con un pronóstico de demanda ahorras",
-        "banner_per_year": "/ año",
-        "banner_monthly": "Son <b>€{monthly}</b> cada mes que vuelven a tu margen.",
-        "context_text": (
-            'Tu almacén mueve <b>{units_per_week} unidades/semana</b>. '
-            'Eso requiere aproximadamente <b>{workers:.0f} operarios</b>. '
-            'Sin un pronóstico, el personal se desvía ~<b>{misalloc}%</b> — '
-            'eso son <b>{over:.0f} operarios de más</b> en semanas flojas '
-            'y <b>{under:.0f} operarios de menos</b> en semanas pico.'
-        ),
-        "where_money_goes": "¿A dónde se va el dinero?",
-        "no_forecast": "❌ Sin Pronóstico",
-        "with_forecast": "✅ Con Pronóstico ({accuracy}% de precisión)",
-        "staff_error": "Error de personal: <b>{pct}%</b>",
-        "workers_over": '<b>{n:.0f}</b> operarios de más en semanas flojas',
-        "per_month_wasted": "/mes desperdiciados",
-        "workers_under": '<b>{n:.0f}</b> operarios de menos en semanas pico → horas extra a {mult}×',
-        "per_month_extra": "/mes extra",
-        "sla_penalties": "Penalizaciones SLA",
-        "per_month": "/mes",
-        "annual_waste_total": "Desperdicio anual total:",
-        "bar_title": "Desglose Anual de Costes: Antes vs Después del Pronóstico",
-        "bar_explainer": (
-            "Cada barra muestra de dónde viene el desperdicio laboral. "
-            "La <b style='color:#E74C3C'>barra roja</b> es tu coste hoy sin pronóstico. "
-            "La <b style='color:#27AE60'>barra verde</b> es tu coste con un pronóstico de demanda. "
-            "La diferencia entre ambas es dinero que te quedas."
-        ),
-        "bar_cat_idle": "Operarios ociosos<br>(sobredotación)",
-        "bar_cat_overtime": "Primas de<br>horas extra",
-        "bar_cat_sla": "Penalizaciones<br>SLA",
-        "bar_legend_no_fc": "Sin Pronóstico",
-        "bar_legend_with_fc": "Con Pronóstico",
-        "bar_yaxis": "Coste Anual (€)",
-        "sim_title": "Cómo se ve un año típico — Semana a semana",
-        "sim_explainer": (
-            "Esta simulación muestra 52 semanas de planificación de personal. "
-            "La <b>línea negra discontinua</b> es cuántos operarios realmente necesitabas. "
-            "La <b style='color:#E74C3C'>línea roja</b> es lo que programarías sin pronóstico (adivinando). "
-            "La <b style='color:#27AE60'>línea verde</b> es lo que programarías con un pronóstico. "
-            "Cada hueco entre las líneas es dinero perdido."
-        ),
-        "sim_waste_no_fc": "Desperdicio (sin pronóstico)",
-        "sim_waste_with_fc": "Desperdicio (con pronóstico)",
-        "sim_actual": "Operarios realmente necesarios",
-        "sim_sched_no_fc": "Programados — sin pronóstico",
-        "sim_sched_with_fc": "Programados — con pronóstico",
-        "sim_xaxis": "Semana del año",
-        "sim_yaxis": "Número de operarios",
-        "sens_title": "¿Cuánto importa la precisión del pronóstico?",
-        "sens_explainer": (
-            "Este gráfico muestra cómo cambia tu desperdicio anual a medida que mejora la precisión del personal. "
-            "Cuanto más a la derecha estés, peores son tus estimaciones — y más dinero pierdes. "
-            "Los dos puntos muestran dónde estás <b>hoy</b> (sin pronóstico) y dónde <b>podrías estar</b>."
-        ),
-        "sens_today": "  Hoy: €{val}",
-        "sens_with_fc": "  Con pronóstico: €{val}",
-        "sens_no_fc_legend": "Sin pronóstico",
-        "sens_with_fc_legend": "Con pronóstico",
-        "sens_arrow": "<b>Ahorras €{val}/año</b>",
-        "sens_xaxis": "Error de personal (%)",
-        "sens_yaxis": "Desperdicio anual (€)",
-        "conclusion_title": "En resumen",
-        "conclusion_body": (
-            'Un almacén que mueve <b>{units_per_week} unidades/semana</b> sin un pronóstico de demanda '
-            'desperdicia aproximadamente <b style="color:{red};">€{waste}/año</b> en '
-            'operarios ociosos, horas extra y penalizaciones SLA.<br><br>'
-            'Un pronóstico con <b>{accuracy}% de precisión</b> reduce eso a '
-            '<b style="color:{green};">€{reduced}/año</b> — '
-            'ahorrándote <b style="color:{green};">€{savings}</b> cada año.'
-        ),
-        "conclusion_cta": "<b>La solución no es más gente. Es mejor información.</b>",
-        "footer": (
-            "Desarrollado por [HireRobots](https://www.linkedin.com/company/hirerobots) — "
-            "convirtiendo la planificación reactiva en planificación inteligente con pronóstico de demanda."
-        ),
-    },
-    "en": {
-        "lang_label": "🌐 Idioma / Language",
-        "page_title": "📦 How much does poor staffing planning cost you?",
-        "page_subtitle": (
-            "Adjust the numbers in the sidebar to match your operation. "
-            "Discover exactly how much money you lose without a demand forecast — "
-            "and how much you save with one."
-        ),
-        "sidebar_warehouse": "Your Warehouse",
-        "units_per_week": "Units moved per week",
-        "units_per_week_help": "Total units (picks, packs, shipments) your warehouse handles weekly.",
-        "units_per_worker": "Units handled per worker per week",
-        "units_per_worker_help": "Average productivity of a full-time warehouse worker.",
-        "sidebar_labor": "Labor Costs",
-        "hourly_rate": "Hourly wage (€)",
-        "hours_per_week": "Hours per week",
-        "overtime_mult": "Overtime multiplier",
-        "overtime_mult_help": "E.g.: 1.25 means overtime costs 25% more than regular hours.",
-        "sidebar_accuracy": "Staffing Accuracy",
-        "error_no_fc": "Staffing error WITHOUT forecast (%)",
-        "error_no_fc_help": "How much your staffing deviates from actual need in a typical week, without a demand forecast.",
-        "error_with_fc": "Staffing error WITH forecast (%)",
-        "error_with_fc_help": "How much your staffing deviates when using a good demand forecast.",
-        "sidebar_penalties": "Penalties",
-        "sla_penalty": "SLA penalty per missed week (€)",
-        "sla_penalty_help": "Average penalty cost when you miss targets due to understaffing.",
-        "banner_with_forecast": "With a demand forecast you save",
-        "banner_per_year": "/ year",
-        "banner_monthly": "That's <b>€{monthly}</b> every month back into your margin.",
-        "context_text": (
-            'Your warehouse moves <b>{units_per_week} units/week</b>. '
-            'That requires roughly <b>{workers:.0f} workers</b>. '
-            'Without a forecast, staffing deviates ~<b>{misalloc}%</b> — '
-            "that's <b>{over:.0f} extra workers</b> in slow weeks "
-            'and <b>{under:.0f} too few</b> in peak weeks.'
-        ),
-        "where_money_goes": "Where does the money go?",
-        "no_forecast": "❌ Without Forecast",
-        "with_forecast": "✅ With Forecast ({accuracy}% accuracy)",
-        "staff_error": "Staffing error: <b>{pct}%</b>",
-        "workers_over": '<b>{n:.0f}</b> extra workers in slow weeks',
-        "per_month_wasted": "/mo wasted",
-        "workers_under": '<b>{n:.0f}</b> too few in peak weeks → overtime at {mult}×',
-        "per_month_extra": "/mo extra",
-        "sla_penalties": "SLA Penalties",
-        "per_month": "/mo",
-        "annual_waste_total": "Total annual waste:",
-        "bar_title": "Annual Cost Breakdown: Before vs After Forecast",
-        "bar_explainer": (
-            "Each bar shows where labor waste comes from. "
-            "The <b style='color:#E74C3C'>red bar</b> is your cost today without a forecast. "
-            "The <b style='color:#27AE60'>green bar</b> is your cost with a demand forecast. "
-            "The difference is money you keep."
-        ),
-        "bar_cat_idle": "Idle workers<br>(overstaffing)",
-        "bar_cat_overtime": "Overtime<br>premiums",
-        "bar_cat_sla": "SLA<br>Penalties",
-        "bar_legend_no_fc": "Without Forecast",
-        "bar_legend_with_fc": "With Forecast",
-        "bar_yaxis": "Annual Cost (€)",
-        "sim_title": "What a typical year looks like — Week by week",
-        "sim_explainer": (
-            "This simulation shows 52 weeks of staffing planning. "
-            "The <b>dashed black line</b> is how many workers you actually needed. "
-            "The <b style='color:#E74C3C'>red line</b> is what you'd schedule without a forecast (guessing). "
-            "The <b style='color:#27AE60'>green line</b> is what you'd schedule with a forecast. "
-            "Every gap between the lines is money lost."
-        ),
-        "sim_waste_no_fc": "Waste (without forecast)",
-        "sim_waste_with_fc": "Waste (with forecast)",
-        "sim_actual": "Workers actually needed",
-        "sim_sched_no_fc": "Scheduled — without forecast",
-        "sim_sched_with_fc": "Scheduled — with forecast",
-        "sim_xaxis": "Week of year",
-        "sim_yaxis": "Number of workers",
-        "sens_title": "How much does forecast accuracy matter?",
-        "sens_explainer": (
-            "This chart shows how your annual waste changes as staffing accuracy improves. "
-            "The further right you are, the worse your estimates — and the more money you lose. "
-            "The two dots show where you are <b>today</b> (no forecast) and where you <b>could be</b>."
-        ),
-        "sens_today": "  Today: €{val}",
-        "sens_with_fc": "  With forecast: €{val}",
-        "sens_no_fc_legend": "Without forecast",
-        "sens_with_fc_legend": "With forecast",
-        "sens_arrow": "<b>You save €{val}/year</b>",
-        "sens_xaxis": "Staffing error (%)",
-        "sens_yaxis": "Annual waste (€)",
-        "conclusion_title": "In summary",
-        "conclusion_body": (
-            'A warehouse moving <b>{units_per_week} units/week</b> without a demand forecast '
-            'wastes roughly <b style="color:{red};">€{waste}/year</b> on '
-            'idle workers, overtime, and SLA penalties.<br><br>'
-            'A forecast with <b>{accuracy}% accuracy</b> reduces that to '
-            '<b style="color:{green};">€{reduced}/year</b> — '
-            'saving you <b style="color:{green};">€{savings}</b> every year.'
-        ),
-        "conclusion_cta": "<b>The solution isn't more people. It's better information.</b>",
-        "footer": (
-            "Built by [HireRobots](https://www.linkedin.com/company/hirerobots) — "
-            "turning reactive planning into smart planning with demand forecasting."
-        ),
-    },
+# Opt-in rerun timing (?profile=1, see profiling.py); a no-op otherwise.
+perf = profiling.Recorder(
+    profiling.requested_mode(st.query_params),
+    session=st.session_state.setdefault("profile_session", os.urandom(4).hex()),
+)
+perf.section("setup")
+
+# Cached figures/simulations kept per process (least recently used evicted).
+CACHE_ENTRIES = 64
+
+# Paths behind the "simulated" cost model at weekly granularity (fast enough
+# for every rerun); finer granularities use proportionally fewer.
+SIMULATED_COST_PATHS = 10_000
+MIN_SIMULATED_COST_PATHS = 1_000
+MC_PATHS = [1_000, 10_000, 100_000, 1_000_000]
+# Monte Carlo runs stream in the background: the page waits this long for a
+# first estimate, then refreshes the running one at this interval.
+MC_FIRST_ESTIMATE_SECONDS = 0.2
+MC_POLL_SECONDS = 0.5
+# An adaptive run stops at its precision target, its maximum paths, or this.
+MC_TIME_BUDGET_SECONDS = 30
+# Path x bucket cells behind the fan chart (10k daily years); finer
+# granularities or larger runs use fewer paths.
+FAN_CELLS = 10_000 * 365
+
+# Sensitivity sweep: points per axis, and the 2-D sweep parameters with the
+# same bounds as their sidebar inputs.
+SWEEP_RESOLUTIONS = [51, 101, 251, 501, 1001]
+SWEEP_PARAMS = {
+    "sla": (0, 50_000),
+    "ot": (1.0, 3.0),
 }
 
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def cached_history(data: bytes):
+    return demand.load_history(io.BytesIO(data))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def cached_backtest(data: bytes):
+    return backtest.backtest(**backtest.load_backtest(io.BytesIO(data)))
+
+
+def _remove_portfolio_results(portfolio):
+    os.remove(portfolio[1])
+
+
+# A resource rather than data: the per-site results stream to a temporary
+# CSV, deleted when the entry is evicted, and are read only on download.
+@st.cache_resource(max_entries=CACHE_ENTRIES, on_release=_remove_portfolio_results)
+def cached_portfolio(data: bytes, fmt: str):
+    with tempfile.NamedTemporaryFile(prefix="portfolio_", suffix=".csv", delete=False) as results:
+        try:
+            totals = batch.run_portfolio(io.BytesIO(data), results, source_fmt=fmt, sink_fmt="csv")
+        except BaseException:
+            os.remove(results.name)
+            raise
+    return totals, results.name
+
+
 # ---------------------------------------------------------------------------
 # Language selector (top of sidebar)
 # ---------------------------------------------------------------------------
@@ -244,53 +105,7 @@ t = TRANSLATIONS[lang_code]
 # ---------------------------------------------------------------------------
 # Custom CSS
 # ---------------------------------------------------------------------------
-st.markdown(
-    """
-    <style>
-    .savings-banner {
-        background: linear-gradient(135deg, #27AE60 0%, #2ECC71 100%);
-        border-radius: 16px;
-        padding: 2rem 1.5rem;
-        text-align: center;
-        margin: 1rem 0 2rem 0;
-    }
-    .savings-banner h1 {
-        color: white !important;
-        font-size: 3rem !important;
-        margin: 0 !important;
-    }
-    .savings-banner p {
-        color: rgba(255,255,255,0.9);
-        font-size: 1.15rem;
-        margin: 0.5rem 0 0 0;
-    }
-    .scenario-card {
-        border-radius: 12px;
-        padding: 1.5rem;
-        margin-bottom: 1rem;
-    }
-    .scenario-bad  { background: rgba(231,76,60,0.07); border-left: 5px solid #E74C3C; }
-    .scenario-good { background: rgba(39,174,96,0.07); border-left: 5px solid #27AE60; }
-    .scenario-card h3 { margin-top: 0; }
-    .scenario-card .big-num { font-size: 2rem; font-weight: 700; }
-    .scenario-card .detail { color: #555; font-size: 0.95rem; margin: 0.3rem 0; }
-    .explainer {
-        background: #F8F9FA;
-        border-radius: 10px;
-        padding: 1rem 1.25rem;
-        margin: 0.75rem 0;
-        font-size: 0.95rem;
-        color: #333;
-        line-height: 1.55;
-    }
-    [data-testid="stSidebar"] .stNumberInput label,
-    [data-testid="stSidebar"] .stSlider label {
-        font-size: 0.9rem;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
+st.markdown(CSS, unsafe_allow_html=True)
 
 # ---------------------------------------------------------------------------
 # Header
@@ -333,6 +148,16 @@ misallocation_no_forecast = st.sidebar.slider(
 misallocation_with_forecast = st.sidebar.slider(
     t["error_with_fc"], 0, 20, 5, 1, help=t["error_with_fc_help"],
 )
+backtest_file = st.sidebar.file_uploader(t["backtest_file"], type=["csv"], help=t["backtest_help"])
+forecast_error = None
+if backtest_file is not None:
+    fc_backtest = cached_backtest(backtest_file.getvalue())
+    forecast_error = backtest.register_errors(fc_backtest["errors"])
+    st.sidebar.caption(t["backtest_summary"].format(
+        bias=fc_backtest["bias"], mape=fc_backtest["mape"],
+        p5=fc_backtest["quantiles"][5], p95=fc_backtest["quantiles"][95],
+        acf=fc_backtest["autocorrelation"], misalloc=fc_backtest["misallocation_equivalent"],
+    ))
 
 st.sidebar.header(t["sidebar_penalties"])
 sla_penalty_per_miss = st.sidebar.number_input(
@@ -341,46 +166,242 @@ sla_penalty_per_miss = st.sidebar.number_input(
     help=t["sla_penalty_help"],
 )
 
+st.sidebar.header(t["sidebar_rules"])
+labour_rules = None
+if st.sidebar.toggle(t["rules_toggle"], help=t["rules_help"]):
+    tiers = []
+    for tier, (workers, multiplier) in enumerate(((5, 1.5), (10, 2.0)), start=1):
+        col_workers, col_mult = st.sidebar.columns(2)
+        tiers.append((
+            col_workers.number_input(t["agency_workers"].format(n=tier), min_value=0, value=workers, step=1),
+            col_mult.number_input(t["agency_mult"].format(n=tier), min_value=1.0, max_value=4.0,
+                                  value=multiplier, step=0.05),
+        ))
+    labour_rules = {
+        "overtime_cap_hours": st.sidebar.number_input(t["overtime_cap"], min_value=0, max_value=40, value=8, step=1),
+        "agency_tiers": tuple(tier for tier in tiers if tier[0] > 0),
+        "min_shift_workers": st.sidebar.number_input(t["min_shift"], min_value=0, max_value=5_000, value=0, step=1),
+        "hiring_lead_weeks": st.sidebar.slider(t["hiring_lead"], 0, 12, 0, 1),
+        "ramp_weeks": st.sidebar.slider(t["ramp_weeks"], 0, 12, 0, 1, help=t["ramp_weeks_help"]),
+    }
+
+st.sidebar.header(t["sidebar_model"])
+granularity = st.sidebar.selectbox(
+    t["granularity"],
+    options=list(simulation.GRANULARITIES),
+    format_func=lambda g: t[f"granularity_{g}"],
+    help=t["granularity_help"],
+)
+# Finer buckets average out within each path, so fewer paths are needed.
+simulated_cost_paths = max(
+    MIN_SIMULATED_COST_PATHS,
+    SIMULATED_COST_PATHS * simulation.GRANULARITIES["weekly"] // simulation.GRANULARITIES[granularity],
+)
+cost_model = st.sidebar.radio(
+    t["sidebar_model"],
+    options=["analytic", "simulated", "surface"],
+    format_func=lambda m: t[f"cost_model_{m}"],
+    help=t["cost_model_help"],
+)
+if cost_model == "surface":
+    surface_exact_requested = st.sidebar.button(t["surface_exact"])
+    surface_status = st.sidebar.empty()
+
+st.sidebar.header(t["sidebar_demand"])
+seasonality = st.sidebar.selectbox(
+    t["seasonality"],
+    options=[*demand.BUILTIN_SEASONALITIES, "upload"],
+    format_func=lambda s: t[f"seasonality_{s}"],
+)
+if seasonality == "upload":
+    history_file = st.sidebar.file_uploader(
+        t["seasonality_upload_file"], type=["csv"], help=t["seasonality_upload_help"],
+    )
+    seasonality = "flat"
+    if history_file is not None:
+        seasonality = demand.register_seasonality(cached_history(history_file.getvalue()))
+demand_profile = {
+    "seasonality": seasonality,
+    "trend": st.sidebar.slider(t["trend"], -20, 30, 0, 1) / 100,
+    "ar1": st.sidebar.slider(t["ar1"], 0.0, 0.95, 0.0, 0.05, help=t["ar1_help"]),
+    "promotions": demand.PEAK_PROMOTIONS if st.sidebar.checkbox(t["peak_promotions"]) else (),
+}
+if forecast_error:
+    demand_profile["forecast_error"] = forecast_error
+
 # ---------------------------------------------------------------------------
 # Calculations
 # ---------------------------------------------------------------------------
-required_workers = units_per_week / units_per_worker_per_week
-weekly_worker_cost = hourly_rate * hours_per_week
-
-
-def scenario_costs(misalloc_pct: float) -> dict:
-    frac = misalloc_pct / 100.0
-    over = required_workers * frac / 2
-    under = required_workers * frac / 2
-
-    weekly_overstaffing = over * weekly_worker_cost
-    weekly_overtime_premium = under * weekly_worker_cost * (overtime_multiplier - 1)
-    weekly_sla = sla_penalty_per_miss / 2
-
-    annual_overstaffing = weekly_overstaffing * 52
-    annual_overtime = weekly_overtime_premium * 52
-    annual_sla = weekly_sla * 52
-
-    return {
-        "workers_over": over,
-        "workers_under": under,
-        "monthly_overstaffing": annual_overstaffing / 12,
-        "monthly_overtime": annual_overtime / 12,
-        "monthly_sla": annual_sla / 12,
-        "annual_overstaffing": annual_overstaffing,
-        "annual_overtime": annual_overtime,
-        "annual_sla": annual_sla,
-        "annual_total": annual_overstaffing + annual_overtime + annual_sla,
-    }
+required_workers = engine.required_workers(units_per_week, units_per_worker_per_week)
+weekly_worker_cost = engine.weekly_worker_cost(hourly_rate, hours_per_week)
+
+
+def scenario_costs(misalloc_pct):
+    return engine.scenario_costs(
+        units_per_week,
+        units_per_worker_per_week,
+        hourly_rate,
+        hours_per_week,
+        overtime_multiplier,
+        misalloc_pct,
+        sla_penalty_per_miss,
+        labour_rules,
+    )
+
+
+# Everything below is keyed only on numeric inputs; the language is applied
+# afterwards with charts.label_*, so switching it never rebuilds a figure.
+# Figures are cached as template-free dicts (charts.freeze/thaw), which is
+# much cheaper to restore than a pickled Figure.
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def cached_simulation(
+    units_per_week, units_per_worker_per_week, misalloc_no_fc, misalloc_with_fc, granularity, profile,
+):
+    return simulation.simulate_year(
+        units_per_week, units_per_worker_per_week, misalloc_no_fc, misalloc_with_fc, granularity, profile,
+    )
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def cached_simulation_figure(
+    units_per_week, units_per_worker_per_week, misalloc_no_fc, misalloc_with_fc, granularity, profile,
+):
+    sim = cached_simulation(
+        units_per_week, units_per_worker_per_week, misalloc_no_fc, misalloc_with_fc, granularity, profile,
+    )
+    return charts.freeze(
+        charts.simulation_figure(sim["weeks"], sim["actual_needed"], sim["no_fc_staff"], sim["with_fc_staff"])
+    )
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def cached_fan_figure(units_per_week, units_per_worker_per_week, granularity, profile, n_paths, seed):
+    bands = simulation.percentile_bands(
+        units_per_week, units_per_worker_per_week, n_paths, seed, granularity, profile,
+    )
+    weeks = simulation.bucket_positions(simulation.GRANULARITIES[granularity])
+    return charts.freeze(charts.fan_figure(weeks, simulation.FAN_PERCENTILES, bands))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def cached_simulated_costs(
+    units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+    overtime_multiplier, misalloc_no_fc, misalloc_with_fc, sla_penalty_per_miss,
+    granularity, profile, rules, n_paths,
+):
+    mc = simulation.monte_carlo(
+        units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+        overtime_multiplier, misalloc_no_fc, misalloc_with_fc, sla_penalty_per_miss,
+        n_paths=n_paths, seed=simulation.SEED, granularity=granularity, profile=profile, rules=rules,
+    )
+    return simulation.expected_costs(mc, "no_fc"), simulation.expected_costs(mc, "with_fc")
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def cached_surface(granularity, profile):
+    return surface.build(granularity, profile)
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def cached_headcount(
+    units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+    overtime_multiplier, sla_penalty_per_miss, granularity, profile,
+):
+    solution = solver.solve(
+        units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+        overtime_multiplier, sla_penalty_per_miss, profile, simulation.GRANULARITIES[granularity],
+    )
+    weeks = simulation.bucket_positions(simulation.GRANULARITIES[granularity])
+    fig = charts.freeze(charts.headcount_figure(weeks, solution["mean_needed"], solution["optimal_staff"]))
+    return fig, float(solution["annual_cost_optimal"]), float(solution["annual_cost_at_mean"])
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def cached_bar_figure(no_fc_vals, with_fc_vals):
+    return charts.freeze(charts.bar_figure(list(no_fc_vals), list(with_fc_vals)))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def cached_sensitivity_figure(
+    units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+    overtime_multiplier, misalloc_no_fc, misalloc_with_fc, sla_penalty_per_miss, rules,
+    points,
+):
+    inputs = (units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week, overtime_multiplier)
+    misalloc_range = np.linspace(0, 50, points)
+    annual_totals = engine.annual_total(*inputs, misalloc_range, sla_penalty_per_miss, rules)
+    no_fc_total = engine.scenario_costs(*inputs, misalloc_no_fc, sla_penalty_per_miss, rules)["annual_total"]
+    with_fc_total = engine.scenario_costs(*inputs, misalloc_with_fc, sla_penalty_per_miss, rules)["annual_total"]
+    return charts.freeze(charts.sensitivity_figure(
+        misalloc_range, annual_totals,
+        (misalloc_no_fc, no_fc_total), (misalloc_with_fc, with_fc_total),
+    ))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def cached_sweep_figure(
+    units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+    overtime_multiplier, misalloc_no_fc, misalloc_with_fc, sla_penalty_per_miss, rules,
+    param, points,
+):
+    misalloc_range = np.linspace(0, 50, points)
+    param_range = np.linspace(*SWEEP_PARAMS[param], points)
+    if param == "sla":
+        current = sla_penalty_per_miss
+        sla_penalty_per_miss = param_range[np.newaxis, :]
+    else:
+        current = overtime_multiplier
+        overtime_multiplier = param_range[np.newaxis, :]
+    annual_totals = engine.annual_total(
+        units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+        overtime_multiplier, misalloc_range[:, np.newaxis], sla_penalty_per_miss, rules,
+    )
+    return charts.freeze(charts.sweep_figure(
+        misalloc_range, param_range, annual_totals,
+        (misalloc_no_fc, current), (misalloc_with_fc, current),
+    ))
 
 
-no_fc = scenario_costs(misallocation_no_forecast)
-with_fc = scenario_costs(misallocation_with_forecast)
+simulated_inputs = (
+    units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+    overtime_multiplier, misallocation_no_forecast, misallocation_with_forecast,
+    sla_penalty_per_miss, granularity, demand_profile, labour_rules, simulated_cost_paths,
+)
+interpolated = False
+if cost_model == "surface" and labour_rules:
+    # The surface relies on costs being linear in the rates, which the rules break.
+    surface_status.caption(t["surface_rules_caption"])
+elif cost_model == "surface" and not surface.covers(units_per_week, units_per_worker_per_week):
+    surface_status.caption(t["surface_small_caption"].format(workers=surface.WORKERS_RANGE[0]))
+elif cost_model == "surface":
+    # Interpolated while the inputs move; a full simulation only on request
+    # for the exact values, shown for as long as they stay unchanged.
+    if surface_exact_requested:
+        st.session_state["surface_exact"] = simulated_inputs
+    interpolated = st.session_state.get("surface_exact") != simulated_inputs
+    surface_status.caption(t["surface_caption"] if interpolated else t["surface_exact_caption"])
+
+if interpolated:
+    response_surface = cached_surface(granularity, demand_profile)
+    no_fc = surface.lookup(
+        response_surface, units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+        overtime_multiplier, misallocation_no_forecast, sla_penalty_per_miss, "no_fc",
+    )
+    with_fc = surface.lookup(
+        response_surface, units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+        overtime_multiplier, misallocation_with_forecast, sla_penalty_per_miss, "with_fc",
+    )
+elif cost_model != "analytic":
+    no_fc, with_fc = cached_simulated_costs(*simulated_inputs)
+else:
+    no_fc = scenario_costs(misallocation_no_forecast)
+    with_fc = scenario_costs(misallocation_with_forecast)
 annual_savings = no_fc["annual_total"] - with_fc["annual_total"]
 
 # ---------------------------------------------------------------------------
 # 1 — Savings banner
 # ---------------------------------------------------------------------------
+perf.section("banner")
 st.markdown(
     f"""
     <div class="savings-banner">
@@ -395,6 +416,7 @@ st.markdown(
 # ---------------------------------------------------------------------------
 # 2 — Plain-language context
 # ---------------------------------------------------------------------------
+perf.section("context")
 st.markdown(
     f"""
     <div class="explainer">
@@ -413,6 +435,7 @@ st.markdown(
 # ---------------------------------------------------------------------------
 # 3 — Side-by-side scenario cards
 # ---------------------------------------------------------------------------
+perf.section("cards")
 st.markdown(f"### {t['where_money_goes']}")
 
 col_bad, col_good = st.columns(2)
@@ -476,6 +499,7 @@ with col_good:
 # ---------------------------------------------------------------------------
 # 4 — Bar chart: cost breakdown
 # ---------------------------------------------------------------------------
+perf.section("bar_chart")
 st.markdown("---")
 st.markdown(f"### {t['bar_title']}")
 st.markdown(
@@ -483,41 +507,21 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-categories = [t["bar_cat_idle"], t["bar_cat_overtime"], t["bar_cat_sla"]]
-no_fc_vals = [no_fc["annual_overstaffing"], no_fc["annual_overtime"], no_fc["annual_sla"]]
-with_fc_vals = [with_fc["annual_overstaffing"], with_fc["annual_overtime"], with_fc["annual_sla"]]
-
-fig_bar = go.Figure()
-fig_bar.add_trace(go.Bar(
-    name=t["bar_legend_no_fc"],
-    x=categories, y=no_fc_vals,
-    marker_color=RED,
-    text=[f"€{v:,.0f}" for v in no_fc_vals],
-    textposition="outside",
-    textfont=dict(size=14, color=RED),
-))
-fig_bar.add_trace(go.Bar(
-    name=t["bar_legend_with_fc"],
-    x=categories, y=with_fc_vals,
-    marker_color=GREEN,
-    text=[f"€{v:,.0f}" for v in with_fc_vals],
-    textposition="outside",
-    textfont=dict(size=14, color=GREEN),
-))
-fig_bar.update_layout(
-    barmode="group",
-    yaxis_title=t["bar_yaxis"],
-    template="plotly_white",
-    height=420,
-    font=dict(size=14),
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5, font=dict(size=14)),
-    margin=dict(t=60),
+bar_fields = ("annual_overstaffing", "annual_overtime", "annual_sla")
+fig_bar = charts.label_bar(
+    charts.thaw(cached_bar_figure(
+        tuple(float(no_fc[f]) for f in bar_fields),
+        tuple(float(with_fc[f]) for f in bar_fields),
+    )),
+    t,
 )
+perf.figure("fig_bar", fig_bar)
 st.plotly_chart(fig_bar, use_container_width=True)
 
 # ---------------------------------------------------------------------------
 # 5 — Weekly simulation (52 weeks)
 # ---------------------------------------------------------------------------
+perf.section("simulation")
 st.markdown("---")
 st.markdown(f"### {t['sim_title']}")
 st.markdown(
@@ -525,77 +529,143 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-np.random.seed(42)
-demand = np.random.normal(loc=units_per_week, scale=units_per_week * 0.15, size=52)
-demand = np.clip(demand, units_per_week * 0.5, units_per_week * 1.5)
-actual_needed = demand / units_per_worker_per_week
-
-no_fc_staff = np.full(52, required_workers) + np.random.normal(
-    0, required_workers * misallocation_no_forecast / 200, 52
-)
-no_fc_staff = np.clip(no_fc_staff, 1, None)
-
-with_fc_staff = actual_needed + np.random.normal(
-    0, required_workers * misallocation_with_forecast / 200, 52
-)
-with_fc_staff = np.clip(with_fc_staff, 1, None)
-
-weeks = np.arange(1, 53)
-
-fig_sim = go.Figure()
-
-fig_sim.add_trace(go.Scatter(
-    x=np.concatenate([weeks, weeks[::-1]]),
-    y=np.concatenate([np.maximum(actual_needed, no_fc_staff),
-                      np.minimum(actual_needed, no_fc_staff)[::-1]]),
-    fill="toself",
-    fillcolor=RED_LIGHT,
-    line=dict(width=0),
-    name=t["sim_waste_no_fc"],
-    hoverinfo="skip",
-))
-
-fig_sim.add_trace(go.Scatter(
-    x=np.concatenate([weeks, weeks[::-1]]),
-    y=np.concatenate([np.maximum(actual_needed, with_fc_staff),
-                      np.minimum(actual_needed, with_fc_staff)[::-1]]),
-    fill="toself",
-    fillcolor=GREEN_LIGHT,
-    line=dict(width=0),
-    name=t["sim_waste_with_fc"],
-    hoverinfo="skip",
-))
-
-fig_sim.add_trace(go.Scatter(
-    x=weeks, y=actual_needed, mode="lines",
-    name=t["sim_actual"],
-    line=dict(color="black", width=2, dash="dash"),
-))
-fig_sim.add_trace(go.Scatter(
-    x=weeks, y=no_fc_staff, mode="lines",
-    name=t["sim_sched_no_fc"],
-    line=dict(color=RED, width=2),
-))
-fig_sim.add_trace(go.Scatter(
-    x=weeks, y=with_fc_staff, mode="lines",
-    name=t["sim_sched_with_fc"],
-    line=dict(color=GREEN, width=2),
-))
-
-fig_sim.update_layout(
-    xaxis_title=t["sim_xaxis"],
-    yaxis_title=t["sim_yaxis"],
-    template="plotly_white",
-    height=450,
-    font=dict(size=13),
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5, font=dict(size=13)),
-    margin=dict(t=60),
+fig_sim = charts.label_simulation(
+    charts.thaw(cached_simulation_figure(
+        units_per_week, units_per_worker_per_week,
+        misallocation_no_forecast, misallocation_with_forecast, granularity, demand_profile,
+    )),
+    t,
 )
+perf.figure("fig_sim", fig_sim)
 st.plotly_chart(fig_sim, use_container_width=True)
 
+
+def monte_carlo_results(t, run, polling):
+    """Running Monte Carlo estimate; polls while ``run`` is in progress."""
+    snapshot = run.snapshot()
+    if run.error is not None:
+        raise run.error
+    if polling and run.done:
+        # One full rerun to draw the final result and stop polling.
+        st.rerun()
+    if snapshot is None:
+        st.caption(t["mc_starting"])
+        return
+    if not run.done and run.precision is not None:
+        # The half width shrinks as 1/sqrt(paths), which gives the paths still needed.
+        needed = snapshot["paths"] * (snapshot["half_width"] / run.precision) ** 2
+        st.progress(
+            min(1.0, snapshot["paths"] / min(needed, run.n_paths)) if np.isfinite(needed) else 0.0,
+            text=t["mc_progress_adaptive"].format(
+                done=f"{snapshot['paths']:,}", hw=f"{snapshot['half_width']:,.0f}", target=f"{run.precision:,.0f}",
+            ),
+        )
+    elif not run.done:
+        st.progress(
+            snapshot["paths"] / run.n_paths,
+            text=t["mc_progress"].format(done=f"{snapshot['paths']:,}", n=f"{run.n_paths:,}"),
+        )
+    col_p5, col_p50, col_p95, col_neg = st.columns(4)
+    col_p5.metric(t["mc_p5"], f"€{snapshot['p5']:,.0f}")
+    col_p50.metric(t["mc_p50"], f"€{snapshot['p50']:,.0f}")
+    col_p95.metric(t["mc_p95"], f"€{snapshot['p95']:,.0f}")
+    col_neg.metric(t["mc_prob_negative"], f"{snapshot['prob_negative']:.1%}")
+    caption = t["mc_caption"].format(
+        n=f"{snapshot['paths']:,}", mean=f"{snapshot['mean']:,.0f}", se=f"{snapshot['std_error']:,.0f}",
+    )
+    if snapshot.get("variance_reduction"):
+        caption += " " + t["mc_variance_reduction"].format(factor=f"{snapshot['variance_reduction']:,.0f}")
+    if snapshot["stop_reason"]:
+        caption += " " + t[f"mc_stopped_{snapshot['stop_reason']}"].format(hw=f"{snapshot['half_width']:,.0f}")
+    st.caption(caption)
+    series = run.series()
+    if len(series.get("paths", ())) > 1:
+        fig_conv = charts.label_convergence(
+            charts.convergence_figure(
+                series["paths"], series["mean"], series["std_error"], series["p5"], series["p95"],
+            ),
+            t,
+        )
+        st.plotly_chart(fig_conv, use_container_width=True)
+
+
+if st.toggle(t["mc_toggle"]):
+    col_adaptive, col_precision = st.columns([3, 1])
+    mc_adaptive = col_adaptive.toggle(t["mc_adaptive"], help=t["mc_adaptive_help"])
+    mc_precision = col_precision.number_input(
+        t["mc_precision"], min_value=10, max_value=100_000, value=simulation.DEFAULT_PRECISION, step=100,
+        disabled=not mc_adaptive,
+    )
+    col_paths, col_seed = st.columns([3, 1])
+    mc_paths = col_paths.select_slider(
+        t["mc_max_paths"] if mc_adaptive else t["mc_paths"],
+        options=MC_PATHS,
+        value=simulation.MAX_ADAPTIVE_PATHS if mc_adaptive else 10_000,
+        format_func="{:,}".format,
+    )
+    mc_seed = col_seed.number_input(t["mc_seed"], min_value=0, value=simulation.SEED, step=1)
+    mc_sampling = st.selectbox(
+        t["mc_sampling"],
+        options=list(simulation.SAMPLINGS),
+        index=simulation.SAMPLINGS.index("sobol"),
+        format_func=lambda s: t[f"sampling_{s}"],
+        help=t["mc_sampling_help"],
+    )
+    mc_inputs = (
+        units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+        overtime_multiplier, misallocation_no_forecast, misallocation_with_forecast, sla_penalty_per_miss,
+    )
+    mc_options = dict(
+        n_paths=mc_paths, seed=mc_seed, granularity=granularity, profile=demand_profile, rules=labour_rules,
+        sampling=mc_sampling,
+    )
+    if mc_adaptive:
+        mc_options.update(precision=mc_precision, time_budget=MC_TIME_BUDGET_SECONDS)
+    mc_key = (mc_inputs, mc_options)
+    run = st.session_state.get("mc_run")
+    # A run also cancels itself once nothing polls it (see streaming.Run).
+    if run is None or run.key != mc_key or run.cancelled:
+        if run is not None:
+            run.cancel()
+        run = st.session_state["mc_run"] = streaming.Run(mc_key, *mc_inputs, **mc_options)
+    run.snapshot(MC_FIRST_ESTIMATE_SECONDS)
+    polling = not run.done
+    st.fragment(run_every=MC_POLL_SECONDS if polling else None)(monte_carlo_results)(t, run, polling)
+
+    fan_paths = max(1, min(mc_paths, FAN_CELLS // simulation.GRANULARITIES[granularity]))
+    fig_fan = charts.label_fan(
+        charts.thaw(cached_fan_figure(
+            units_per_week, units_per_worker_per_week, granularity, demand_profile, fan_paths, mc_seed,
+        )),
+        t,
+        simulation.FAN_PERCENTILES,
+    )
+    perf.figure("fig_fan", fig_fan)
+    st.plotly_chart(fig_fan, use_container_width=True)
+    st.caption(t["fan_caption"].format(n=f"{fan_paths:,}"))
+elif "mc_run" in st.session_state:
+    st.session_state.pop("mc_run").cancel()
+
+with st.expander(t["opt_title"]):
+    st.markdown(
+        f'<div class="explainer">{t["opt_explainer"]}</div>',
+        unsafe_allow_html=True,
+    )
+    fig_opt, cost_optimal, cost_at_mean = cached_headcount(
+        units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+        overtime_multiplier, sla_penalty_per_miss, granularity, demand_profile,
+    )
+    col_optimal, col_at_mean = st.columns(2)
+    col_optimal.metric(t["opt_cost_optimal"], f"€{cost_optimal:,.0f}")
+    col_at_mean.metric(t["opt_cost_at_mean"], f"€{cost_at_mean:,.0f}")
+    fig_opt = charts.label_headcount(charts.thaw(fig_opt), t)
+    perf.figure("fig_opt", fig_opt)
+    st.plotly_chart(fig_opt, use_container_width=True)
+
 # ---------------------------------------------------------------------------
 # 6 — Sensitivity chart
 # ---------------------------------------------------------------------------
+perf.section("sensitivity")
 st.markdown("---")
 st.markdown(f"### {t['sens_title']}")
 st.markdown(
@@ -603,74 +673,38 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-misalloc_range = np.arange(0, 51, 1)
-annual_totals = [scenario_costs(m)["annual_total"] for m in misalloc_range]
-
-fig_sens = go.Figure()
-
-fig_sens.add_trace(go.Scatter(
-    x=misalloc_range, y=annual_totals,
-    mode="lines",
-    line=dict(color=GREY, width=2),
-    fill="tozeroy",
-    fillcolor="rgba(149,165,166,0.10)",
-    showlegend=False,
-))
-
-fig_sens.add_trace(go.Scatter(
-    x=[misallocation_no_forecast],
-    y=[no_fc["annual_total"]],
-    mode="markers+text",
-    marker=dict(size=18, color=RED, symbol="circle"),
-    text=[t["sens_today"].format(val=f"{no_fc['annual_total']:,.0f}")],
-    textposition="middle right",
-    textfont=dict(size=14, color=RED),
-    name=t["sens_no_fc_legend"],
-))
-fig_sens.add_trace(go.Scatter(
-    x=[misallocation_with_forecast],
-    y=[with_fc["annual_total"]],
-    mode="markers+text",
-    marker=dict(size=18, color=GREEN, symbol="circle"),
-    text=[t["sens_with_fc"].format(val=f"{with_fc['annual_total']:,.0f}")],
-    textposition="middle right",
-    textfont=dict(size=14, color=GREEN),
-    name=t["sens_with_fc_legend"],
-))
-
-fig_sens.add_annotation(
-    x=misallocation_no_forecast,
-    y=no_fc["annual_total"],
-    ax=misallocation_with_forecast,
-    ay=with_fc["annual_total"],
-    xref="x", yref="y", axref="x", ayref="y",
-    showarrow=True,
-    arrowhead=3, arrowsize=1.5, arrowwidth=2,
-    arrowcolor=GREEN,
-)
-fig_sens.add_annotation(
-    x=(misallocation_no_forecast + misallocation_with_forecast) / 2,
-    y=(no_fc["annual_total"] + with_fc["annual_total"]) / 2,
-    text=t["sens_arrow"].format(val=f"{annual_savings:,.0f}"),
-    showarrow=False,
-    font=dict(size=15, color=GREEN),
-    xshift=100,
+sweep_points = st.select_slider(t["sens_resolution"], options=SWEEP_RESOLUTIONS, value=SWEEP_RESOLUTIONS[0])
+sweep_inputs = (
+    units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+    overtime_multiplier, misallocation_no_forecast, misallocation_with_forecast,
+    sla_penalty_per_miss, labour_rules,
 )
 
-fig_sens.update_layout(
-    xaxis_title=t["sens_xaxis"],
-    yaxis_title=t["sens_yaxis"],
-    template="plotly_white",
-    height=450,
-    font=dict(size=13),
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5, font=dict(size=14)),
-    margin=dict(t=60),
-)
+fig_sens = charts.label_sensitivity(charts.thaw(cached_sensitivity_figure(*sweep_inputs, sweep_points)), t)
+perf.figure("fig_sens", fig_sens)
 st.plotly_chart(fig_sens, use_container_width=True)
 
+st.markdown(f"#### {t['sweep_title']}")
+st.markdown(
+    f'<div class="explainer">{t["sweep_explainer"]}</div>',
+    unsafe_allow_html=True,
+)
+sweep_param = st.radio(
+    t["sweep_param"],
+    options=list(SWEEP_PARAMS),
+    format_func=lambda p: t[f"sweep_param_{p}"],
+    horizontal=True,
+)
+fig_sweep = charts.label_sweep(
+    charts.thaw(cached_sweep_figure(*sweep_inputs, sweep_param, sweep_points)), t, sweep_param,
+)
+perf.figure("fig_sweep", fig_sweep)
+st.plotly_chart(fig_sweep, use_container_width=True)
+
 # ---------------------------------------------------------------------------
 # 7 — Conclusion + CTA
 # ---------------------------------------------------------------------------
+perf.section("conclusion")
 st.markdown("---")
 st.markdown(
     f"""
@@ -695,5 +729,109 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+# ---------------------------------------------------------------------------
+# 8 — Portfolio batch mode
+# ---------------------------------------------------------------------------
+perf.section("portfolio")
+with st.expander(t["batch_title"]):
+    st.markdown(
+        f'<div class="explainer">{t["batch_explainer"].format(columns=", ".join(batch.INPUT_COLUMNS))}</div>',
+        unsafe_allow_html=True,
+    )
+    sites_file = st.file_uploader(t["batch_upload"], type=["csv", "parquet"])
+    if sites_file is not None:
+        totals, results_path = cached_portfolio(sites_file.getvalue(), Path(sites_file.name).suffix[1:].lower())
+        col_sites, col_no_fc, col_with_fc, col_savings = st.columns(4)
+        col_sites.metric(t["batch_sites"], f"{totals['sites']:,}")
+        col_no_fc.metric(t["batch_no_fc"], f"€{totals['no_fc_annual_total']:,.0f}")
+        col_with_fc.metric(t["batch_with_fc"], f"€{totals['with_fc_annual_total']:,.0f}")
+        col_savings.metric(t["batch_savings"], f"€{totals['annual_savings']:,.0f}")
+        st.download_button(
+            t["batch_download"],
+            data=Path(results_path).read_bytes,
+            file_name="portfolio_results.csv",
+            mime="text/csv",
+        )
+
+# ---------------------------------------------------------------------------
+# 9 — Scenario workspace
+# ---------------------------------------------------------------------------
+# A fragment: editing the table reruns only this function, and the session's
+# Workspace recomputes only the edited scenarios.
+@st.fragment
+def scenario_workspace(t, site, default_rows):
+    ws = st.session_state.setdefault("workspace", workspace.Workspace())
+    rows = st.data_editor(
+        st.session_state.setdefault("workspace_rows", default_rows),
+        num_rows="dynamic",
+        use_container_width=True,
+        key="workspace_editor",
+        column_config={
+            "name": st.column_config.TextColumn(t["ws_name"], required=True),
+            "misallocation": st.column_config.NumberColumn(t["ws_misallocation"], min_value=0, max_value=100),
+            "hourly_rate": st.column_config.NumberColumn(t["hourly_rate"], min_value=0.0, format="€%.2f"),
+            "hours_per_week": st.column_config.NumberColumn(t["hours_per_week"], min_value=0),
+            "overtime_multiplier": st.column_config.NumberColumn(t["overtime_mult"], min_value=1.0),
+            "sla_penalty_per_miss": st.column_config.NumberColumn(t["sla_penalty"], min_value=0, format="€%d"),
+        },
+    )
+    try:
+        costs = ws.update(site, rows)
+    except workspace.DuplicateNames as exc:
+        st.error(t["ws_duplicate_names"].format(names=", ".join(exc.names)))
+        return
+    if costs:
+        st.plotly_chart(charts.label_scenarios(ws.figure(list(costs)), t), use_container_width=True)
+    st.caption(t["ws_recomputed"].format(n=len(ws.recomputed), total=len(costs)))
+
+
+perf.section("workspace")
+# A toggle rather than an expander: an expander still runs its body, and the
+# data editor pulls in pandas, which is most of a cold start.
+if st.toggle(t["ws_title"], key="workspace_open"):
+    st.markdown(
+        f'<div class="explainer">{t["ws_explainer"]}</div>',
+        unsafe_allow_html=True,
+    )
+    shared = {
+        "hourly_rate": hourly_rate,
+        "hours_per_week": hours_per_week,
+        "overtime_multiplier": overtime_multiplier,
+        "sla_penalty_per_miss": sla_penalty_per_miss,
+    }
+    scenario_workspace(
+        t,
+        {"units_per_week": units_per_week, "units_per_worker_per_week": units_per_worker_per_week},
+        [
+            {"name": t["ws_default_no_fc"], "misallocation": misallocation_no_forecast, **shared},
+            {"name": t["ws_default_with_fc"], "misallocation": misallocation_with_forecast, **shared},
+        ],
+    )
+
 st.markdown("---")
 st.markdown(t["footer"])
+
+# ---------------------------------------------------------------------------
+# Debug panel (profiling only)
+# ---------------------------------------------------------------------------
+if perf.enabled:
+    report = perf.finish(
+        lang=lang_code, cost_model=cost_model, granularity=granularity,
+        sweep_points=sweep_points, sweep_param=sweep_param,
+    )
+    with st.expander("Rerun profile", expanded=True):
+        col_total, col_payload = st.columns(2)
+        col_total.metric("Total", f"{report['total_ms']:,.0f} ms")
+        col_payload.metric("Figure payload", f"{sum(f['bytes'] for f in perf.figures.values()) / 1024:,.0f} KiB")
+        st.dataframe(
+            [{"section": name, "ms": round(ms, 1)} for name, ms in report["sections_ms"].items()],
+            use_container_width=True,
+        )
+        st.dataframe(
+            [{"figure": name, "KiB": round(f["bytes"] / 1024, 1), "json ms": round(f["json_ms"], 1)}
+             for name, f in perf.figures.items()],
+            use_container_width=True,
+        )
+        for name, text in perf.details.items():
+            st.markdown(f"**{name}**")
+            st.code(text, language=None)
@@ -0,0 +1,516 @@
+"""Static page assets: translations and CSS.
+
+Kept out of app.py so they are built once per process when first
+imported, instead of on every script rerun.
+"""
+
+# ---------------------------------------------------------------------------
+# Custom CSS
+# ---------------------------------------------------------------------------
+CSS = """
+    <style>
+    .savings-banner {
+        background: linear-gradient(135deg, #27AE60 0%, #2ECC71 100%);
+        border-radius: 16px;
+        padding: 2rem 1.5rem;
+        text-align: center;
+        margin: 1rem 0 2rem 0;
+    }
+    .savings-banner h1 {
+        color: white !important;
+        font-size: 3rem !important;
+        margin: 0 !important;
+    }
+    .savings-banner p {
+        color: rgba(255,255,255,0.9);
+        font-size: 1.15rem;
+        margin: 0.5rem 0 0 0;
+    }
+    .scenario-card {
+        border-radius: 12px;
+        padding: 1.5rem;
+        margin-bottom: 1rem;
+    }
+    .scenario-bad  { background: rgba(231,76,60,0.07); border-left: 5px solid #E74C3C; }
+    .scenario-good { background: rgba(39,174,96,0.07); border-left: 5px solid #27AE60; }
+    .scenario-card h3 { margin-top: 0; }
+    .scenario-card .big-num { font-size: 2rem; font-weight: 700; }
+    .scenario-card .detail { color: #555; font-size: 0.95rem; margin: 0.3rem 0; }
+    .explainer {
+        background: #F8F9FA;
+        border-radius: 10px;
+        padding: 1rem 1.25rem;
+        margin: 0.75rem 0;
+        font-size: 0.95rem;
+        color: #333;
+        line-height: 1.55;
+    }
+    [data-testid="stSidebar"] .stNumberInput label,
+    [data-testid="stSidebar"] .stSlider label {
+        font-size: 0.9rem;
+    }
+    </style>
+"""
+
+# ---------------------------------------------------------------------------
+# Translations
+# ---------------------------------------------------------------------------
+TRANSLATIONS = {
+    "es": {
+        "lang_label": "🌐 Idioma / Language",
+        "page_title": "📦 ¿Cuánto te cuesta una mala planificación de personal?",
+        "page_subtitle": (
+            "Ajusta los números en la barra lateral para que coincidan con tu operación. "
+            "Descubre exactamente cuánto dinero pierdes sin un pronóstico de demanda — "
+            "y cuánto ahorras con uno."
+        ),
+        "sidebar_warehouse": "Tu Almacén",
+        "units_per_week": "Unidades movidas por semana",
+        "units_per_week_help": "Total de unidades (picks, packs, envíos) que tu almacén maneja semanalmente.",
+        "units_per_worker": "Unidades que maneja un operario por semana",
+        "units_per_worker_help": "Productividad media de un operario de almacén a tiempo completo.",
+        "sidebar_labor": "Costes Laborales",
+        "hourly_rate": "Salario por hora (€)",
+        "hours_per_week": "Horas por semana",
+        "overtime_mult": "Multiplicador de horas extra",
+        "overtime_mult_help": "Ej: 1.25 significa que las horas extra cuestan un 25% más que las normales.",
+        "sidebar_accuracy": "Precisión del Staffing",
+        "error_no_fc": "Error de personal SIN pronóstico (%)",
+        "error_no_fc_help": "Cuánto se desvía tu plantilla de la necesidad real en una semana típica, sin pronóstico de demanda.",
+        "error_with_fc": "Error de personal CON pronóstico (%)",
+        "error_with_fc_help": "Cuánto se desvía tu plantilla cuando usas un buen pronóstico de demanda.",
+        "backtest_file": "Backtest del pronóstico (CSV, opcional)",
+        "backtest_help": "Demanda real y pronóstico por periodo: columnas «actual» y «forecast», opcionalmente «series» y «date». Sin «forecast» se evalúa una media móvil. La simulación remuestrea estos errores en lugar del error normal.",
+        "backtest_summary": "Sesgo {bias:+.1%} · MAPE {mape:.1%} · P5–P95 {p5:+.1%} a {p95:+.1%} · autocorrelación {acf:.2f} · equivale a ≈{misalloc:.0f}% de error. Los gráficos simulados y el modelo de coste simulado usan estos errores; el modelo analítico sigue usando el control.",
+        "sidebar_penalties": "Penalizaciones",
+        "sla_penalty": "Penalización SLA por semana incumplida (€)",
+        "sla_penalty_help": "Coste medio de penalización cuando no cumples objetivos por falta de personal.",
+        "sidebar_rules": "Reglas laborales",
+        "rules_toggle": "Costes por tramos",
+        "rules_help": "Horas extra con tope por trabajador, después agencias por tramos con recargos crecientes; solo lo que queda sin cubrir incumple el SLA.",
+        "overtime_cap": "Tope de horas extra (h/trabajador/semana)",
+        "agency_workers": "Agencia {n}: trabajadores",
+        "agency_mult": "Agencia {n}: multiplicador",
+        "min_shift": "Turno mínimo (trabajadores)",
+        "hiring_lead": "Plazo de contratación (semanas)",
+        "ramp_weeks": "Rampa de productividad (semanas)",
+        "ramp_weeks_help": "Semanas hasta que una nueva contratación rinde al 100%. Solo en la simulación.",
+        "sidebar_model": "Modelo de costes",
+        "cost_model_analytic": "Aproximación rápida",
+        "cost_model_simulated": "Simulación semana a semana",
+        "cost_model_surface": "Simulación precalculada (instantánea)",
+        "cost_model_help": (
+            "La aproximación rápida supone que la mitad del error es exceso de personal y la otra mitad "
+            "falta de personal. La simulación calcula cada hueco de miles de años simulados. La simulación "
+            "precalculada interpola una rejilla simulada una vez por granularidad y demanda, así los "
+            "controles responden al instante."
+        ),
+        "surface_exact": "Simular estos valores exactos",
+        "surface_caption": "Valores interpolados de la simulación precalculada.",
+        "surface_exact_caption": "Simulación exacta de estos valores.",
+        "surface_rules_caption": "Las reglas laborales requieren la simulación completa.",
+        "surface_small_caption": "Con menos de {workers} trabajadores necesarios se usa la simulación completa.",
+        "granularity": "Granularidad de la simulación",
+        "granularity_help": "Tamaño de cada periodo simulado. El coste de horas extra y de personal ocioso se calcula por periodo.",
+        "granularity_weekly": "Semanal (52)",
+        "granularity_daily": "Diaria (364)",
+        "granularity_shift": "Por turno (3 × 364)",
+        "granularity_hourly": "Por hora (8760)",
+        "sidebar_demand": "Demanda",
+        "seasonality": "Estacionalidad",
+        "seasonality_flat": "Sin estacionalidad",
+        "seasonality_retail_peak": "Pico de retail (nov–dic)",
+        "seasonality_summer_peak": "Pico de verano",
+        "seasonality_upload": "Subir histórico…",
+        "seasonality_upload_file": "Histórico de demanda (CSV)",
+        "seasonality_upload_help": "Un año de demanda, una fila por periodo, en la columna «demand» o en la primera columna.",
+        "trend": "Tendencia anual (%)",
+        "ar1": "Autocorrelación semana a semana",
+        "ar1_help": "0 = semanas independientes. Valores altos hacen que las semanas de mucha demanda vengan seguidas.",
+        "peak_promotions": "Picos de Black Friday y Navidad",
+        "banner_with_forecast": "Con un pronóstico de demanda ahorras",
+        "banner_per_year": "/ año",
+        "banner_monthly": "Son <b>€{monthly}</b> cada mes que vuelven a tu margen.",
+        "context_text": (
+            'Tu almacén mueve <b>{units_per_week} unidades/semana</b>. '
+            'Eso requiere aproximadamente <b>{workers:.0f} operarios</b>. '
+            'Sin un pronóstico, el personal se desvía ~<b>{misalloc}%</b> — '
+            'eso son <b>{over:.0f} operarios de más</b> en semanas flojas '
+            'y <b>{under:.0f} operarios de menos</b> en semanas pico.'
+        ),
+        "where_money_goes": "¿A dónde se va el dinero?",
+        "no_forecast": "❌ Sin Pronóstico",
+        "with_forecast": "✅ Con Pronóstico ({accuracy}% de precisión)",
+        "staff_error": "Error de personal: <b>{pct}%</b>",
+        "workers_over": '<b>{n:.0f}</b> operarios de más en semanas flojas',
+        "per_month_wasted": "/mes desperdiciados",
+        "workers_under": '<b>{n:.0f}</b> operarios de menos en semanas pico → horas extra a {mult}×',
+        "per_month_extra": "/mes extra",
+        "sla_penalties": "Penalizaciones SLA",
+        "per_month": "/mes",
+        "annual_waste_total": "Desperdicio anual total:",
+        "bar_title": "Desglose Anual de Costes: Antes vs Después del Pronóstico",
+        "bar_explainer": (
+            "Cada barra muestra de dónde viene el desperdicio laboral. "
+            "La <b style='color:#E74C3C'>barra roja</b> es tu coste hoy sin pronóstico. "
+            "La <b style='color:#27AE60'>barra verde</b> es tu coste con un pronóstico de demanda. "
+            "La diferencia entre ambas es dinero que te quedas."
+        ),
+        "bar_cat_idle": "Operarios ociosos<br>(sobredotación)",
+        "bar_cat_overtime": "Primas de<br>horas extra",
+        "bar_cat_sla": "Penalizaciones<br>SLA",
+        "bar_legend_no_fc": "Sin Pronóstico",
+        "bar_legend_with_fc": "Con Pronóstico",
+        "bar_yaxis": "Coste Anual (€)",
+        "sim_title": "Cómo se ve un año típico — Semana a semana",
+        "sim_explainer": (
+            "Esta simulación muestra 52 semanas de planificación de personal. "
+            "La <b>línea negra discontinua</b> es cuántos operarios realmente necesitabas. "
+            "La <b style='color:#E74C3C'>línea roja</b> es lo que programarías sin pronóstico (adivinando). "
+            "La <b style='color:#27AE60'>línea verde</b> es lo que programarías con un pronóstico. "
+            "Cada hueco entre las líneas es dinero perdido."
+        ),
+        "sim_waste_no_fc": "Desperdicio (sin pronóstico)",
+        "sim_waste_with_fc": "Desperdicio (con pronóstico)",
+        "sim_actual": "Operarios realmente necesarios",
+        "sim_sched_no_fc": "Programados — sin pronóstico",
+        "sim_sched_with_fc": "Programados — con pronóstico",
+        "sim_xaxis": "Semana del año",
+        "sim_yaxis": "Número de operarios",
+        "mc_toggle": "🎲 Simular miles de años (Monte Carlo)",
+        "mc_paths": "Años simulados",
+        "mc_seed": "Semilla",
+        "mc_p5": "Ahorro P5",
+        "mc_p50": "Ahorro P50",
+        "mc_p95": "Ahorro P95",
+        "mc_prob_negative": "Prob. de ahorro negativo",
+        "mc_caption": "Ahorro medio en {n} años simulados: €{mean} ± €{se} (error estándar).",
+        "mc_adaptive": "Parar al alcanzar la precisión",
+        "mc_adaptive_help": (
+            "Simula por lotes hasta que el intervalo de confianza del 95% del ahorro medio sea más estrecho "
+            "que la precisión indicada, o hasta agotar el máximo de años o 30 segundos."
+        ),
+        "mc_precision": "Precisión (± €)",
+        "mc_max_paths": "Máximo de años simulados",
+        "mc_progress_adaptive": "Simulados {done} años; intervalo del 95% ± €{hw} (objetivo ± €{target}).",
+        "mc_stopped_precision": "Se detuvo al alcanzar ± €{hw} (95%).",
+        "mc_stopped_time_budget": "Se detuvo por tiempo con ± €{hw} (95%).",
+        "mc_stopped_paths": "Alcanzó el máximo de años con ± €{hw} (95%).",
+        "mc_variance_reduction": "Con este muestreo equivale a unas {factor}× más simulaciones independientes.",
+        "mc_sampling": "Muestreo",
+        "mc_sampling_help": (
+            "Cómo se generan los años aleatorios. Con números aleatorios comunes ambos escenarios comparten "
+            "el mismo error de plantilla; Sobol reparte además los años de forma uniforme en cada periodo, "
+            "así el ahorro medio se estabiliza con muchos menos años."
+        ),
+        "sampling_independent": "Independiente",
+        "sampling_crn": "Números aleatorios comunes",
+        "sampling_antithetic": "Comunes + antitéticos",
+        "sampling_sobol": "Comunes + cuasi-aleatorio (Sobol)",
+        "mc_starting": "Iniciando la simulación…",
+        "mc_progress": "Simulados {done} de {n} años; la estimación se afina a medida que avanza.",
+        "conv_band": "P5–P95 de los años simulados",
+        "conv_ci": "Intervalo de confianza del 95% de la media",
+        "conv_mean": "Ahorro medio",
+        "conv_yaxis": "Ahorro anual (€)",
+        "fan_band": "P{lo}–P{hi} operarios necesarios",
+        "fan_median": "Mediana de operarios necesarios",
+        "fan_caption": "Rango de operarios necesarios en {n} años simulados.",
+        "opt_title": "🎯 ¿Cuántos operarios debería programar cada semana?",
+        "opt_explainer": (
+            "Con la demanda esperada y tus costes, esta es la plantilla que minimiza el coste esperado "
+            "de cada semana: personal ocioso, horas extra y penalizaciones SLA."
+        ),
+        "opt_mean": "Necesidad media",
+        "opt_staff": "Plantilla óptima",
+        "opt_cost_optimal": "Coste anual esperado (óptimo)",
+        "opt_cost_at_mean": "Coste anual esperado (programando la media)",
+        "sens_title": "¿Cuánto importa la precisión del pronóstico?",
+        "sens_explainer": (
+            "Este gráfico muestra cómo cambia tu desperdicio anual a medida que mejora la precisión del personal. "
+            "Cuanto más a la derecha estés, peores son tus estimaciones — y más dinero pierdes. "
+            "Los dos puntos muestran dónde estás <b>hoy</b> (sin pronóstico) y dónde <b>podrías estar</b>."
+        ),
+        "sens_today": "  Hoy: €{val}",
+        "sens_with_fc": "  Con pronóstico: €{val}",
+        "sens_no_fc_legend": "Sin pronóstico",
+        "sens_with_fc_legend": "Con pronóstico",
+        "sens_arrow": "<b>Ahorras €{val}/año</b>",
+        "sens_xaxis": "Error de personal (%)",
+        "sens_yaxis": "Desperdicio anual (€)",
+        "sens_resolution": "Resolución del barrido (puntos por eje)",
+        "sweep_title": "¿Y si cambian también las penalizaciones o las horas extra?",
+        "sweep_explainer": (
+            "Cada celda es el desperdicio anual para una combinación de error de personal y "
+            "el parámetro elegido. Los puntos muestran tu situación hoy y con pronóstico."
+        ),
+        "sweep_param": "Comparar el error de personal con",
+        "sweep_param_sla": "Penalización SLA por semana (€)",
+        "sweep_param_ot": "Multiplicador de horas extra",
+        "conclusion_title": "En resumen",
+        "conclusion_body": (
+            'Un almacén que mueve <b>{units_per_week} unidades/semana</b> sin un pronóstico de demanda '
+            'desperdicia aproximadamente <b style="color:{red};">€{waste}/año</b> en '
+            'operarios ociosos, horas extra y penalizaciones SLA.<br><br>'
+            'Un pronóstico con <b>{accuracy}% de precisión</b> reduce eso a '
+            '<b style="color:{green};">€{reduced}/año</b> — '
+            'ahorrándote <b style="color:{green};">€{savings}</b> cada año.'
+        ),
+        "conclusion_cta": "<b>La solución no es más gente. Es mejor información.</b>",
+        "batch_title": "📁 Modo cartera: calcula muchos almacenes a la vez",
+        "batch_explainer": (
+            "Sube un CSV o Parquet con una fila por almacén y las columnas "
+            "<code>{columns}</code>. Cada almacén se calcula sin y con pronóstico."
+        ),
+        "batch_upload": "Archivo de almacenes",
+        "batch_sites": "Almacenes",
+        "batch_no_fc": "Desperdicio sin pronóstico",
+        "batch_with_fc": "Desperdicio con pronóstico",
+        "batch_savings": "Ahorro anual total",
+        "batch_download": "Descargar resultados (CSV)",
+        "ws_title": "🧪 Compara tus propios escenarios",
+        "ws_explainer": (
+            "Define tantos escenarios como quieras con su error de personal, salario, horas extra y "
+            "penalización SLA. El volumen del almacén es el de la barra lateral. Al editar una fila solo "
+            "se recalcula ese escenario."
+        ),
+        "ws_name": "Escenario",
+        "ws_misallocation": "Error de personal (%)",
+        "ws_recomputed": "Recalculados {n} de {total} escenarios.",
+        "ws_duplicate_names": "Cada escenario necesita un nombre distinto. Repetidos: {names}.",
+        "ws_default_no_fc": "Sin previsión",
+        "ws_default_with_fc": "Con previsión",
+        "footer": (
+            "Desarrollado por [HireRobots](https://www.linkedin.com/company/hirerobots) — "
+            "convirtiendo la planificación reactiva en planificación inteligente con pronóstico de demanda."
+        ),
+    },
+    "en": {
+        "lang_label": "🌐 Idioma / Language",
+        "page_title": "📦 How much does poor staffing planning cost you?",
+        "page_subtitle": (
+            "Adjust the numbers in the sidebar to match your operation. "
+            "Discover exactly how much money you lose without a demand forecast — "
+            "and how much you save with one."
+        ),
+        "sidebar_warehouse": "Your Warehouse",
+        "units_per_week": "Units moved per week",
+        "units_per_week_help": "Total units (picks, packs, shipments) your warehouse handles weekly.",
+        "units_per_worker": "Units handled per worker per week",
+        "units_per_worker_help": "Average productivity of a full-time warehouse worker.",
+        "sidebar_labor": "Labor Costs",
+        "hourly_rate": "Hourly wage (€)",
+        "hours_per_week": "Hours per week",
+        "overtime_mult": "Overtime multiplier",
+        "overtime_mult_help": "E.g.: 1.25 means overtime costs 25% more than regular hours.",
+        "sidebar_accuracy": "Staffing Accuracy",
+        "error_no_fc": "Staffing error WITHOUT forecast (%)",
+        "error_no_fc_help": "How much your staffing deviates from actual need in a typical week, without a demand forecast.",
+        "error_with_fc": "Staffing error WITH forecast (%)",
+        "error_with_fc_help": "How much your staffing deviates when using a good demand forecast.",
+        "backtest_file": "Forecast backtest (CSV, optional)",
+        "backtest_help": "Actual demand and forecast per period: 'actual' and 'forecast' columns, optionally 'series' and 'date'. Without 'forecast' a moving average is backtested. The simulation resamples these errors instead of the normal error.",
+        "backtest_summary": "Bias {bias:+.1%} · MAPE {mape:.1%} · P5–P95 {p5:+.1%} to {p95:+.1%} · autocorrelation {acf:.2f} · ≈{misalloc:.0f}% error equivalent. Simulated charts and the simulated cost model use these errors; the analytic model keeps using the slider.",
+        "sidebar_penalties": "Penalties",
+        "sla_penalty": "SLA penalty per missed week (€)",
+        "sla_penalty_help": "Average penalty cost when you miss targets due to understaffing.",
+        "sidebar_rules": "Labour rules",
+        "rules_toggle": "Piecewise costs",
+        "rules_help": "Overtime capped per worker, then agency tiers at rising premiums; only what is left uncovered misses SLA.",
+        "overtime_cap": "Overtime cap (h/worker/week)",
+        "agency_workers": "Agency {n}: workers",
+        "agency_mult": "Agency {n}: multiplier",
+        "min_shift": "Minimum shift (workers)",
+        "hiring_lead": "Hiring lead time (weeks)",
+        "ramp_weeks": "Productivity ramp-up (weeks)",
+        "ramp_weeks_help": "Weeks until a new hire is fully productive. Simulation only.",
+        "sidebar_model": "Cost Model",
+        "cost_model_analytic": "Quick approximation",
+        "cost_model_simulated": "Week-by-week simulation",
+        "cost_model_surface": "Precomputed simulation (instant)",
+        "cost_model_help": (
+            "The quick approximation assumes half of the error is overstaffing and half understaffing. "
+            "The simulation costs every staffing gap over thousands of simulated years. The precomputed "
+            "simulation interpolates a grid simulated once per granularity and demand, so the controls "
+            "respond instantly."
+        ),
+        "surface_exact": "Simulate these exact values",
+        "surface_caption": "Interpolated from the precomputed simulation.",
+        "surface_exact_caption": "Exact simulation of these values.",
+        "surface_rules_caption": "Labour rules need the full simulation.",
+        "surface_small_caption": "Sites needing fewer than {workers} workers use the full simulation.",
+        "granularity": "Simulation granularity",
+        "granularity_help": "Length of each simulated period. Overtime and idle cost are computed per period.",
+        "granularity_weekly": "Weekly (52)",
+        "granularity_daily": "Daily (364)",
+        "granularity_shift": "Per shift (3 × 364)",
+        "granularity_hourly": "Hourly (8760)",
+        "sidebar_demand": "Demand",
+        "seasonality": "Seasonality",
+        "seasonality_flat": "No seasonality",
+        "seasonality_retail_peak": "Retail peak (Nov–Dec)",
+        "seasonality_summer_peak": "Summer peak",
+        "seasonality_upload": "Upload history…",
+        "seasonality_upload_file": "Demand history (CSV)",
+        "seasonality_upload_help": "One year of demand, one row per period, in a 'demand' column or the first column.",
+        "trend": "Annual trend (%)",
+        "ar1": "Week-to-week autocorrelation",
+        "ar1_help": "0 = independent weeks. Higher values make busy weeks come in runs.",
+        "peak_promotions": "Black Friday and Christmas spikes",
+        "banner_with_forecast": "With a demand forecast you save",
+        "banner_per_year": "/ year",
+        "banner_monthly": "That's <b>€{monthly}</b> every month back into your margin.",
+        "context_text": (
+            'Your warehouse moves <b>{units_per_week} units/week</b>. '
+            'That requires roughly <b>{workers:.0f} workers</b>. '
+            'Without a forecast, staffing deviates ~<b>{misalloc}%</b> — '
+            "that's <b>{over:.0f} extra workers</b> in slow weeks "
+            'and <b>{under:.0f} too few</b> in peak weeks.'
+        ),
+        "where_money_goes": "Where does the money go?",
+        "no_forecast": "❌ Without Forecast",
+        "with_forecast": "✅ With Forecast ({accuracy}% accuracy)",
+        "staff_error": "Staffing error: <b>{pct}%</b>",
+        "workers_over": '<b>{n:.0f}</b> extra workers in slow weeks',
+        "per_month_wasted": "/mo wasted",
+        "workers_under": '<b>{n:.0f}</b> too few in peak weeks → overtime at {mult}×',
+        "per_month_extra": "/mo extra",
+        "sla_penalties": "SLA Penalties",
+        "per_month": "/mo",
+        "annual_waste_total": "Total annual waste:",
+        "bar_title": "Annual Cost Breakdown: Before vs After Forecast",
+        "bar_explainer": (
+            "Each bar shows where labor waste comes from. "
+            "The <b style='color:#E74C3C'>red bar</b> is your cost today without a forecast. "
+            "The <b style='color:#27AE60'>green bar</b> is your cost with a demand forecast. "
+            "The difference is money you keep."
+        ),
+        "bar_cat_idle": "Idle workers<br>(overstaffing)",
+        "bar_cat_overtime": "Overtime<br>premiums",
+        "bar_cat_sla": "SLA<br>Penalties",
+        "bar_legend_no_fc": "Without Forecast",
+        "bar_legend_with_fc": "With Forecast",
+        "bar_yaxis": "Annual Cost (€)",
+        "sim_title": "What a typical year looks like — Week by week",
+        "sim_explainer": (
+            "This simulation shows 52 weeks of staffing planning. "
+            "The <b>dashed black line</b> is how many workers you actually needed. "
+            "The <b style='color:#E74C3C'>red line</b> is what you'd schedule without a forecast (guessing). "
+            "The <b style='color:#27AE60'>green line</b> is what you'd schedule with a forecast. "
+            "Every gap between the lines is money lost."
+        ),
+        "sim_waste_no_fc": "Waste (without forecast)",
+        "sim_waste_with_fc": "Waste (with forecast)",
+        "sim_actual": "Workers actually needed",
+        "sim_sched_no_fc": "Scheduled — without forecast",
+        "sim_sched_with_fc": "Scheduled — with forecast",
+        "sim_xaxis": "Week of year",
+        "sim_yaxis": "Number of workers",
+        "mc_toggle": "🎲 Simulate thousands of years (Monte Carlo)",
+        "mc_paths": "Simulated years",
+        "mc_seed": "Seed",
+        "mc_p5": "P5 savings",
+        "mc_p50": "P50 savings",
+        "mc_p95": "P95 savings",
+        "mc_prob_negative": "Prob. of negative savings",
+        "mc_caption": "Mean savings over {n} simulated years: €{mean} ± €{se} (standard error).",
+        "mc_adaptive": "Stop at target precision",
+        "mc_adaptive_help": (
+            "Simulates in batches until the 95% confidence interval of the mean savings is narrower than "
+            "the precision, or the maximum years or 30 seconds are reached."
+        ),
+        "mc_precision": "Precision (± €)",
+        "mc_max_paths": "Maximum simulated years",
+        "mc_progress_adaptive": "Simulated {done} years; 95% interval ± €{hw} (target ± €{target}).",
+        "mc_stopped_precision": "Stopped on reaching ± €{hw} (95%).",
+        "mc_stopped_time_budget": "Stopped by the time limit at ± €{hw} (95%).",
+        "mc_stopped_paths": "Reached the maximum years at ± €{hw} (95%).",
+        "mc_variance_reduction": "This sampling is worth about {factor}× as many independent years.",
+        "mc_sampling": "Sampling",
+        "mc_sampling_help": (
+            "How the random years are drawn. With common random numbers both scenarios share the same "
+            "staffing error; Sobol also spreads the years evenly within every period, so the mean savings "
+            "settle with far fewer years."
+        ),
+        "sampling_independent": "Independent",
+        "sampling_crn": "Common random numbers",
+        "sampling_antithetic": "Common + antithetic",
+        "sampling_sobol": "Common + quasi-random (Sobol)",
+        "mc_starting": "Starting the simulation…",
+        "mc_progress": "Simulated {done} of {n} years; the estimate tightens as it runs.",
+        "conv_band": "P5–P95 of simulated years",
+        "conv_ci": "95% confidence interval of the mean",
+        "conv_mean": "Mean savings",
+        "conv_yaxis": "Annual savings (€)",
+        "fan_band": "P{lo}–P{hi} workers needed",
+        "fan_median": "Median workers needed",
+        "fan_caption": "Range of workers needed over {n} simulated years.",
+        "opt_title": "🎯 How many workers should you schedule each week?",
+        "opt_explainer": (
+            "Given the expected demand and your costs, this is the headcount that minimizes each week's "
+            "expected cost of idle workers, overtime and SLA penalties."
+        ),
+        "opt_mean": "Average need",
+        "opt_staff": "Optimal headcount",
+        "opt_cost_optimal": "Expected annual cost (optimal)",
+        "opt_cost_at_mean": "Expected annual cost (scheduling the average)",
+        "sens_title": "How much does forecast accuracy matter?",
+        "sens_explainer": (
+            "This chart shows how your annual waste changes as staffing accuracy improves. "
+            "The further right you are, the worse your estimates — and the more money you lose. "
+            "The two dots show where you are <b>today</b> (no forecast) and where you <b>could be</b>."
+        ),
+        "sens_today": "  Today: €{val}",
+        "sens_with_fc": "  With forecast: €{val}",
+        "sens_no_fc_legend": "Without forecast",
+        "sens_with_fc_legend": "With forecast",
+        "sens_arrow": "<b>You save €{val}/year</b>",
+        "sens_xaxis": "Staffing error (%)",
+        "sens_yaxis": "Annual waste (€)",
+        "sens_resolution": "Sweep resolution (points per axis)",
+        "sweep_title": "What if penalties or overtime change too?",
+        "sweep_explainer": (
+            "Each cell is the annual waste for one combination of staffing error and "
+            "the chosen parameter. The dots show where you are today and with a forecast."
+        ),
+        "sweep_param": "Compare staffing error against",
+        "sweep_param_sla": "SLA penalty per week (€)",
+        "sweep_param_ot": "Overtime multiplier",
+        "conclusion_title": "In summary",
+        "conclusion_body": (
+            'A warehouse moving <b>{units_per_week} units/week</b> without a demand forecast '
+            'wastes roughly <b style="color:{red};">€{waste}/year</b> on '
+            'idle workers, overtime, and SLA penalties.<br><br>'
+            'A forecast with <b>{accuracy}% accuracy</b> reduces that to '
+            '<b style="color:{green};">€{reduced}/year</b> — '
+            'saving you <b style="color:{green};">€{savings}</b> every year.'
+        ),
+        "conclusion_cta": "<b>The solution isn't more people. It's better information.</b>",
+        "batch_title": "📁 Portfolio mode: cost many warehouses at once",
+        "batch_explainer": (
+            "Upload a CSV or Parquet file with one row per warehouse and the columns "
+            "<code>{columns}</code>. Every warehouse is costed without and with a forecast."
+        ),
+        "batch_upload": "Warehouses file",
+        "batch_sites": "Warehouses",
+        "batch_no_fc": "Waste without forecast",
+        "batch_with_fc": "Waste with forecast",
+        "batch_savings": "Total annual savings",
+        "batch_download": "Download results (CSV)",
+        "ws_title": "🧪 Compare your own scenarios",
+        "ws_explainer": (
+            "Define as many scenarios as you like with their own staffing error, wage, overtime and SLA "
+            "penalty. Warehouse volume comes from the sidebar. Editing a row recomputes only that scenario."
+        ),
+        "ws_name": "Scenario",
+        "ws_misallocation": "Staffing error (%)",
+        "ws_recomputed": "Recomputed {n} of {total} scenarios.",
+        "ws_duplicate_names": "Each scenario needs its own name. Repeated: {names}.",
+        "ws_default_no_fc": "No forecast",
+        "ws_default_with_fc": "With forecast",
+        "footer": (
+            "Built by [HireRobots](https://www.linkedin.com/company/hirerobots) — "
+            "turning reactive planning into smart planning with demand forecasting."
+        ),
+    },
+}
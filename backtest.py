@@ -0,0 +1,193 @@
+"""Forecast-error model from historical backtests.
+
+A backtest file has one row per series and period:
+
+    series,date,actual,forecast
+    DC-North,2024-01-01,5120,4980
+
+``series`` and ``date`` are optional, and ``demand`` is accepted for
+``actual``. Without a ``forecast`` column each period is forecast by the
+moving average of the ``window`` periods before it, a naive baseline.
+Series become the rows of one ``(n_series, n_periods)`` array, padded
+with NaN, and every statistic is a sliding-window or whole-array
+operation, so years of daily data for hundreds of sites take well under a
+second.
+
+The relative errors ``forecast / actual - 1`` are registered under a hash
+of their contents, like uploaded seasonalities, and named in a demand
+profile as ``"forecast_error"``. The simulation then staffs the
+with-forecast scenario at ``actual_needed * (1 + error)``, resampling the
+errors in blocks of consecutive periods. This keeps their bias, skew and
+autocorrelation, which the symmetric normal error does not.
+
+    python backtest.py backtest.csv --window 28
+"""
+import argparse
+import hashlib
+import json
+import sys
+
+import numpy as np
+
+QUANTILES = (5, 25, 50, 75, 95)
+# Periods in the moving-average baseline and in each rolling MAPE window.
+DEFAULT_WINDOW = 28
+# Consecutive errors per resampled block; their autocorrelation survives
+# within a block.
+BLOCK_LENGTH = 8
+
+ERROR_MODELS = {}
+
+
+def _pivot(values, series=None, date=None) -> np.ndarray:
+    """Long-format ``values`` as ``(n_series, n_periods)``, in date order, NaN-padded.
+
+    ``series`` holds integer series codes; ``date`` anything sortable.
+    """
+    n = len(values)
+    series = np.zeros(n, dtype=np.intp) if series is None else series
+    order = np.lexsort((np.arange(n) if date is None else date, series))
+    series = series[order]
+    position = np.arange(n) - np.searchsorted(series, series)
+    out = np.full((series[-1] + 1, position.max() + 1), np.nan)
+    out[series, position] = values[order]
+    return out
+
+
+def load_backtest(source) -> dict:
+    """Read a backtest CSV into ``{"actual": array, "forecast": array or None}``."""
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+
+    table = pa_csv.read_csv(source)
+    names = table.column_names
+
+    actual = "actual" if "actual" in names else "demand"
+    if actual not in names:
+        raise ValueError("A backtest needs an 'actual' (or 'demand') column")
+    # Encoded and ranked in arrow; numpy is much slower on string columns.
+    series = date = forecast = None
+    if "series" in names:
+        series = table.column("series").combine_chunks().dictionary_encode().indices.to_numpy()
+    if "date" in names:
+        date = pc.rank(table.column("date")).to_numpy()
+    if "forecast" in names:
+        forecast = table.column("forecast").to_numpy().astype(float)
+    return {
+        "actual": _pivot(table.column(actual).to_numpy().astype(float), series, date),
+        "forecast": None if forecast is None else _pivot(forecast, series, date),
+    }
+
+
+def _window_counts(values, window):
+    """Sum and number of finite values in every run of ``window`` periods (axis 1)."""
+    finite = np.isfinite(values)
+    sums = np.cumsum(np.where(finite, values, 0), axis=1)
+    counts = np.cumsum(finite, axis=1)
+    sums = np.pad(sums, ((0, 0), (1, 0)))
+    counts = np.pad(counts, ((0, 0), (1, 0)))
+    return sums[:, window:] - sums[:, :-window], counts[:, window:] - counts[:, :-window]
+
+
+def _window_mean(values, window) -> np.ndarray:
+    """Mean of every complete run of ``window`` periods; NaN where one is missing."""
+    sums, counts = _window_counts(values, window)
+    return np.where(counts == window, sums / window, np.nan)
+
+
+def moving_average_forecast(actual, window=DEFAULT_WINDOW) -> np.ndarray:
+    """Each period forecast as the mean of the ``window`` before it."""
+    forecast = np.full(actual.shape, np.nan)
+    if actual.shape[1] > window:
+        forecast[:, window:] = _window_mean(actual, window)[:, :-1]
+    return forecast
+
+
+def backtest(actual, forecast=None, window=DEFAULT_WINDOW) -> dict:
+    """Relative errors of ``forecast`` against ``actual`` and their statistics.
+
+    Both arrays are ``(n_series, n_periods)``. Periods without a positive
+    actual or without a forecast are left out. ``bias`` and ``mape`` are
+    fractions; ``autocorrelation`` is the lag-1 autocorrelation within a
+    series; ``window_mape`` holds quantiles of the MAPE over rolling
+    ``window``-period windows; ``misallocation_equivalent`` is the
+    with-forecast slider value with the same spread.
+    """
+    if forecast is None:
+        forecast = moving_average_forecast(actual, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        errors = np.where(actual > 0, forecast / actual - 1, np.nan)
+    finite = np.isfinite(errors)
+    valid = errors[finite]
+    if valid.size == 0:
+        raise ValueError("No period has both a positive actual and a forecast")
+
+    series_mean = np.where(finite, errors, 0).sum(axis=1) / np.maximum(finite.sum(axis=1), 1)
+    centred = errors - series_mean[:, np.newaxis]
+    variance = np.nansum(centred ** 2)
+    lagged = np.nansum(centred[:, 1:] * centred[:, :-1])
+
+    window_mape = _window_mean(np.abs(errors), window) if errors.shape[1] >= window else np.empty((0, 0))
+    window_mape = window_mape[np.isfinite(window_mape)]
+    return {
+        "errors": errors.astype(np.float32),
+        "n_series": errors.shape[0],
+        "n_errors": int(valid.size),
+        "bias": float(valid.mean()),
+        "mape": float(np.abs(valid).mean()),
+        "quantiles": dict(zip(QUANTILES, np.percentile(valid, QUANTILES).tolist())),
+        "autocorrelation": float(lagged / variance) if variance > 0 else 0.0,
+        "window_mape": dict(zip(QUANTILES, np.percentile(window_mape, QUANTILES).tolist()))
+        if window_mape.size else {},
+        "misallocation_equivalent": float(valid.std() * 200),
+    }
+
+
+def register_errors(errors, block_length=BLOCK_LENGTH) -> str:
+    """Make a backtest's ``(n_series, n_periods)`` errors resamplable; returns their name."""
+    errors = np.ascontiguousarray(errors, dtype=np.float32)
+    name = "backtest:" + hashlib.sha1(errors.tobytes()).hexdigest()[:12]
+    if name not in ERROR_MODELS:
+        length = min(block_length, errors.shape[1])
+        # Blocks may start wherever ``length`` consecutive errors are known.
+        complete = _window_counts(errors, length)[1] == length
+        series, start = np.nonzero(complete)
+        if series.size == 0:
+            raise ValueError(f"The backtest has no {length} consecutive errors to resample")
+        ERROR_MODELS[name] = {
+            "errors": errors.ravel(),
+            "starts": series * errors.shape[1] + start,
+            "length": length,
+        }
+    return name
+
+
+def resample(rng, name, n_paths, n_buckets) -> np.ndarray:
+    """Relative errors ``(n_paths, n_buckets)``: random blocks of a backtest, end to end.
+
+    ``rng`` may be a ``Generator`` or a legacy ``RandomState``. Errors are
+    used at the backtest's own resolution, one per bucket.
+    """
+    model = ERROR_MODELS[name]
+    length = model["length"]
+    n_blocks = -(-n_buckets // length)
+    picks = (rng.random(n_paths * n_blocks) * model["starts"].size).astype(np.intp)
+    index = model["starts"][picks][:, np.newaxis] + np.arange(length)
+    return model["errors"][index].reshape(n_paths, n_blocks * length)[:, :n_buckets]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast-error statistics from a backtest file.")
+    parser.add_argument("backtest", help="CSV with actual (or demand) and optionally series, date, forecast")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                        help="baseline moving average and rolling MAPE window (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    report = backtest(**load_backtest(args.backtest), window=args.window)
+    del report["errors"]
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Portfolio mode: cost many warehouses from a CSV/Parquet file.
+
+Each row is one site with the same inputs as the app sidebar. The file is
+streamed in chunks, every chunk is costed in one vectorized engine call for
+both scenarios (no forecast vs with forecast), and per-site results are
+written column-wise to the output file while portfolio totals accumulate.
+
+    python batch.py sites.csv results.parquet
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+import engine
+
+# pyarrow is imported where it is used, so importing this module for its
+# column lists (as the app does) stays cheap.
+
+INPUT_COLUMNS = (
+    "units_per_week",
+    "units_per_worker_per_week",
+    "hourly_rate",
+    "hours_per_week",
+    "overtime_multiplier",
+    "misallocation_no_forecast",
+    "misallocation_with_forecast",
+    "sla_penalty_per_miss",
+)
+RESULT_FIELDS = (
+    "annual_overstaffing",
+    "annual_overtime",
+    "annual_sla",
+    "annual_total",
+)
+TOTAL_FIELDS = ("no_fc_annual_total", "with_fc_annual_total", "annual_savings")
+
+DEFAULT_CHUNK_ROWS = 250_000
+# CSV is chunked by bytes; this turns a row budget into a block size.
+_CSV_BYTES_PER_ROW = 64
+
+
+def _file_format(name) -> str:
+    suffix = Path(str(name)).suffix.lower()
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    if suffix == ".csv":
+        return "csv"
+    raise ValueError(f"Unsupported file type {suffix!r}; use .csv or .parquet")
+
+
+def iter_chunks(source, chunk_rows=DEFAULT_CHUNK_ROWS, fmt=None):
+    """Yield ``pyarrow.RecordBatch`` chunks from a CSV or Parquet source."""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    fmt = fmt or _file_format(getattr(source, "name", source))
+    if fmt == "parquet":
+        yield from pq.ParquetFile(source).iter_batches(batch_size=chunk_rows)
+        return
+    read_options = pa_csv.ReadOptions(block_size=max(chunk_rows * _CSV_BYTES_PER_ROW, 1 << 16))
+    # Pin input types so a later block can't disagree with the first one.
+    convert_options = pa_csv.ConvertOptions(column_types={c: pa.float64() for c in INPUT_COLUMNS})
+    yield from pa_csv.open_csv(source, read_options=read_options, convert_options=convert_options)
+
+
+def cost_chunk(batch):
+    """Cost both scenarios for every site in a ``pyarrow.RecordBatch``."""
+    import pyarrow as pa
+
+    missing = [c for c in INPUT_COLUMNS if c not in batch.schema.names]
+    if missing:
+        raise ValueError(f"Missing input columns: {', '.join(missing)}")
+
+    cols = {
+        c: batch.column(c).to_numpy(zero_copy_only=False).astype(float, copy=False)
+        for c in INPUT_COLUMNS
+    }
+    common = (
+        cols["units_per_week"],
+        cols["units_per_worker_per_week"],
+        cols["hourly_rate"],
+        cols["hours_per_week"],
+        cols["overtime_multiplier"],
+    )
+    no_fc = engine.scenario_costs(*common, cols["misallocation_no_forecast"], cols["sla_penalty_per_miss"])
+    with_fc = engine.scenario_costs(*common, cols["misallocation_with_forecast"], cols["sla_penalty_per_miss"])
+
+    out = {name: batch.column(name) for name in batch.schema.names}
+    for field in RESULT_FIELDS:
+        out[f"no_fc_{field}"] = no_fc[field]
+        out[f"with_fc_{field}"] = with_fc[field]
+    out["annual_savings"] = no_fc["annual_total"] - with_fc["annual_total"]
+    return pa.RecordBatch.from_pydict(out)
+
+
+class _Writer:
+    def __init__(self, sink, fmt):
+        self.sink = sink
+        self.fmt = fmt
+        self._writer = None
+
+    def write(self, batch):
+        if self._writer is None:
+            if self.fmt == "parquet":
+                import pyarrow.parquet as pq
+
+                self._writer = pq.ParquetWriter(self.sink, batch.schema)
+            else:
+                import pyarrow.csv as pa_csv
+
+                self._writer = pa_csv.CSVWriter(self.sink, batch.schema)
+        self._writer.write_batch(batch)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def run_portfolio(source, sink, chunk_rows=DEFAULT_CHUNK_ROWS, source_fmt=None, sink_fmt=None) -> dict:
+    """Stream ``source`` through the cost model into ``sink``.
+
+    Only one chunk is held in memory at a time. Returns portfolio totals.
+    """
+    sink_fmt = sink_fmt or _file_format(getattr(sink, "name", sink))
+    totals = dict.fromkeys(TOTAL_FIELDS, 0.0)
+    totals["sites"] = 0
+
+    writer = _Writer(sink, sink_fmt)
+    try:
+        for batch in iter_chunks(source, chunk_rows, source_fmt):
+            result = cost_chunk(batch)
+            writer.write(result)
+            for field in TOTAL_FIELDS:
+                totals[field] += float(np.sum(result.column(field).to_numpy()))
+            totals["sites"] += result.num_rows
+    finally:
+        writer.close()
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cost a portfolio of warehouses from a CSV/Parquet file.")
+    parser.add_argument("input", help="sites file (.csv or .parquet)")
+    parser.add_argument("output", help="per-site results file (.csv or .parquet)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="rows per streamed chunk (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    totals = run_portfolio(args.input, args.output, chunk_rows=args.chunk_rows)
+    json.dump(totals, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""Rerun-latency benchmarks for the pieces app.py recomputes.
+
+Times the cost model, the sensitivity sweeps, the seeded simulation and the
+Monte Carlo, and building + serializing the page's figures, each over
+scaled inputs. Results can be saved as a baseline and later runs compared
+against it:
+
+    python bench.py --save bench_baseline.json
+    python bench.py --compare bench_baseline.json     # exit code 1 on regression
+    python bench.py -k fig_sim                        # only matching cases
+    python bench.py --startup -k startup              # cold start of the page
+    python bench.py --memory -k memory                # Monte Carlo peak RSS
+
+Every case reports the best of ``--repeat`` timings, which is the most
+stable estimate on a shared machine. ``--startup`` adds the page's first
+run and a rerun, each timed in a fresh interpreter. ``--memory`` adds the
+peak RSS of Monte Carlo runs of growing size, each in a fresh interpreter,
+less the per-path results they return: the working memory, which should
+not grow with the path count.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+import numpy as np
+import plotly.io as pio
+
+import charts
+import engine
+import simulation
+import surface
+
+# Sidebar defaults.
+INPUTS = {
+    "units_per_week": 30_000,
+    "units_per_worker_per_week": 600,
+    "hourly_rate": 12.50,
+    "hours_per_week": 40,
+    "overtime_multiplier": 1.25,
+    "misallocation_no_forecast": 20,
+    "misallocation_with_forecast": 5,
+    "sla_penalty_per_miss": 500,
+}
+
+# Every piecewise labour rule on (see engine.LABOUR_RULES).
+RULES = {
+    "overtime_cap_hours": 8,
+    "agency_tiers": ((5, 1.5), (10, 2.0)),
+    "min_shift_workers": 40,
+    "hiring_lead_weeks": 2,
+    "ramp_weeks": 4,
+}
+
+SITES = (1, 10_000, 1_000_000)
+SWEEP_POINTS = (51, 251, 1001)
+PATHS = (1_000, 10_000)
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 1.25
+# Cases faster than this are too noisy to flag.
+MIN_FLAGGED_SECONDS = 50e-6
+# Working memory smaller than this is allocator noise.
+MIN_FLAGGED_BYTES = 2 ** 20
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+# Run in a fresh interpreter so nothing is imported or cached yet.
+STARTUP_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+start = time.perf_counter()
+app.run()
+first = time.perf_counter()
+app.run()
+json.dump({"first_run": first - start, "rerun": time.perf_counter() - first}, sys.stdout)
+"""
+MEMORY_PATHS = {"weekly": (10_000, 100_000, 1_000_000), "daily": (10_000, 100_000)}
+# Linux only: VmHWM is the peak RSS, reset to the current one through
+# clear_refs so that importing doesn't count.
+MEMORY_SCRIPT = """
+import json, sys
+import numpy as np
+import simulation
+def status(field):
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) * 1024 for line in f if line.startswith(field + ":"))
+inputs, n_paths, granularity = json.loads(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+with open("/proc/self/clear_refs", "w") as f:
+    f.write("5")
+before = status("VmRSS")
+mc = simulation.monte_carlo(*inputs, n_paths=n_paths, seed=0, granularity=granularity)
+peak = status("VmHWM")
+results = sum(value.nbytes for value in mc.values() if isinstance(value, np.ndarray))
+json.dump({"peak": peak, "working": peak - before - results}, sys.stdout)
+"""
+KERNEL_PATHS = (10_000, 100_000)
+# NumPy reports its array buffers to tracemalloc.
+KERNEL_SCRIPT = """
+import json, sys, tracemalloc
+import numpy as np
+import engine, simulation
+def peak_allocation(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+cost_args, n_paths = json.loads(sys.argv[1]), int(sys.argv[2])
+rng = np.random.default_rng(0)
+needed = rng.normal(50, 5, (n_paths, engine.WEEKS_PER_YEAR))
+staff = rng.normal(50, 5, (n_paths, engine.WEEKS_PER_YEAR))
+results = {field: np.empty(n_paths) for field in simulation.PATH_FIELDS}
+kernel = simulation.CostKernel(engine.WEEKS_PER_YEAR)
+json.dump({
+    "gap_costs": peak_allocation(lambda: simulation.gap_costs(needed, staff, *cost_args)),
+    "cost_kernel": peak_allocation(lambda: kernel(results, needed, staff, *cost_args)),
+}, sys.stdout)
+"""
+
+
+def _site_arrays(n_sites):
+    rng = np.random.default_rng(0)
+    scale = rng.uniform(0.5, 1.5, n_sites) if n_sites > 1 else 1.0
+    return {name: value * scale for name, value in INPUTS.items()}
+
+
+def _cost_args(inputs, misalloc):
+    return (
+        inputs["units_per_week"], inputs["units_per_worker_per_week"], inputs["hourly_rate"],
+        inputs["hours_per_week"], inputs["overtime_multiplier"], misalloc, inputs["sla_penalty_per_miss"],
+    )
+
+
+def _sensitivity_figure(points):
+    inputs = INPUTS
+    misalloc_range = np.linspace(0, 50, points)
+    totals = engine.annual_total(*_cost_args(inputs, misalloc_range))
+    no_fc = engine.scenario_costs(*_cost_args(inputs, inputs["misallocation_no_forecast"]))["annual_total"]
+    with_fc = engine.scenario_costs(*_cost_args(inputs, inputs["misallocation_with_forecast"]))["annual_total"]
+    return charts.sensitivity_figure(
+        misalloc_range, totals,
+        (inputs["misallocation_no_forecast"], no_fc), (inputs["misallocation_with_forecast"], with_fc),
+    )
+
+
+def _sweep_totals(points):
+    misalloc_range = np.linspace(0, 50, points)
+    sla_range = np.linspace(0, 50_000, points)
+    inputs = dict(INPUTS, sla_penalty_per_miss=sla_range[np.newaxis, :])
+    return engine.annual_total(*_cost_args(inputs, misalloc_range[:, np.newaxis]))
+
+
+def _simulation_figure(granularity):
+    sim = simulation.simulate_year(
+        INPUTS["units_per_week"], INPUTS["units_per_worker_per_week"],
+        INPUTS["misallocation_no_forecast"], INPUTS["misallocation_with_forecast"], granularity,
+    )
+    return charts.simulation_figure(sim["weeks"], sim["actual_needed"], sim["no_fc_staff"], sim["with_fc_staff"])
+
+
+def _bar_figure():
+    fields = ("annual_overstaffing", "annual_overtime", "annual_sla")
+    no_fc = engine.scenario_costs(*_cost_args(INPUTS, INPUTS["misallocation_no_forecast"]))
+    with_fc = engine.scenario_costs(*_cost_args(INPUTS, INPUTS["misallocation_with_forecast"]))
+    return charts.bar_figure([float(no_fc[f]) for f in fields], [float(with_fc[f]) for f in fields])
+
+
+def _serialize(fig):
+    # What st.plotly_chart ships to the browser.
+    return pio.to_json(fig, validate=False)
+
+
+def cases(pattern=""):
+    """``{name: zero-argument callable}`` of the cases whose name contains ``pattern``.
+
+    Setup runs here, outside the timing, and only for those cases.
+    """
+    out = {}
+    for n in SITES:
+        name = f"scenario_costs[sites={n}]"
+        if pattern in name:
+            inputs = _site_arrays(n)
+            args = _cost_args(inputs, inputs["misallocation_no_forecast"])
+            out[name] = lambda args=args: engine.scenario_costs(*args)
+
+    for points in SWEEP_POINTS:
+        out[f"sensitivity_1d[points={points}]"] = lambda p=points: engine.annual_total(
+            *_cost_args(INPUTS, np.linspace(0, 50, p))
+        )
+        out[f"sensitivity_2d[points={points}]"] = lambda p=points: _sweep_totals(p)
+
+    for granularity in simulation.GRANULARITIES:
+        out[f"simulate_year[{granularity}]"] = lambda g=granularity: simulation.simulate_year(
+            INPUTS["units_per_week"], INPUTS["units_per_worker_per_week"],
+            INPUTS["misallocation_no_forecast"], INPUTS["misallocation_with_forecast"], g,
+        )
+    for granularity in ("weekly", "daily"):
+        for n_paths in PATHS:
+            out[f"monte_carlo[{granularity},paths={n_paths}]"] = lambda g=granularity, n=n_paths: (
+                simulation.monte_carlo(*INPUTS.values(), n_paths=n, seed=simulation.SEED, granularity=g)
+            )
+        out[f"monte_carlo[{granularity},paths=10000,rules]"] = lambda g=granularity: simulation.monte_carlo(
+            *INPUTS.values(), n_paths=10_000, seed=simulation.SEED, granularity=g, rules=RULES,
+        )
+        for sampling in simulation.SAMPLINGS[1:]:
+            out[f"monte_carlo[{granularity},paths=10000,{sampling}]"] = lambda g=granularity, s=sampling: (
+                simulation.monte_carlo(
+                    *INPUTS.values(), n_paths=10_000, seed=simulation.SEED, granularity=g, sampling=s,
+                )
+            )
+        out[f"adaptive_monte_carlo[{granularity},precision=1000]"] = lambda g=granularity: (
+            simulation.adaptive_monte_carlo(*INPUTS.values(), seed=simulation.SEED, granularity=g)
+        )
+
+    out["surface[build,weekly]"] = surface.build
+    if pattern in "surface[lookup]":
+        out["surface[lookup]"] = lambda s=surface.build(): surface.lookup(
+            s, *_cost_args(INPUTS, INPUTS["misallocation_no_forecast"]), "no_fc",
+        )
+
+    out["fig_bar[build]"] = _bar_figure
+    if pattern in "fig_bar[json]" or pattern in "fig_bar[thaw]":
+        fig = _bar_figure()
+        out["fig_bar[json]"] = lambda fig=fig: _serialize(fig)
+        # What the app's figure caches return on a hit.
+        out["fig_bar[thaw]"] = lambda spec=charts.freeze(fig): charts.thaw(spec)
+    for granularity in simulation.GRANULARITIES:
+        out[f"fig_sim[build,{granularity}]"] = lambda g=granularity: _simulation_figure(g)
+        name = f"fig_sim[json,{granularity}]"
+        if pattern in name:
+            out[name] = lambda fig=_simulation_figure(granularity): _serialize(fig)
+    for points in SWEEP_POINTS:
+        out[f"fig_sens[build,points={points}]"] = lambda p=points: _sensitivity_figure(p)
+        name = f"fig_sens[json,points={points}]"
+        if pattern in name:
+            out[name] = lambda fig=_sensitivity_figure(points): _serialize(fig)
+    return {name: fn for name, fn in out.items() if pattern in name}
+
+
+def time_case(fn, repeat=DEFAULT_REPEAT) -> float:
+    """Best per-call time in seconds over ``repeat`` auto-ranged runs."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def _run_script(script, *args):
+    return json.loads(subprocess.run(
+        [sys.executable, "-c", script, *args], capture_output=True, check=True, text=True, cwd=os.path.dirname(APP),
+    ).stdout)
+
+
+def time_startup(repeat=DEFAULT_REPEAT) -> dict:
+    """Best first-run and rerun time of app.py, each sample in a new process."""
+    samples = [_run_script(STARTUP_SCRIPT, APP) for _ in range(repeat)]
+    return {f"startup[{phase}]": min(s[phase] for s in samples) for phase in ("first_run", "rerun")}
+
+
+def measure_memory(pattern="") -> dict:
+    """Working memory in bytes of each ``MEMORY_PATHS`` Monte Carlo run (see the module docstring).
+
+    Also the peak allocation of costing ``KERNEL_PATHS`` weekly paths at
+    once with ``simulation.gap_costs`` and with a ``simulation.CostKernel``
+    writing into preallocated results, likewise in a fresh interpreter.
+    Only the measurements whose name contains ``pattern`` are made.
+    """
+    out = {}
+    worker_cost = INPUTS["hourly_rate"] * INPUTS["hours_per_week"]
+    cost_args = json.dumps([worker_cost, INPUTS["overtime_multiplier"], INPUTS["sla_penalty_per_miss"]])
+    for n_paths in KERNEL_PATHS:
+        names = {name: f"memory[{name},paths={n_paths}]" for name in ("gap_costs", "cost_kernel")}
+        if not any(pattern in name for name in names.values()):
+            continue
+        for name, peak in _run_script(KERNEL_SCRIPT, cost_args, str(n_paths)).items():
+            out[names[name]] = peak
+    for granularity, sizes in MEMORY_PATHS.items():
+        for n_paths in sizes:
+            name = f"memory[{granularity},paths={n_paths}]"
+            if pattern in name:
+                sample = _run_script(MEMORY_SCRIPT, json.dumps(list(INPUTS.values())), str(n_paths), granularity)
+                out[name] = max(sample["working"], 0)
+    return {name: size for name, size in out.items() if pattern in name}
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, floor=MIN_FLAGGED_SECONDS) -> list:
+    """Names of the cases at least ``threshold`` times slower (or bigger) than the baseline.
+
+    Values under ``floor`` are never flagged.
+    """
+    return [
+        name for name, value in results.items()
+        if name in baseline
+        and value >= floor
+        and value > baseline[name] * threshold
+    ]
+
+
+def _format(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def _report(name, value, baseline, fmt=_format):
+    line = f"{name:<44} {fmt(value)}"
+    if baseline.get(name):
+        line += f"   x{value / baseline[name]:.2f} vs baseline"
+    print(line, flush=True)
+
+
+def _format_bytes(size):
+    return f"{size / 2 ** 20:8.2f} MB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the app's recomputed sections.")
+    parser.add_argument("-k", dest="pattern", default="", help="only run cases containing this text")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--save", metavar="PATH", help="write the results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="flag regressions against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown ratio counted as a regression (default: %(default)s)")
+    parser.add_argument("--startup", action="store_true", help="also time the page's cold start (slow)")
+    parser.add_argument("--memory", action="store_true", help="also measure Monte Carlo working memory (slow)")
+    args = parser.parse_args(argv)
+
+    baseline, baseline_memory = {}, {}
+    if args.compare:
+        with open(args.compare) as f:
+            saved = json.load(f)
+        baseline, baseline_memory = saved["results"], saved.get("memory", {})
+
+    results = {}
+    for name, fn in cases(args.pattern).items():
+        results[name] = time_case(fn, args.repeat)
+        _report(name, results[name], baseline)
+    if args.startup:
+        for name, seconds in time_startup(args.repeat).items():
+            if args.pattern in name:
+                results[name] = seconds
+                _report(name, seconds, baseline)
+    memory = {}
+    if args.memory:
+        for name, size in measure_memory(args.pattern).items():
+            memory[name] = size
+            _report(name, size, baseline_memory, _format_bytes)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {"python": platform.python_version(), "numpy": np.__version__, "results": results, "memory": memory},
+                f, indent=2,
+            )
+    regressions = compare(results, baseline, args.threshold)
+    regressions += compare(memory, baseline_memory, args.threshold, MIN_FLAGGED_BYTES)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over x{args.threshold}:", file=sys.stderr)
+        for name in regressions:
+            print(f"  {name}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,435 @@
+"""Plotly figures for the app.
+
+Figures are built from numbers only; every translated string is applied
+afterwards by the matching ``label_*`` function so a language switch is a
+cheap relabel of an already-built (and cached) figure.
+
+Long series go out as float32 NumPy arrays, which Plotly serializes as
+base64 typed arrays rather than JSON number lists, and are drawn with
+WebGL (``Scattergl``) once they pass ``GL_POINTS``.
+"""
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+RED = "#E74C3C"
+RED_LIGHT = "rgba(231,76,60,0.12)"
+GREEN = "#27AE60"
+GREEN_LIGHT = "rgba(39,174,96,0.12)"
+GREY = "#95A5A6"
+
+LEGEND = dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5)
+
+# plotly_white plus the layout every figure shares, built once per process.
+# Plotly applies the default template without validating it again, which
+# is most of the build time of a small figure.
+TEMPLATE = go.layout.Template(pio.templates["plotly_white"])
+TEMPLATE.layout.update(legend=LEGEND, margin=dict(t=60))
+pio.templates["staffing"] = TEMPLATE
+pio.templates.default = "staffing"
+
+# Longer traces are downsampled before they are sent to the browser.
+MAX_POINTS = 2_000
+# Traces with more points than this are drawn with WebGL.
+GL_POINTS = 1_000
+
+
+def freeze(fig: go.Figure) -> dict:
+    """Figure as a plain dict without the shared template, for caching.
+
+    A pickled Figure carries its template and validates it again on every
+    cache hit; ``thaw`` puts the default template back for free.
+    """
+    spec = fig.to_dict()
+    spec["layout"].pop("template", None)
+    return spec
+
+
+def thaw(spec: dict) -> go.Figure:
+    return go.Figure(spec)
+
+
+def _typed(values) -> np.ndarray:
+    """float32 array, sent to the browser as a base64 typed array."""
+    return np.ascontiguousarray(values, dtype=np.float32)
+
+
+def _scatter(x, y, **kwargs):
+    """``Scatter`` for short series, ``Scattergl`` for long ones."""
+    trace = go.Scattergl if len(x) > GL_POINTS else go.Scatter
+    return trace(x=_typed(x), y=_typed(y), **kwargs)
+
+
+def _binned(values, n_bins) -> np.ndarray:
+    """``values`` padded with its last element and reshaped to ``(n_bins, width)``."""
+    values = np.asarray(values)
+    width = -(-len(values) // n_bins)
+    return np.pad(values, (0, n_bins * width - len(values)), mode="edge").reshape(n_bins, width)
+
+
+def minmax_downsample(x, y, max_points=MAX_POINTS):
+    """Keep the min and max point of each bin, in order, so peaks survive."""
+    x, y = np.asarray(x), np.asarray(y)
+    if len(y) <= max_points:
+        return x, y
+    bins = _binned(y, max_points // 2)
+    offsets = np.arange(len(bins)) * bins.shape[1]
+    idx = np.sort(np.stack([offsets + bins.argmin(axis=1), offsets + bins.argmax(axis=1)], axis=1), axis=1)
+    idx = np.minimum(idx.ravel(), len(y) - 1)
+    return x[idx], y[idx]
+
+
+# ---------------------------------------------------------------------------
+# Bar chart: cost breakdown
+# ---------------------------------------------------------------------------
+def bar_figure(no_fc_vals, with_fc_vals) -> go.Figure:
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=no_fc_vals,
+        marker_color=RED,
+        text=[f"€{v:,.0f}" for v in no_fc_vals],
+        textposition="outside",
+        textfont=dict(size=14, color=RED),
+    ))
+    fig.add_trace(go.Bar(
+        y=with_fc_vals,
+        marker_color=GREEN,
+        text=[f"€{v:,.0f}" for v in with_fc_vals],
+        textposition="outside",
+        textfont=dict(size=14, color=GREEN),
+    ))
+    fig.update_layout(
+        barmode="group",
+        height=420,
+        font=dict(size=14),
+        legend=dict(font=dict(size=14)),
+    )
+    return fig
+
+
+def label_bar(fig: go.Figure, t: dict) -> go.Figure:
+    categories = [t["bar_cat_idle"], t["bar_cat_overtime"], t["bar_cat_sla"]]
+    fig.data[0].update(name=t["bar_legend_no_fc"], x=categories)
+    fig.data[1].update(name=t["bar_legend_with_fc"], x=categories)
+    fig.update_layout(yaxis_title=t["bar_yaxis"])
+    return fig
+
+
+# ---------------------------------------------------------------------------
+# Scenario workspace
+# ---------------------------------------------------------------------------
+def scenarios_figure(names, overstaffing, overtime, sla) -> go.Figure:
+    """Annual cost per named scenario, stacked by component."""
+    fig = go.Figure()
+    for values, color in ((overstaffing, RED), (overtime, "#E67E22"), (sla, GREY)):
+        fig.add_trace(go.Bar(x=names, y=values, marker_color=color))
+    totals = np.asarray(overstaffing) + overtime + sla
+    fig.add_trace(go.Scatter(
+        x=names, y=totals,
+        mode="text",
+        text=[f"€{v:,.0f}" for v in totals],
+        textposition="top center",
+        textfont=dict(size=13),
+        showlegend=False,
+        hoverinfo="skip",
+    ))
+    fig.update_layout(
+        barmode="stack",
+        height=420,
+        font=dict(size=13),
+        legend=dict(font=dict(size=13)),
+    )
+    return fig
+
+
+def label_scenarios(fig: go.Figure, t: dict) -> go.Figure:
+    for trace, key in zip(fig.data, ("bar_cat_idle", "bar_cat_overtime", "bar_cat_sla")):
+        trace.name = t[key]
+    fig.update_layout(yaxis_title=t["bar_yaxis"])
+    return fig
+
+
+# ---------------------------------------------------------------------------
+# Weekly simulation
+# ---------------------------------------------------------------------------
+def _gap_band(x, a, b, fillcolor) -> go.Scatter:
+    upper, lower = np.maximum(a, b), np.minimum(a, b)
+    if len(x) > MAX_POINTS:
+        # Downsample to the per-bin envelope so the band never shrinks.
+        n_bins = MAX_POINTS // 2
+        x = _binned(x, n_bins).mean(axis=1)
+        upper = _binned(upper, n_bins).max(axis=1)
+        lower = _binned(lower, n_bins).min(axis=1)
+    return _scatter(
+        np.concatenate([x, x[::-1]]),
+        np.concatenate([upper, lower[::-1]]),
+        fill="toself",
+        fillcolor=fillcolor,
+        line=dict(width=0),
+        hoverinfo="skip",
+    )
+
+
+def simulation_figure(weeks, actual_needed, no_fc_staff, with_fc_staff) -> go.Figure:
+    """``weeks`` is each bucket's week-of-year position; long series are downsampled."""
+    fig = go.Figure()
+    fig.add_trace(_gap_band(weeks, actual_needed, no_fc_staff, RED_LIGHT))
+    fig.add_trace(_gap_band(weeks, actual_needed, with_fc_staff, GREEN_LIGHT))
+    x, y = minmax_downsample(weeks, actual_needed)
+    fig.add_trace(_scatter(
+        x, y, mode="lines",
+        line=dict(color="black", width=2, dash="dash"),
+    ))
+    x, y = minmax_downsample(weeks, no_fc_staff)
+    fig.add_trace(_scatter(
+        x, y, mode="lines",
+        line=dict(color=RED, width=2),
+    ))
+    x, y = minmax_downsample(weeks, with_fc_staff)
+    fig.add_trace(_scatter(
+        x, y, mode="lines",
+        line=dict(color=GREEN, width=2),
+    ))
+    fig.update_layout(
+        height=450,
+        font=dict(size=13),
+        legend=dict(font=dict(size=13)),
+    )
+    return fig
+
+
+def label_simulation(fig: go.Figure, t: dict) -> go.Figure:
+    names = ("sim_waste_no_fc", "sim_waste_with_fc", "sim_actual", "sim_sched_no_fc", "sim_sched_with_fc")
+    for trace, key in zip(fig.data, names):
+        trace.name = t[key]
+    fig.update_layout(xaxis_title=t["sim_xaxis"], yaxis_title=t["sim_yaxis"])
+    return fig
+
+
+# ---------------------------------------------------------------------------
+# Monte Carlo fan chart
+# ---------------------------------------------------------------------------
+def fan_figure(weeks, percentiles, bands) -> go.Figure:
+    """Fan of ``bands[i]``, the ``percentiles[i]`` of workers needed per bucket.
+
+    Percentiles pair up from the outside in (P5-P95, P25-P75, ...) as
+    shaded ranges; an odd one out in the middle is drawn as the median.
+    Long series are reduced to their per-bin envelope.
+    """
+    bands = np.asarray(bands)
+    if len(weeks) > MAX_POINTS:
+        n_bins = MAX_POINTS // 2
+        weeks = _binned(weeks, n_bins).mean(axis=1)
+        half = len(bands) // 2
+        bands = np.stack(
+            [_binned(b, n_bins).min(axis=1) for b in bands[:half]]
+            + [_binned(b, n_bins).mean(axis=1) for b in bands[half:len(bands) - half]]
+            + [_binned(b, n_bins).max(axis=1) for b in bands[len(bands) - half:]]
+        )
+
+    fig = go.Figure()
+    for i in range(len(percentiles) // 2):
+        fig.add_trace(_scatter(weeks, bands[i], mode="lines", line=dict(width=0), hoverinfo="skip", showlegend=False))
+        fig.add_trace(_scatter(
+            weeks, bands[-1 - i],
+            mode="lines",
+            line=dict(width=0),
+            fill="tonexty",
+            fillcolor=f"rgba(52,73,94,{0.15 + 0.15 * i:.2f})",
+        ))
+    if len(percentiles) % 2:
+        fig.add_trace(_scatter(
+            weeks, bands[len(bands) // 2],
+            mode="lines",
+            line=dict(color="black", width=2),
+        ))
+    fig.update_layout(
+        height=420,
+        font=dict(size=13),
+        legend=dict(font=dict(size=13)),
+    )
+    return fig
+
+
+def label_fan(fig: go.Figure, t: dict, percentiles) -> go.Figure:
+    for i in range(len(percentiles) // 2):
+        fig.data[2 * i + 1].name = t["fan_band"].format(lo=percentiles[i], hi=percentiles[-1 - i])
+    if len(percentiles) % 2:
+        fig.data[-1].name = t["fan_median"]
+    fig.update_layout(xaxis_title=t["sim_xaxis"], yaxis_title=t["sim_yaxis"])
+    return fig
+
+
+# ---------------------------------------------------------------------------
+# Monte Carlo convergence
+# ---------------------------------------------------------------------------
+def convergence_figure(paths, mean, std_error, p5, p95) -> go.Figure:
+    """Running savings estimate against the number of paths simulated so far.
+
+    Shades P5-P95 of the paths so far and the 95% confidence band of the
+    mean, which narrows as the run continues.
+    """
+    mean = np.asarray(mean)
+    half_width = 1.96 * np.asarray(std_error)
+    fig = go.Figure()
+    for lower, upper, fillcolor in (
+        (p5, p95, GREEN_LIGHT),
+        (mean - half_width, mean + half_width, "rgba(39,174,96,0.35)"),
+    ):
+        fig.add_trace(go.Scatter(x=paths, y=lower, mode="lines", line=dict(width=0), hoverinfo="skip",
+                                 showlegend=False))
+        fig.add_trace(go.Scatter(x=paths, y=upper, mode="lines", line=dict(width=0), fill="tonexty",
+                                 fillcolor=fillcolor))
+    fig.add_trace(go.Scatter(x=paths, y=mean, mode="lines+markers", line=dict(color=GREEN, width=2)))
+    fig.update_layout(
+        height=320,
+        font=dict(size=13),
+        legend=dict(font=dict(size=13)),
+        xaxis_type="log",
+    )
+    return fig
+
+
+def label_convergence(fig: go.Figure, t: dict) -> go.Figure:
+    fig.data[1].name = t["conv_band"]
+    fig.data[3].name = t["conv_ci"]
+    fig.data[4].name = t["conv_mean"]
+    fig.update_layout(xaxis_title=t["mc_paths"], yaxis_title=t["conv_yaxis"])
+    return fig
+
+
+# ---------------------------------------------------------------------------
+# Sensitivity chart
+# ---------------------------------------------------------------------------
+def sensitivity_figure(misalloc_range, annual_totals, no_fc_point, with_fc_point) -> go.Figure:
+    """``no_fc_point``/``with_fc_point`` are ``(misallocation %, annual total)``."""
+    (x_no_fc, y_no_fc), (x_with_fc, y_with_fc) = no_fc_point, with_fc_point
+
+    fig = go.Figure()
+    fig.add_trace(_scatter(
+        misalloc_range, annual_totals,
+        mode="lines",
+        line=dict(color=GREY, width=2),
+        fill="tozeroy",
+        fillcolor="rgba(149,165,166,0.10)",
+        showlegend=False,
+    ))
+    fig.add_trace(go.Scatter(
+        x=[x_no_fc], y=[y_no_fc],
+        mode="markers+text",
+        marker=dict(size=18, color=RED, symbol="circle"),
+        textposition="middle right",
+        textfont=dict(size=14, color=RED),
+    ))
+    fig.add_trace(go.Scatter(
+        x=[x_with_fc], y=[y_with_fc],
+        mode="markers+text",
+        marker=dict(size=18, color=GREEN, symbol="circle"),
+        textposition="middle right",
+        textfont=dict(size=14, color=GREEN),
+    ))
+    fig.add_annotation(
+        x=x_no_fc, y=y_no_fc,
+        ax=x_with_fc, ay=y_with_fc,
+        xref="x", yref="y", axref="x", ayref="y",
+        showarrow=True,
+        arrowhead=3, arrowsize=1.5, arrowwidth=2,
+        arrowcolor=GREEN,
+    )
+    fig.add_annotation(
+        x=(x_no_fc + x_with_fc) / 2,
+        y=(y_no_fc + y_with_fc) / 2,
+        showarrow=False,
+        font=dict(size=15, color=GREEN),
+        xshift=100,
+    )
+    fig.update_layout(
+        height=450,
+        font=dict(size=13),
+        legend=dict(font=dict(size=14)),
+    )
+    return fig
+
+
+def label_sensitivity(fig: go.Figure, t: dict) -> go.Figure:
+    no_fc_total = fig.data[1].y[0]
+    with_fc_total = fig.data[2].y[0]
+    fig.data[1].update(
+        name=t["sens_no_fc_legend"],
+        text=[t["sens_today"].format(val=f"{no_fc_total:,.0f}")],
+    )
+    fig.data[2].update(
+        name=t["sens_with_fc_legend"],
+        text=[t["sens_with_fc"].format(val=f"{with_fc_total:,.0f}")],
+    )
+    fig.layout.annotations[1].text = t["sens_arrow"].format(val=f"{no_fc_total - with_fc_total:,.0f}")
+    fig.update_layout(xaxis_title=t["sens_xaxis"], yaxis_title=t["sens_yaxis"])
+    return fig
+
+
+# ---------------------------------------------------------------------------
+# 2-D sensitivity heatmap
+# ---------------------------------------------------------------------------
+def sweep_figure(misalloc_range, param_range, annual_totals, no_fc_point, with_fc_point) -> go.Figure:
+    """Heatmap of ``annual_totals[i, j]`` at ``misalloc_range[i]``, ``param_range[j]``.
+
+    Points are ``(misallocation %, parameter value)``. Totals are sent as
+    float32 to halve the payload at fine resolutions.
+    """
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        x=misalloc_range, y=param_range,
+        z=np.asarray(annual_totals, dtype=np.float32).T,
+        colorscale="RdYlGn_r",
+        hovertemplate="%{x:.1f}% · %{y:,.2f}<br>€%{z:,.0f}<extra></extra>",
+    ))
+    for (x, y), color in ((no_fc_point, RED), (with_fc_point, GREEN)):
+        fig.add_trace(go.Scatter(
+            x=[x], y=[y],
+            mode="markers",
+            marker=dict(size=16, color=color, symbol="circle", line=dict(color="white", width=2)),
+        ))
+    fig.update_layout(
+        height=450,
+        font=dict(size=13),
+        legend=dict(font=dict(size=14)),
+    )
+    return fig
+
+
+def label_sweep(fig: go.Figure, t: dict, param: str) -> go.Figure:
+    fig.data[0].colorbar.title.text = t["sens_yaxis"]
+    fig.data[1].name = t["sens_no_fc_legend"]
+    fig.data[2].name = t["sens_with_fc_legend"]
+    fig.update_layout(xaxis_title=t["sens_xaxis"], yaxis_title=t[f"sweep_param_{param}"])
+    return fig
+
+
+# ---------------------------------------------------------------------------
+# Optimal headcount
+# ---------------------------------------------------------------------------
+def headcount_figure(weeks, mean_needed, optimal_staff) -> go.Figure:
+    fig = go.Figure()
+    x, y = minmax_downsample(weeks, mean_needed)
+    fig.add_trace(_scatter(
+        x, y, mode="lines",
+        line=dict(color="black", width=2, dash="dash"),
+    ))
+    x, y = minmax_downsample(weeks, optimal_staff)
+    fig.add_trace(_scatter(
+        x, y, mode="lines",
+        line=dict(color=GREEN, width=3),
+    ))
+    fig.update_layout(
+        height=380,
+        font=dict(size=13),
+        legend=dict(font=dict(size=13)),
+    )
+    return fig
+
+
+def label_headcount(fig: go.Figure, t: dict) -> go.Figure:
+    fig.data[0].name = t["opt_mean"]
+    fig.data[1].name = t["opt_staff"]
+    fig.update_layout(xaxis_title=t["sim_xaxis"], yaxis_title=t["sim_yaxis"])
+    return fig
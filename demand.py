@@ -0,0 +1,145 @@
+"""Demand generator with pluggable profiles.
+
+A profile is a plain dict:
+
+    {"seasonality": "retail_peak", "trend": 0.05, "ar1": 0.6, "promotions": ((47, 0.6, 1),)}
+
+Its deterministic part (seasonality x trend x promotions) is a multiplier
+curve over the year's buckets with mean ~1; each component is cached per
+bucket count, so changing one of them only rebuilds that one. Random
+variation around the curve is i.i.d. or AR(1) and is drawn for a whole
+batch of paths at once.
+"""
+import hashlib
+from functools import lru_cache
+
+import numpy as np
+
+from engine import WEEKS_PER_YEAR
+
+DEMAND_CV = 0.15
+# Demand stays within these multiples of its expected value.
+CLIP = (0.5, 1.5)
+
+# Seasonality shapes, sampled evenly over one year (here Jan..Dec).
+SEASONALITIES = {
+    "flat": np.ones(12),
+    "retail_peak": np.array([0.85, 0.80, 0.90, 0.95, 0.95, 0.95, 0.95, 1.00, 1.00, 1.05, 1.25, 1.35]),
+    "summer_peak": np.array([0.85, 0.85, 0.90, 0.95, 1.05, 1.20, 1.25, 1.20, 1.00, 0.95, 0.90, 0.90]),
+}
+
+BUILTIN_SEASONALITIES = tuple(SEASONALITIES)
+
+# (week of year, lift, duration in weeks)
+PEAK_PROMOTIONS = (
+    (47, 0.60, 1),  # Black Friday
+    (51, 0.40, 2),  # Christmas
+)
+
+FLAT_PROFILE = {"seasonality": "flat", "trend": 0.0, "ar1": 0.0, "promotions": ()}
+
+
+def register_seasonality(values, name=None) -> str:
+    """Add a seasonality shape (e.g. an uploaded history) and return its name.
+
+    ``values`` is one year of demand at any resolution. Unnamed shapes are
+    keyed by a hash of their contents, so re-uploading the same series
+    reuses every cached curve.
+    """
+    values = np.asarray(values, dtype=float).ravel()
+    if values.size == 0 or not np.isfinite(values).all() or values.mean() <= 0:
+        raise ValueError("A seasonality needs finite values with a positive mean")
+    if name is None:
+        name = "upload:" + hashlib.sha1(values.tobytes()).hexdigest()[:12]
+    SEASONALITIES[name] = values
+    return name
+
+
+def load_history(source) -> np.ndarray:
+    """Read a demand history CSV: the ``demand`` column, else the first one."""
+    import pyarrow.csv as pa_csv
+
+    table = pa_csv.read_csv(source)
+    column = "demand" if "demand" in table.column_names else table.column_names[0]
+    return table.column(column).to_numpy(zero_copy_only=False).astype(float)
+
+
+def _readonly(values) -> np.ndarray:
+    values.setflags(write=False)
+    return values
+
+
+@lru_cache(maxsize=64)
+def seasonal_curve(name, n_buckets) -> np.ndarray:
+    shape = SEASONALITIES[name] / SEASONALITIES[name].mean()
+    # Interpolate cyclically between the shape's sample midpoints.
+    sample_pos = (np.arange(shape.size) + 0.5) / shape.size
+    bucket_pos = (np.arange(n_buckets) + 0.5) / n_buckets
+    return _readonly(np.interp(bucket_pos, sample_pos, shape, period=1.0))
+
+
+@lru_cache(maxsize=64)
+def trend_curve(annual_growth, n_buckets) -> np.ndarray:
+    """Compound growth over the year, centred so mid-year is 1."""
+    return _readonly((1 + annual_growth) ** (np.arange(n_buckets) / n_buckets - 0.5))
+
+
+@lru_cache(maxsize=64)
+def promotion_curve(promotions, n_buckets) -> np.ndarray:
+    week = np.arange(n_buckets) * (WEEKS_PER_YEAR / n_buckets) + 1
+    curve = np.ones(n_buckets)
+    for start, lift, duration in promotions:
+        curve[(week >= start) & (week < start + duration)] *= 1 + lift
+    return _readonly(curve)
+
+
+@lru_cache(maxsize=64)
+def _mean_curve(seasonality, trend, promotions, n_buckets) -> np.ndarray:
+    curve = seasonal_curve(seasonality, n_buckets) * trend_curve(trend, n_buckets)
+    if promotions:
+        curve *= promotion_curve(promotions, n_buckets)
+    return _readonly(curve)
+
+
+def mean_curve(profile, n_buckets) -> np.ndarray:
+    """Expected demand multiplier per bucket (read-only, cached)."""
+    promotions = tuple(tuple(p) for p in profile.get("promotions", ()))
+    return _mean_curve(profile.get("seasonality", "flat"), profile.get("trend", 0.0), promotions, n_buckets)
+
+
+def draw(rng, n_paths, units_per_week, profile=FLAT_PROFILE, n_buckets=WEEKS_PER_YEAR, cv=DEMAND_CV, noise=None):
+    """Weekly-rate demand per bucket, ``(n_paths, n_buckets)``.
+
+    ``rng`` may be a ``Generator`` or a legacy ``RandomState``. With
+    ``ar1 > 0`` the relative noise is a stationary AR(1) process, so busy
+    weeks cluster; otherwise it is i.i.d. ``noise`` optionally supplies the
+    standard normals to use, ``(n_paths, n_buckets)``, instead of drawing
+    them from ``rng``.
+    """
+    mean = units_per_week * mean_curve(profile, n_buckets)
+    phi = profile.get("ar1", 0.0)
+
+    if phi == 0 and noise is None:
+        demand = rng.normal(mean, mean * cv, (n_paths, n_buckets))
+    elif phi == 0:
+        demand = noise * cv
+        demand += 1
+        demand *= mean
+    else:
+        # Step through time with all paths at once; buckets-major layout
+        # keeps each step contiguous.
+        if noise is None:
+            noise = rng.standard_normal((n_buckets, n_paths))
+        else:
+            noise = np.array(noise.T, order="C")
+        innovation_scale = np.sqrt(1 - phi ** 2)
+        for b in range(1, n_buckets):
+            noise[b] *= innovation_scale
+            noise[b] += phi * noise[b - 1]
+        noise *= cv
+        noise += 1
+        demand = noise.T
+        demand *= mean
+
+    np.clip(demand, mean * CLIP[0], mean * CLIP[1], out=demand)
+    return demand
@@ -0,0 +1,182 @@
+"""Headless staffing cost model.
+
+Pure NumPy version of the cost calculation behind the Streamlit page, so it
+can be imported and run over many sites/scenarios at once without booting a
+page. Every input may be a scalar or an array; inputs broadcast together.
+
+Costs can also follow piecewise labour ``rules`` (see ``LABOUR_RULES``):
+a shortfall is covered by overtime up to a cap, then by agency tiers at
+rising premiums, and only what is left uncovered misses SLA.
+"""
+import numpy as np
+
+WEEKS_PER_YEAR = 52
+MONTHS_PER_YEAR = 12
+
+COST_FIELDS = (
+    "workers_over",
+    "workers_under",
+    "monthly_overstaffing",
+    "monthly_overtime",
+    "monthly_sla",
+    "annual_overstaffing",
+    "annual_overtime",
+    "annual_sla",
+    "annual_total",
+)
+
+
+# Piecewise labour rules; any subset may be given, missing ones are off.
+# With any rules a week (or bucket) misses SLA only when overtime and
+# agencies leave part of its shortfall uncovered, so never while overtime
+# is unlimited; without rules every understaffed week misses.
+LABOUR_RULES = {
+    # Overtime hours a scheduled worker can add per week (None: unlimited).
+    "overtime_cap_hours": None,
+    # ((workers, wage multiplier), ...): agency capacity used in order once
+    # overtime is exhausted. Like overtime, only the premium is a cost.
+    "agency_tiers": (),
+    # No bucket is staffed below this crew.
+    "min_shift_workers": 0,
+    # New hires are paid this many weeks before they start (simulation only).
+    "hiring_lead_weeks": 0,
+    # Weeks for a new hire to reach full productivity, linearly (simulation only).
+    "ramp_weeks": 0,
+}
+
+
+def cover_shortfall(shortfall, staff, worker_cost, hours_per_week, overtime_multiplier, rules):
+    """Cover a shortfall of workers with capped overtime, then agency tiers.
+
+    Returns ``(overtime_premium, agency_premium, uncovered)``, broadcast
+    like the inputs. ``worker_cost`` is the cost of one worker over the
+    period ``shortfall`` is measured in.
+    """
+    cap = rules.get("overtime_cap_hours")
+    overtime = shortfall if cap is None else np.minimum(shortfall, staff * (cap / hours_per_week))
+    overtime_premium = overtime * worker_cost * (overtime_multiplier - 1)
+    uncovered = shortfall - overtime
+    agency_premium = np.zeros_like(overtime_premium)
+    for capacity, multiplier in rules.get("agency_tiers", ()):
+        used = np.minimum(uncovered, capacity)
+        agency_premium += used * worker_cost * (multiplier - 1)
+        uncovered = uncovered - used
+    return overtime_premium, agency_premium, uncovered
+
+
+def required_workers(units_per_week, units_per_worker_per_week):
+    return np.asarray(units_per_week, dtype=float) / units_per_worker_per_week
+
+
+def weekly_worker_cost(hourly_rate, hours_per_week):
+    return np.asarray(hourly_rate, dtype=float) * hours_per_week
+
+
+def scenario_costs(
+    units_per_week,
+    units_per_worker_per_week,
+    hourly_rate,
+    hours_per_week,
+    overtime_multiplier,
+    misalloc_pct,
+    sla_penalty_per_miss,
+    rules=None,
+) -> dict:
+    """Cost breakdown for one or many staffing scenarios.
+
+    Half of the misallocation is charged as idle (overstaffed) workers and
+    half as overtime premium; the SLA penalty is charged every other week.
+    With ``rules`` the understaffed weeks are covered piecewise (agency
+    premiums count as overtime) and miss SLA only if left uncovered; the
+    hiring rules need a time axis and apply in the simulation only.
+    Returns a dict with the keys in ``COST_FIELDS``; values are arrays of the
+    broadcast input shape (NumPy scalars when every input is a scalar).
+    """
+    (
+        units_per_week,
+        units_per_worker_per_week,
+        hourly_rate,
+        hours_per_week,
+        overtime_multiplier,
+        misalloc_pct,
+        sla_penalty_per_miss,
+    ) = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (
+            units_per_week,
+            units_per_worker_per_week,
+            hourly_rate,
+            hours_per_week,
+            overtime_multiplier,
+            misalloc_pct,
+            sla_penalty_per_miss,
+        ))
+    )
+
+    workers = units_per_week / units_per_worker_per_week
+    worker_cost = hourly_rate * hours_per_week
+
+    frac = misalloc_pct / 100.0
+    over = workers * frac / 2
+    under = workers * frac / 2
+
+    if rules:
+        floor = rules.get("min_shift_workers", 0)
+        over = np.maximum(workers + over, floor) - workers
+        short_staff = np.maximum(workers - under, floor)
+        under = np.maximum(workers - short_staff, 0)
+        overtime_premium, agency_premium, uncovered = cover_shortfall(
+            under, short_staff, worker_cost, hours_per_week, overtime_multiplier, rules,
+        )
+        weekly_overtime_premium = overtime_premium + agency_premium
+        weekly_sla = np.where(uncovered > 0, sla_penalty_per_miss / 2, 0.0)
+    else:
+        weekly_overtime_premium = under * worker_cost * (overtime_multiplier - 1)
+        weekly_sla = sla_penalty_per_miss / 2
+    weekly_overstaffing = over * worker_cost
+
+    annual_overstaffing = weekly_overstaffing * WEEKS_PER_YEAR
+    annual_overtime = weekly_overtime_premium * WEEKS_PER_YEAR
+    annual_sla = weekly_sla * WEEKS_PER_YEAR
+
+    out = {
+        "workers_over": over,
+        "workers_under": under,
+        "monthly_overstaffing": annual_overstaffing / MONTHS_PER_YEAR,
+        "monthly_overtime": annual_overtime / MONTHS_PER_YEAR,
+        "monthly_sla": annual_sla / MONTHS_PER_YEAR,
+        "annual_overstaffing": annual_overstaffing,
+        "annual_overtime": annual_overtime,
+        "annual_sla": annual_sla,
+        "annual_total": annual_overstaffing + annual_overtime + annual_sla,
+    }
+    return {k: v[()] for k, v in out.items()}
+
+
+def annual_total(
+    units_per_week,
+    units_per_worker_per_week,
+    hourly_rate,
+    hours_per_week,
+    overtime_multiplier,
+    misalloc_pct,
+    sla_penalty_per_miss,
+    rules=None,
+):
+    """Just the ``annual_total`` of :func:`scenario_costs`, for large sweeps.
+
+    Idle cost plus overtime premium collapses to ``workers * cost * frac/2 *
+    overtime_multiplier``, so a grid costs one or two full-size allocations
+    instead of one per field. Piecewise ``rules`` have no such shortcut.
+    """
+    if rules:
+        return scenario_costs(
+            units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+            overtime_multiplier, misalloc_pct, sla_penalty_per_miss, rules,
+        )["annual_total"]
+    per_pct = (
+        required_workers(units_per_week, units_per_worker_per_week)
+        * weekly_worker_cost(hourly_rate, hours_per_week)
+        * (WEEKS_PER_YEAR / 200.0)
+    )
+    idle_and_overtime = per_pct * np.asarray(misalloc_pct, dtype=float) * overtime_multiplier
+    return idle_and_overtime + np.asarray(sla_penalty_per_miss, dtype=float) * (WEEKS_PER_YEAR / 2)
@@ -0,0 +1,219 @@
+"""Multi-site network: a regional labour pool shared between warehouses.
+
+Sites are the rows of a portfolio file (see ``batch.INPUT_COLUMNS``). Each
+simulated week, every site's demand is drawn with a common regional factor
+(``correlation`` is the share of variance it explains), staff is scheduled
+as in ``simulation.simulate_paths``, and the network is costed two ways:
+
+* isolated — every site absorbs its own gap: idle workers, overtime, SLA;
+* pooled — up to ``transfer_share`` of the region's surplus workers can be
+  moved to short sites, at ``transfer_cost`` per worker-week. Smallest
+  shortfalls are filled first, so as many sites as possible meet SLA.
+
+Paths are evaluated as ``(paths, sites, weeks)`` arrays, a chunk of paths
+at a time so no array exceeds ``CHUNK_CELLS`` cells.
+
+    python network.py sites.csv --paths 2000 --correlation 0.3 --transfer-share 0.5
+"""
+import argparse
+import json
+import sys
+
+import numpy as np
+
+import batch
+import demand as demand_model
+import simulation
+from engine import WEEKS_PER_YEAR
+
+MODES = ("isolated", "pooled")
+NETWORK_FIELDS = (
+    "annual_overstaffing",
+    "annual_overtime",
+    "annual_sla",
+    "annual_transfers",
+    "annual_total",
+    "workers_moved",
+)
+RESULT_KEYS = tuple(f"{m}_{f}" for m in MODES for f in NETWORK_FIELDS)
+# (paths x sites x weeks) cells per chunk; ~8 MB per float64 array.
+CHUNK_CELLS = 1_000_000
+
+
+def load_sites(source) -> dict:
+    """Read a portfolio file into ``{column: (n_sites,) array}``."""
+    chunks = list(batch.iter_chunks(source))
+    return {
+        c: np.concatenate([chunk.column(c).to_numpy(zero_copy_only=False) for chunk in chunks]).astype(float)
+        for c in batch.INPUT_COLUMNS
+    }
+
+
+def chunk_paths(n_sites, n_weeks=WEEKS_PER_YEAR, chunk_cells=CHUNK_CELLS) -> int:
+    return max(1, chunk_cells // (n_sites * n_weeks))
+
+
+def correlated_demand(
+    rng, n_paths, units_per_week, correlation, profile=demand_model.FLAT_PROFILE,
+    n_weeks=WEEKS_PER_YEAR, cv=demand_model.DEMAND_CV,
+) -> np.ndarray:
+    """Weekly demand per site, ``(n_paths, n_sites, n_weeks)``.
+
+    One-factor model: each site's relative noise is ``sqrt(rho)`` times a
+    regional shock shared by all sites that week plus ``sqrt(1 - rho)``
+    times its own, so any two sites correlate at ``rho``.
+    """
+    mean = np.asarray(units_per_week, dtype=float)[:, np.newaxis] * demand_model.mean_curve(profile, n_weeks)
+    common = rng.standard_normal((n_paths, 1, n_weeks))
+    demand = rng.standard_normal((n_paths, mean.shape[0], n_weeks))
+    demand *= np.sqrt(1 - correlation)
+    demand += np.sqrt(correlation) * common
+    demand *= cv
+    demand += 1
+    demand *= mean
+    np.clip(demand, mean * demand_model.CLIP[0], mean * demand_model.CLIP[1], out=demand)
+    return demand
+
+
+def _per_site(values, n_sites) -> np.ndarray:
+    """Scalar or ``(n_sites,)`` parameter as an ``(n_sites, 1)`` column."""
+    return np.broadcast_to(np.asarray(values, dtype=float), (n_sites,))[:, np.newaxis]
+
+
+def network_costs(
+    actual_needed, staff, weekly_worker_cost, overtime_multiplier, sla_penalty_per_miss,
+    transfer_share, transfer_cost,
+) -> dict:
+    """Isolated and pooled cost per path for ``(paths, sites, weeks)`` gaps.
+
+    Site parameters are ``(n_sites,)`` arrays (or scalars). Returns
+    ``{"<mode>_<field>": (n_paths,) array}`` for ``MODES`` x ``NETWORK_FIELDS``.
+    """
+    n_sites = actual_needed.shape[1]
+    idle_cost = _per_site(weekly_worker_cost, n_sites)
+    premium = idle_cost * (_per_site(overtime_multiplier, n_sites) - 1)
+    sla = _per_site(sla_penalty_per_miss, n_sites)
+
+    gap = staff - actual_needed
+    surplus = np.maximum(gap, 0)
+    shortfall = np.maximum(-gap, 0, out=gap)
+    del gap
+
+    out = {}
+    zero = np.zeros(actual_needed.shape[0])
+    out["isolated_annual_overstaffing"] = (surplus * idle_cost).sum(axis=(1, 2))
+    out["isolated_annual_overtime"] = (shortfall * premium).sum(axis=(1, 2))
+    out["isolated_annual_sla"] = ((shortfall > 0) * sla).sum(axis=(1, 2))
+    out["isolated_annual_transfers"] = zero
+    out["isolated_workers_moved"] = zero
+
+    # Regional transfers per (path, week), taken pro rata from surplus sites.
+    total_surplus = surplus.sum(axis=1)
+    moved = np.minimum(transfer_share * total_surplus, shortfall.sum(axis=1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kept = np.where(total_surplus > 0, 1 - moved / total_surplus, 1.0)
+    out["pooled_annual_overstaffing"] = ((surplus * idle_cost).sum(axis=1) * kept).sum(axis=1)
+    del surplus
+
+    # Fill the smallest shortfalls first.
+    order = np.argsort(shortfall, axis=1)
+    shortfall = np.take_along_axis(shortfall, order, axis=1)
+    remaining = np.cumsum(shortfall, axis=1)
+    remaining -= moved[:, np.newaxis, :]
+    np.clip(remaining, 0, shortfall, out=remaining)
+    del shortfall
+    premium_sorted = np.take_along_axis(np.broadcast_to(premium, order.shape), order, axis=1)
+    sla_sorted = np.take_along_axis(np.broadcast_to(sla, order.shape), order, axis=1)
+    out["pooled_annual_overtime"] = (remaining * premium_sorted).sum(axis=(1, 2))
+    out["pooled_annual_sla"] = ((remaining > 0) * sla_sorted).sum(axis=(1, 2))
+    out["pooled_workers_moved"] = moved.mean(axis=1)
+    out["pooled_annual_transfers"] = moved.sum(axis=1) * transfer_cost
+
+    for mode in MODES:
+        out[f"{mode}_annual_total"] = sum(
+            out[f"{mode}_annual_{c}"] for c in ("overstaffing", "overtime", "sla", "transfers")
+        )
+    return out
+
+
+def simulate_network(
+    sites: dict,
+    n_paths=1_000,
+    correlation=0.3,
+    transfer_share=0.5,
+    transfer_cost=0.0,
+    scenario="no_fc",
+    seed=None,
+    profile=demand_model.FLAT_PROFILE,
+    chunk_cells=CHUNK_CELLS,
+) -> dict:
+    """Simulate ``n_paths`` network years and cost them isolated and pooled.
+
+    ``sites`` maps ``batch.INPUT_COLUMNS`` to per-site arrays; ``scenario``
+    picks the staffing error column (``"no_fc"`` or ``"with_fc"``). Returns
+    per-path arrays for ``RESULT_KEYS`` plus ``"pooling_savings"`` and the
+    reproducing ``"seed"``.
+    """
+    seed_seq = np.random.SeedSequence(seed)
+    units = sites["units_per_week"]
+    required = units / sites["units_per_worker_per_week"]
+    spread = required * sites[
+        "misallocation_no_forecast" if scenario == "no_fc" else "misallocation_with_forecast"
+    ] / 200
+    worker_cost = sites["hourly_rate"] * sites["hours_per_week"]
+
+    out = {key: np.empty(n_paths) for key in RESULT_KEYS}
+    size = chunk_paths(len(units), WEEKS_PER_YEAR, chunk_cells)
+    for block in range(-(-n_paths // size)):
+        start = block * size
+        stop = min(start + size, n_paths)
+        rng = simulation.block_rng(seed_seq, block)
+
+        actual_needed = correlated_demand(rng, stop - start, units, correlation, profile)
+        actual_needed /= sites["units_per_worker_per_week"][:, np.newaxis]
+        staff = rng.standard_normal(actual_needed.shape)
+        staff *= spread[:, np.newaxis]
+        staff += required[:, np.newaxis] if scenario == "no_fc" else actual_needed
+        np.clip(staff, 1, None, out=staff)
+
+        costs = network_costs(
+            actual_needed, staff, worker_cost, sites["overtime_multiplier"], sites["sla_penalty_per_miss"],
+            transfer_share, transfer_cost,
+        )
+        for key, values in costs.items():
+            out[key][start:stop] = values
+
+    out["pooling_savings"] = out["isolated_annual_total"] - out["pooled_annual_total"]
+    out["seed"] = seed_seq.entropy
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pooled vs isolated staffing cost for a network of sites.")
+    parser.add_argument("sites", help="CSV or Parquet file with the portfolio columns")
+    parser.add_argument("--paths", type=int, default=1_000, help="simulated years (default: %(default)s)")
+    parser.add_argument("--correlation", type=float, default=0.3, help="demand correlation between sites")
+    parser.add_argument("--transfer-share", type=float, default=0.5,
+                        help="share of surplus workers that can be moved each week")
+    parser.add_argument("--transfer-cost", type=float, default=0.0, help="cost per worker moved for a week")
+    parser.add_argument("--scenario", choices=simulation.SCENARIOS, default="no_fc")
+    parser.add_argument("--seed", type=int, default=None, help="omit for a fresh seed; it is printed")
+    args = parser.parse_args(argv)
+
+    sites = load_sites(args.sites)
+    net = simulate_network(
+        sites, args.paths, args.correlation, args.transfer_share, args.transfer_cost, args.scenario, args.seed,
+    )
+    report = {
+        "sites": len(sites["units_per_week"]),
+        "paths": args.paths,
+        "seed": net["seed"],
+        **{key: float(net[key].mean()) for key in RESULT_KEYS},
+        "pooling_savings": simulation.summarize(net["pooling_savings"]),
+    }
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Opt-in timing for app.py reruns.
+
+Enabled with ``?profile=1`` in the page URL or ``STAFFING_PROFILE=1`` in the
+environment; ``profile=cprofile`` or ``profile=memory`` also run cProfile or
+tracemalloc over the rerun. Each profiled rerun logs one JSON line on the
+``staffing.profile`` logger (to stderr), ready to aggregate across sessions,
+and the page shows the same numbers in a debug panel.
+
+Sections are timed back to back: ``section(name)`` closes the running one.
+Figure payloads are measured by serializing them the way ``st.plotly_chart``
+does; that extra work is excluded from the section times.
+
+A rerun cut short by ``st.rerun()``, ``st.stop()`` or an exception never
+reaches ``finish()``. The app is a flat script with no scope to wrap in
+``try``/``finally``, so the session's next ``Recorder`` stops the profiler
+or trace the cut-short one left running.
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+
+import plotly.io as pio
+
+ENV_VAR = "STAFFING_PROFILE"
+QUERY_PARAM = "profile"
+MODES = ("1", "cprofile", "memory")
+TOP_N = 25
+
+# Per session, the Recorder whose cProfile or tracemalloc may still be running.
+_running = {}
+
+logger = logging.getLogger("staffing.profile")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def requested_mode(query_params):
+    """Profiling mode from the URL or environment, or None when off."""
+    mode = query_params.get(QUERY_PARAM) or os.environ.get(ENV_VAR)
+    return mode if mode in MODES else None
+
+
+class Recorder:
+    def __init__(self, mode=None, session=""):
+        self.mode = mode
+        self.session = session
+        self.sections = {}
+        self.figures = {}
+        self.details = {}
+        self._current = None
+        self._started = self._mark = time.perf_counter()
+        self._profiler = None
+        self._owns_trace = False
+        previous = _running.pop(session, None)
+        if previous is not None:
+            previous.stop()
+        if mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:  # another session's rerun is being profiled
+                self._profiler = None
+        elif mode == "memory" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_trace = True
+        if self._profiler is not None or self._owns_trace:
+            _running[session] = self
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    def section(self, name):
+        """Close the running section and start timing ``name``."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._current is not None:
+            self.sections[self._current] = self.sections.get(self._current, 0.0) + now - self._mark
+        self._current, self._mark = name, now
+
+    def figure(self, name, fig):
+        """Record the JSON payload size and serialization time of a figure."""
+        if not self.enabled:
+            return
+        start = time.perf_counter()
+        payload = pio.to_json(fig, validate=False)
+        elapsed = time.perf_counter() - start
+        self.figures[name] = {"bytes": len(payload), "json_ms": elapsed * 1_000}
+        self._mark += elapsed
+
+    def stop(self):
+        """Turn off the cProfile or tracemalloc this rerun started; safe to repeat."""
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._owns_trace:
+            tracemalloc.stop()
+            self._owns_trace = False
+        if _running.get(self.session) is self:
+            del _running[self.session]
+
+    def finish(self, **context) -> dict:
+        """Stop timing, log one JSON line and return the report.
+
+        ``context`` (e.g. granularity, sweep resolution) is logged alongside
+        the timings so slow reruns can be grouped by input.
+        """
+        self.section(None)
+        report = {
+            "ts": time.time(),
+            "session": self.session,
+            "mode": self.mode,
+            "total_ms": (time.perf_counter() - self._started) * 1_000,
+            "sections_ms": {name: seconds * 1_000 for name, seconds in self.sections.items()},
+            "figures": self.figures,
+            "context": context,
+        }
+        if self.mode == "memory" and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            report["peak_kib"] = peak / 1024
+            self.details["tracemalloc"] = "\n".join(
+                str(stat) for stat in snapshot.statistics("lineno")[:TOP_N]
+            )
+        self.stop()
+        if self._profiler is not None:
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(TOP_N)
+            self.details["cprofile"] = out.getvalue()
+        logger.info(json.dumps(report, default=str))
+        return report
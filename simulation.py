@@ -0,0 +1,831 @@
+"""Week-by-week staffing simulation.
+
+Monte Carlo runs can also be started from the command line:
+
+    python simulation.py --paths 1000000 --workers 32 --units-per-week 80000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from statistics import NormalDist
+
+import numpy as np
+
+import backtest
+import demand as demand_model
+import engine
+from engine import COST_FIELDS, MONTHS_PER_YEAR, WEEKS_PER_YEAR
+
+SEED = 42
+
+# Buckets per simulated year. Demand, wages and SLA penalties are spread
+# evenly over the buckets, so headcounts and annual costs stay comparable
+# across granularities.
+GRANULARITIES = {
+    "weekly": WEEKS_PER_YEAR,
+    "daily": 364,
+    "shift": 3 * 364,
+    "hourly": 8760,
+}
+
+
+def bucket_positions(n_buckets) -> np.ndarray:
+    """Week-of-year position (1..52) of each bucket, for plotting."""
+    return np.arange(1, n_buckets + 1) * (WEEKS_PER_YEAR / n_buckets)
+
+
+def simulate_year(
+    units_per_week,
+    units_per_worker_per_week,
+    misallocation_no_forecast,
+    misallocation_with_forecast,
+    granularity="weekly",
+    profile=demand_model.FLAT_PROFILE,
+    seed=SEED,
+) -> dict:
+    """One seeded year of demand and scheduled staff, one value per bucket.
+
+    Without a forecast staff is scheduled around the average requirement
+    (blind to the demand ``profile``); with a forecast it tracks actual
+    need plus a smaller error, or the resampled backtest errors named by
+    the profile's ``"forecast_error"`` (see ``backtest``). ``demand`` is in
+    units per week so every granularity plots on the same scale.
+    """
+    n_buckets = GRANULARITIES[granularity]
+    rng = np.random.RandomState(seed)
+    required_workers = units_per_week / units_per_worker_per_week
+
+    demand = demand_model.draw(rng, 1, units_per_week, profile, n_buckets)[0]
+    actual_needed = demand / units_per_worker_per_week
+
+    no_fc_staff = np.full(n_buckets, required_workers) + rng.normal(
+        0, required_workers * misallocation_no_forecast / 200, n_buckets
+    )
+    no_fc_staff = np.clip(no_fc_staff, 1, None)
+
+    if profile.get("forecast_error"):
+        with_fc_staff = actual_needed * (1 + backtest.resample(rng, profile["forecast_error"], 1, n_buckets)[0])
+    else:
+        with_fc_staff = actual_needed + rng.normal(
+            0, required_workers * misallocation_with_forecast / 200, n_buckets
+        )
+    with_fc_staff = np.clip(with_fc_staff, 1, None)
+
+    return {
+        "weeks": bucket_positions(n_buckets),
+        "demand": demand,
+        "actual_needed": actual_needed,
+        "no_fc_staff": no_fc_staff,
+        "with_fc_staff": with_fc_staff,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Monte Carlo
+# ---------------------------------------------------------------------------
+# Paths are drawn in fixed-size blocks, each from its own child seed, so a
+# given path's numbers never depend on how the run is chunked. Blocks hold
+# BLOCK_PATHS weekly years; finer granularities get proportionally fewer
+# paths per block so a block's arrays stay the same size.
+BLOCK_PATHS = 4096
+# How paths draw their random numbers; anything but "independent" shares
+# the staffing normals between the scenarios (see standard_normals).
+SAMPLINGS = ("independent", "crn", "antithetic", "sobol")
+# Variance-reduced paths are only independent across blocks, so such runs
+# use blocks of a power of two paths, at least this many of them, and take
+# the standard error from the spread of the block means.
+REPLICATES = 32
+# Adaptive runs (iter_monte_carlo with a precision or time budget) check
+# after every block. Their replicates hold at most this many paths, so
+# enough finish early for a stable standard error, which needs at least
+# MIN_STOPPING_SAMPLES paths, or replicates.
+ADAPTIVE_REPLICATE_PATHS = 256
+MIN_STOPPING_SAMPLES = 30
+DEFAULT_PRECISION = 1_000
+MAX_ADAPTIVE_PATHS = 1_000_000
+SCENARIOS = ("no_fc", "with_fc")
+PATH_FIELDS = (
+    "workers_over",
+    "workers_under",
+    "annual_overstaffing",
+    "annual_overtime",
+    "annual_sla",
+    "annual_total",
+)
+RESULT_KEYS = tuple(f"{s}_{f}" for s in SCENARIOS for f in PATH_FIELDS)
+SHARDS_PER_WORKER = 4
+
+
+def block_paths(n_buckets) -> int:
+    return max(1, BLOCK_PATHS * WEEKS_PER_YEAR // n_buckets)
+
+
+def block_size(n_paths, n_buckets, sampling="independent") -> int:
+    """Paths per block of a run; for variance-reduced sampling, per replicate."""
+    size = block_paths(n_buckets)
+    if sampling == "independent":
+        return size
+    size = min(size, max(2, n_paths // REPLICATES))
+    return 1 << (size.bit_length() - 1)
+
+
+def block_rng(seed_seq: np.random.SeedSequence, block: int) -> np.random.Generator:
+    """Generator for path block ``block`` (same as ``seed_seq.spawn(...)[block]``)."""
+    child = np.random.SeedSequence(seed_seq.entropy, spawn_key=(*seed_seq.spawn_key, block))
+    return np.random.default_rng(child)
+
+
+def sobol_points(n) -> np.ndarray:
+    """First ``n`` points of the two-dimensional Sobol sequence, as ``(n, 2)`` 32-bit fractions.
+
+    The first coordinate is the base-2 van der Corput sequence; the second
+    uses the direction numbers of the polynomial ``x + 1``
+    (``m_k = 2 m_{k-1} XOR m_{k-1}``: 1, 3, 5, 15, 17, ...).
+    """
+    bits = max(1, (n - 1).bit_length())
+    m = [1]
+    for _ in range(bits - 1):
+        m.append(m[-1] << 1 ^ m[-1])
+    shift = np.arange(31, 31 - bits, -1, dtype=np.uint64)[:, np.newaxis]
+    directions = np.stack([np.ones(bits, dtype=np.uint64), np.array(m, dtype=np.uint64)], axis=1) << shift
+    index = np.arange(n, dtype=np.uint64)
+    points = np.zeros((n, 2), dtype=np.uint64)
+    for bit in range(bits):
+        points ^= ((index >> np.uint64(bit)) & np.uint64(1))[:, np.newaxis] * directions[bit]
+    return points.astype(np.uint32)
+
+
+def standard_normals(rng: np.random.Generator, sampling, n_paths, n_buckets) -> np.ndarray:
+    """Demand and staffing normals for ``n_paths`` years, ``(2, n_paths, n_buckets)``.
+
+    ``"crn"`` draws them independently; ``"antithetic"`` also mirrors the
+    first half of the paths into the second; ``"sobol"`` gives each
+    bucket's pair of normals a randomized 2-D Sobol point through
+    Box-Muller, with its own random digital shift and point order per
+    bucket (padding), so the paths stratify every bucket's demand and
+    staffing jointly.
+    """
+    if sampling == "crn":
+        return rng.standard_normal((2, n_paths, n_buckets))
+    if sampling == "antithetic":
+        half = rng.standard_normal((2, -(-n_paths // 2), n_buckets))
+        return np.concatenate([half, -half], axis=1)[:, :n_paths]
+    if sampling == "sobol":
+        # Path-major, like every other per-bucket array: costing walks rows.
+        order = rng.permuted(np.tile(np.arange(n_paths)[:, np.newaxis], (1, n_buckets)), axis=0)
+        points = sobol_points(n_paths)[order]
+        points ^= rng.integers(0, 2 ** 32, (n_buckets, 2), dtype=np.uint32)
+        radius = np.sqrt(-2 * np.log((points[..., 0] + 0.5) / 2.0 ** 32))
+        # float32 trigonometry is vectorized here and ~30x faster than
+        # float64; its rounding is far below the sampling noise.
+        angle = points[..., 1].astype(np.float32) * np.float32(2 * np.pi / 2.0 ** 32)
+        return np.stack([radius * np.cos(angle), radius * np.sin(angle)])
+    raise ValueError(f"sampling must be one of {', '.join(SAMPLINGS)}")
+
+
+def simulate_paths(
+    rng: np.random.Generator,
+    n_paths,
+    units_per_week,
+    units_per_worker_per_week,
+    misallocation_no_forecast,
+    misallocation_with_forecast,
+    n_buckets=WEEKS_PER_YEAR,
+    profile=demand_model.FLAT_PROFILE,
+    sampling="independent",
+    noise=None,
+) -> dict:
+    """``n_paths`` years; every array is ``(n_paths, n_buckets)``.
+
+    A profile ``"forecast_error"`` replaces the normal with-forecast error,
+    as in :func:`simulate_year`. With ``sampling="independent"`` every path
+    and scenario draws its own numbers; the other ``SAMPLINGS`` staff both
+    scenarios off the same normals (common random numbers), so the savings
+    vary much less from path to path, and correlate the paths as
+    :func:`standard_normals` describes. ``noise`` passes in normals from
+    :func:`standard_normals` to reuse instead.
+    """
+    required_workers = units_per_week / units_per_worker_per_week
+    shape = (n_paths, n_buckets)
+    no_fc_spread = required_workers * misallocation_no_forecast / 200
+    with_fc_spread = required_workers * misallocation_with_forecast / 200
+
+    if noise is None and sampling != "independent":
+        noise = standard_normals(rng, sampling, n_paths, n_buckets)
+    demand = demand_model.draw(
+        rng, n_paths, units_per_week, profile, n_buckets, noise=None if noise is None else noise[0],
+    )
+    actual_needed = demand / units_per_worker_per_week
+
+    if noise is None:
+        no_fc_staff = rng.normal(required_workers, no_fc_spread, shape)
+    else:
+        no_fc_staff = noise[1] * no_fc_spread
+        no_fc_staff += required_workers
+    np.clip(no_fc_staff, 1, None, out=no_fc_staff)
+
+    if profile.get("forecast_error"):
+        with_fc_staff = actual_needed * (1 + backtest.resample(rng, profile["forecast_error"], n_paths, n_buckets))
+    else:
+        with_fc_staff = (
+            rng.normal(0, with_fc_spread, shape) if noise is None else noise[1] * with_fc_spread
+        )
+        with_fc_staff += actual_needed
+    np.clip(with_fc_staff, 1, None, out=with_fc_staff)
+
+    return {
+        "demand": demand,
+        "actual_needed": actual_needed,
+        "no_fc_staff": no_fc_staff,
+        "with_fc_staff": with_fc_staff,
+    }
+
+
+def ramp_loss(hires, ramp) -> np.ndarray:
+    """Workers' output lost to new hires still ramping up, per period.
+
+    A hire's productivity rises linearly to full over ``ramp`` periods, so
+    the loss is ``hires`` convolved with a falling triangle along the last
+    axis; two cumulative sums give it without a loop over periods or lags.
+    """
+    n = hires.shape[-1]
+    if ramp <= 1:
+        return np.zeros_like(hires)
+    s1 = np.cumsum(hires, axis=-1)
+    s2 = np.pad(np.cumsum(s1, axis=-1), [(0, 0)] * (hires.ndim - 1) + [(ramp, 0)])
+    loss = (ramp - 1) * s1
+    loss -= s2[..., ramp - 1:ramp - 1 + n]
+    loss += s2[..., :n]
+    loss /= ramp
+    return loss
+
+
+def _piecewise_gap_costs(
+    actual_needed, staff, weekly_worker_cost, hours_per_week, overtime_multiplier, sla_penalty_per_miss,
+    buckets_per_year, rules,
+) -> dict:
+    """``gap_costs`` under ``engine.LABOUR_RULES``, still whole-array per bucket.
+
+    Headcount is each week's peak scheduled staff, and every rise in it is
+    a hire (so day-to-day rostering is not): paid ``hiring_lead_weeks``
+    before starting, then short of full output while ramping up. That
+    unproductive pay counts as overstaffing; the shortfall left is covered
+    as in ``engine.cover_shortfall`` and misses SLA only where left uncovered.
+    """
+    n_buckets = actual_needed.shape[-1]
+    buckets_per_week = buckets_per_year / WEEKS_PER_YEAR
+    bucket_worker_cost = weekly_worker_cost / buckets_per_week
+
+    staff = np.maximum(staff, rules.get("min_shift_workers", 0))
+    week = (np.arange(n_buckets) // buckets_per_week).astype(np.intp)
+    headcount = np.maximum.reduceat(staff, np.flatnonzero(np.diff(week, prepend=-1)), axis=-1)
+    hires = np.diff(headcount, axis=-1, prepend=headcount[..., :1])
+    np.maximum(hires, 0, out=hires)
+    unproductive = ramp_loss(hires, round(rules.get("ramp_weeks", 0)))[..., week - week[0]]
+
+    gap = staff - unproductive
+    gap -= actual_needed
+    surplus = np.maximum(gap, 0)
+    shortfall = np.maximum(-gap, 0, out=gap)
+    overtime, agency, uncovered = engine.cover_shortfall(
+        shortfall, staff, bucket_worker_cost, hours_per_week, overtime_multiplier, rules,
+    )
+
+    annual_overstaffing = (surplus.sum(axis=-1) + unproductive.sum(axis=-1)) * bucket_worker_cost
+    annual_overstaffing += hires.sum(axis=-1) * rules.get("hiring_lead_weeks", 0) * weekly_worker_cost
+    annual_overtime = overtime.sum(axis=-1) + agency.sum(axis=-1)
+    annual_sla = np.count_nonzero(uncovered > 0, axis=-1) * (sla_penalty_per_miss / buckets_per_week)
+    return {
+        "workers_over": surplus.sum(axis=-1) / n_buckets,
+        "workers_under": shortfall.sum(axis=-1) / n_buckets,
+        "annual_overstaffing": annual_overstaffing,
+        "annual_overtime": annual_overtime,
+        "annual_sla": annual_sla,
+        "annual_total": annual_overstaffing + annual_overtime + annual_sla,
+    }
+
+
+def gap_costs(
+    actual_needed, staff, weekly_worker_cost, overtime_multiplier, sla_penalty_per_miss, buckets_per_year=None,
+    rules=None, hours_per_week=None,
+) -> dict:
+    """Cost of the staffing gaps along the last axis, summed per path.
+
+    The last axis is one year of buckets. Surplus workers are paid while
+    idle, a shortfall is covered with overtime at the premium, and every
+    understaffed bucket misses SLA; wage and penalty are spread evenly
+    over the buckets of a week. ``workers_over`` and ``workers_under`` are
+    the average surplus and shortfall per bucket. When costing only part of
+    a year, pass the year's ``buckets_per_year``. With piecewise ``rules``
+    (see ``engine.LABOUR_RULES``), an overtime cap also needs
+    ``hours_per_week``.
+    """
+    n_buckets = actual_needed.shape[-1]
+    buckets_per_year = buckets_per_year or n_buckets
+    if rules:
+        return _piecewise_gap_costs(
+            actual_needed, staff, weekly_worker_cost, hours_per_week, overtime_multiplier,
+            sla_penalty_per_miss, buckets_per_year, rules,
+        )
+    bucket_worker_cost = weekly_worker_cost * WEEKS_PER_YEAR / buckets_per_year
+    bucket_sla = sla_penalty_per_miss * WEEKS_PER_YEAR / buckets_per_year
+
+    gap = staff - actual_needed
+    total_gap = gap.sum(axis=-1)
+    misses = np.count_nonzero(gap < 0, axis=-1)
+    np.maximum(gap, 0, out=gap)
+    over = gap.sum(axis=-1)
+    under = over - total_gap
+
+    annual_overstaffing = over * bucket_worker_cost
+    annual_overtime = under * bucket_worker_cost * (overtime_multiplier - 1)
+    annual_sla = misses * bucket_sla
+    return {
+        "workers_over": over / n_buckets,
+        "workers_under": under / n_buckets,
+        "annual_overstaffing": annual_overstaffing,
+        "annual_overtime": annual_overtime,
+        "annual_sla": annual_sla,
+        "annual_total": annual_overstaffing + annual_overtime + annual_sla,
+    }
+
+
+# Path x bucket cells CostKernel costs at a time: one tile of gaps (512 kB)
+# stays in L2 across its passes. Smaller tiles lose more to per-call
+# overhead than they gain.
+TILE_CELLS = 1 << 16
+
+
+class CostKernel:
+    """:func:`gap_costs` without rules, fused and tiled, writing into given arrays.
+
+    The gaps are formed one tile of paths at a time in a preallocated
+    buffer, reduced with ``out=`` ufuncs into the caller's per-path arrays,
+    and scaled there in place, so a call allocates nothing whatever the
+    number of paths.
+    """
+
+    def __init__(self, n_buckets, tile_cells=TILE_CELLS):
+        self.n_buckets = n_buckets
+        self.tile = max(1, tile_cells // n_buckets)
+        self._gap = np.empty((self.tile, n_buckets))
+        self._under = np.empty((self.tile, n_buckets), dtype=bool)
+        self._total = np.empty(self.tile)
+
+    def __call__(
+        self, out, actual_needed, staff, weekly_worker_cost, overtime_multiplier, sla_penalty_per_miss,
+        buckets_per_year=None,
+    ):
+        """Write each ``PATH_FIELDS`` entry for the rows of ``actual_needed``/``staff`` into ``out[field]``."""
+        n_paths = actual_needed.shape[0]
+        buckets_per_year = buckets_per_year or self.n_buckets
+        bucket_worker_cost = weekly_worker_cost * WEEKS_PER_YEAR / buckets_per_year
+        over, under, misses = out["annual_overstaffing"], out["annual_overtime"], out["annual_sla"]
+
+        for start in range(0, n_paths, self.tile):
+            stop = min(start + self.tile, n_paths)
+            gap = self._gap[:stop - start]
+            total = self._total[:stop - start]
+            np.subtract(staff[start:stop], actual_needed[start:stop], out=gap)
+            np.sum(gap, axis=1, out=total)
+            np.less(gap, 0, out=self._under[:stop - start])
+            np.sum(self._under[:stop - start], axis=1, out=misses[start:stop])
+            np.maximum(gap, 0, out=gap)
+            np.sum(gap, axis=1, out=over[start:stop])
+            np.subtract(over[start:stop], total, out=under[start:stop])
+
+        np.divide(over, self.n_buckets, out=out["workers_over"])
+        np.divide(under, self.n_buckets, out=out["workers_under"])
+        over *= bucket_worker_cost
+        # Same operation order as gap_costs, so the results are bit-identical.
+        under *= bucket_worker_cost
+        under *= overtime_multiplier - 1
+        misses *= sla_penalty_per_miss * WEEKS_PER_YEAR / buckets_per_year
+        np.add(over, under, out=out["annual_total"])
+        out["annual_total"] += misses
+
+
+def _simulate_blocks(
+    out, seed_seq, blocks, size, n_paths, inputs, n_buckets, profile, rules=None, sampling="independent",
+):
+    """Simulate ``blocks`` of ``size`` paths and write their per-path costs into ``out``."""
+    (
+        units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+        overtime_multiplier, misallocation_no_forecast, misallocation_with_forecast,
+        sla_penalty_per_miss,
+    ) = inputs
+    worker_cost = hourly_rate * hours_per_week
+
+    kernel = None if rules else CostKernel(n_buckets)
+    for block in blocks:
+        start = block * size
+        stop = min(start + size, n_paths)
+        paths = simulate_paths(
+            block_rng(seed_seq, block), stop - start,
+            units_per_week, units_per_worker_per_week,
+            misallocation_no_forecast, misallocation_with_forecast,
+            n_buckets, profile, sampling,
+        )
+        for scenario in SCENARIOS:
+            if kernel is not None:
+                kernel(
+                    {field: out[f"{scenario}_{field}"][start:stop] for field in PATH_FIELDS},
+                    paths["actual_needed"], paths[f"{scenario}_staff"],
+                    worker_cost, overtime_multiplier, sla_penalty_per_miss,
+                )
+                continue
+            costs = gap_costs(
+                paths["actual_needed"], paths[f"{scenario}_staff"],
+                worker_cost, overtime_multiplier, sla_penalty_per_miss,
+                rules=rules, hours_per_week=hours_per_week,
+            )
+            for field, values in costs.items():
+                out[f"{scenario}_{field}"][start:stop] = values
+
+
+def _simulate_shard(shm_name, seed_seq, blocks, size, n_paths, inputs, n_buckets, profile, rules, sampling):
+    """Process-pool task: fill ``blocks`` of the shared result buffer."""
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        buf = np.ndarray((len(RESULT_KEYS), n_paths), dtype=np.float64, buffer=shm.buf)
+        _simulate_blocks(
+            dict(zip(RESULT_KEYS, buf)), seed_seq, blocks, size, n_paths, inputs, n_buckets, profile, rules, sampling,
+        )
+        del buf
+    finally:
+        shm.close()
+
+
+def _simulate_parallel(seed_seq, size, n_paths, inputs, n_buckets, profile, rules, sampling, workers) -> np.ndarray:
+    # Imported here: the app process never runs in parallel.
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    n_blocks = -(-n_paths // size)
+    # A few shards per worker keeps cores busy when blocks finish unevenly.
+    n_shards = min(n_blocks, workers * SHARDS_PER_WORKER)
+    shards = [range(*span) for span in _spans(n_blocks, n_shards)]
+
+    shm = shared_memory.SharedMemory(create=True, size=len(RESULT_KEYS) * n_paths * 8)
+    try:
+        buf = np.ndarray((len(RESULT_KEYS), n_paths), dtype=np.float64, buffer=shm.buf)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _simulate_shard, shm.name, seed_seq, shard, size, n_paths, inputs, n_buckets, profile, rules,
+                    sampling,
+                )
+                for shard in shards
+            ]
+            for future in futures:
+                future.result()
+        results = buf.copy()
+        del buf
+    finally:
+        shm.close()
+        shm.unlink()
+    return results
+
+
+def _spans(n, parts):
+    bounds = np.linspace(0, n, parts + 1).astype(int)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def monte_carlo(
+    units_per_week,
+    units_per_worker_per_week,
+    hourly_rate,
+    hours_per_week,
+    overtime_multiplier,
+    misallocation_no_forecast,
+    misallocation_with_forecast,
+    sla_penalty_per_miss,
+    n_paths=10_000,
+    seed=None,
+    workers=1,
+    granularity="weekly",
+    profile=demand_model.FLAT_PROFILE,
+    rules=None,
+    sampling="independent",
+) -> dict:
+    """Simulate and cost ``n_paths`` years, one block of paths at a time.
+
+    Only per-path results are kept (``"<scenario>_<field>"`` for every
+    ``PATH_FIELDS`` entry, plus ``"annual_savings"``), so memory grows by
+    ~100 bytes per path rather than with the per-bucket arrays, whatever
+    the ``granularity``. ``"seed"`` is the entropy that reproduces the run.
+    With ``workers > 1`` blocks are sharded over a process pool writing
+    into shared memory; results are bit-identical for any ``workers``.
+    ``rules`` switches to the piecewise costs of ``engine.LABOUR_RULES``.
+    ``sampling`` picks one of ``SAMPLINGS`` (see :func:`simulate_paths`);
+    ``"replicate_paths"`` is then the block size to pass to
+    :func:`summarize`, or ``None`` for independent paths.
+    """
+    seed_seq = np.random.SeedSequence(seed)
+    n_buckets = GRANULARITIES[granularity]
+    inputs = (
+        units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+        overtime_multiplier, misallocation_no_forecast, misallocation_with_forecast,
+        sla_penalty_per_miss,
+    )
+
+    size = block_size(n_paths, n_buckets, sampling)
+    if workers > 1 and n_paths > size:
+        out = dict(zip(
+            RESULT_KEYS,
+            _simulate_parallel(seed_seq, size, n_paths, inputs, n_buckets, profile, rules, sampling, workers),
+        ))
+    else:
+        out = {key: np.empty(n_paths) for key in RESULT_KEYS}
+        n_blocks = -(-n_paths // size)
+        _simulate_blocks(out, seed_seq, range(n_blocks), size, n_paths, inputs, n_buckets, profile, rules, sampling)
+
+    out["annual_savings"] = out["no_fc_annual_total"] - out["with_fc_annual_total"]
+    out["seed"] = seed_seq.entropy
+    out["replicate_paths"] = None if sampling == "independent" else size
+    return out
+
+
+def iter_monte_carlo(
+    units_per_week,
+    units_per_worker_per_week,
+    hourly_rate,
+    hours_per_week,
+    overtime_multiplier,
+    misallocation_no_forecast,
+    misallocation_with_forecast,
+    sla_penalty_per_miss,
+    n_paths=10_000,
+    seed=None,
+    granularity="weekly",
+    profile=demand_model.FLAT_PROFILE,
+    rules=None,
+    sampling="independent",
+    precision=None,
+    confidence=0.95,
+    time_budget=None,
+):
+    """:func:`monte_carlo` one block at a time, for progressive display.
+
+    Yields ``(paths_done, out)`` after each block; ``out`` has the same
+    keys as ``monte_carlo``'s result, filled for the first ``paths_done``
+    paths, and once exhausted equals it bit for bit. Stop iterating to
+    cancel the run.
+
+    ``out["half_width"]`` is the half width of the ``confidence`` interval
+    of the mean savings so far, kept by a streaming ``Welford``
+    accumulator. With a ``precision`` (€) or a ``time_budget`` (seconds)
+    the run is adaptive: it stops after the block that brings the half
+    width within ``precision`` or spends the budget, and ``n_paths`` is
+    only the most it will simulate. ``out["stop_reason"]`` is then
+    ``"precision"``, ``"time_budget"`` or ``"paths"`` on the last yield.
+    """
+    if n_paths < 1:
+        raise ValueError("n_paths must be at least 1")
+    seed_seq = np.random.SeedSequence(seed)
+    n_buckets = GRANULARITIES[granularity]
+    inputs = (
+        units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+        overtime_multiplier, misallocation_no_forecast, misallocation_with_forecast,
+        sla_penalty_per_miss,
+    )
+    adaptive = precision is not None or time_budget is not None
+    size = block_size(n_paths, n_buckets, sampling)
+    if adaptive and sampling != "independent":
+        size = min(size, ADAPTIVE_REPLICATE_PATHS)
+    # Untouched pages of np.empty are never committed, so an adaptive run
+    # that stops early only uses memory for the paths it simulated.
+    out = {key: np.empty(n_paths) for key in (*RESULT_KEYS, "annual_savings")}
+    out["seed"] = seed_seq.entropy
+    out["replicate_paths"] = None if sampling == "independent" else size
+    out["stop_reason"] = None
+    stats = Welford()
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    started = time.perf_counter()
+    n_blocks = -(-n_paths // size)
+    for block in range(n_blocks):
+        _simulate_blocks(out, seed_seq, (block,), size, n_paths, inputs, n_buckets, profile, rules, sampling)
+        start, stop = block * size, min((block + 1) * size, n_paths)
+        savings = np.subtract(
+            out["no_fc_annual_total"][start:stop], out["with_fc_annual_total"][start:stop],
+            out=out["annual_savings"][start:stop],
+        )
+        # Variance-reduced paths are only independent replicate to replicate.
+        stats.update(savings if sampling == "independent" else savings.mean())
+        out["half_width"] = z * stats.std_error
+        if adaptive:
+            if precision is not None and stats.count >= MIN_STOPPING_SAMPLES and out["half_width"] <= precision:
+                out["stop_reason"] = "precision"
+            elif time_budget is not None and time.perf_counter() - started >= time_budget:
+                out["stop_reason"] = "time_budget"
+            elif block == n_blocks - 1:
+                out["stop_reason"] = "paths"
+        yield stop, out
+        if out["stop_reason"]:
+            return
+
+
+def adaptive_monte_carlo(*args, precision=DEFAULT_PRECISION, n_paths=MAX_ADAPTIVE_PATHS, **kwargs) -> dict:
+    """:func:`iter_monte_carlo` run until it stops; arrays hold only the paths simulated."""
+    for done, out in iter_monte_carlo(*args, n_paths=n_paths, precision=precision, **kwargs):
+        pass
+    return {key: value[:done].copy() if isinstance(value, np.ndarray) else value for key, value in out.items()}
+
+
+FAN_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def percentile_bands(
+    units_per_week,
+    units_per_worker_per_week,
+    n_paths=10_000,
+    seed=SEED,
+    granularity="weekly",
+    profile=demand_model.FLAT_PROFILE,
+    percentiles=FAN_PERCENTILES,
+) -> np.ndarray:
+    """Percentiles of workers needed per bucket over ``n_paths`` years.
+
+    Returns ``(len(percentiles), n_buckets)``. Paths come from the same
+    seeded blocks as :func:`monte_carlo`, so the fan matches its costs;
+    only the demand is drawn, into one float32 ``(n_paths, n_buckets)``
+    buffer (~14 MB for 10k daily paths).
+    """
+    seed_seq = np.random.SeedSequence(seed)
+    n_buckets = GRANULARITIES[granularity]
+    needed = np.empty((n_paths, n_buckets), dtype=np.float32)
+    size = block_paths(n_buckets)
+    for block in range(-(-n_paths // size)):
+        start = block * size
+        stop = min(start + size, n_paths)
+        demand = demand_model.draw(block_rng(seed_seq, block), stop - start, units_per_week, profile, n_buckets)
+        np.divide(demand, units_per_worker_per_week, out=needed[start:stop], casting="same_kind")
+    return np.percentile(needed, percentiles, axis=0)
+
+
+def expected_costs(mc: dict, scenario: str) -> dict:
+    """Path-average of one ``monte_carlo`` scenario, shaped like ``engine.scenario_costs``."""
+    costs = {field: float(mc[f"{scenario}_{field}"].mean()) for field in PATH_FIELDS}
+    for component in ("overstaffing", "overtime", "sla"):
+        costs[f"monthly_{component}"] = costs[f"annual_{component}"] / MONTHS_PER_YEAR
+    return {field: costs[field] for field in COST_FIELDS}
+
+
+class Welford:
+    """Streaming count, mean and variance of everything passed to ``update``.
+
+    Each batch is merged in with the pairwise form of Welford's update
+    (Chan et al.), which stays accurate over millions of values without
+    keeping them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        mean = values.mean()
+        delta = mean - self.mean
+        total = self.count + values.size
+        self._m2 += np.square(values - mean).sum() + delta ** 2 * self.count * values.size / total
+        self.mean += delta * values.size / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else float("nan")
+
+    @property
+    def std_error(self) -> float:
+        return float(np.sqrt(self.variance / self.count)) if self.count > 1 else float("nan")
+
+
+def replicate_std_error(values, replicate_paths) -> float:
+    """Standard error of the mean from the means of consecutive ``replicate_paths`` blocks.
+
+    Valid when the blocks are independent, whatever the paths within one;
+    a shorter last block is weighted by its size.
+    """
+    starts = np.arange(0, values.size, replicate_paths)
+    if starts.size < 2:
+        return float("nan")
+    counts = np.diff(starts, append=values.size)
+    deviations = np.add.reduceat(values, starts) / counts - values.mean()
+    deviations *= counts / values.size
+    return float(np.sqrt(starts.size / (starts.size - 1) * np.dot(deviations, deviations)))
+
+
+def summarize(values, replicate_paths=None) -> dict:
+    """Mean, standard error, P5/P50/P95 and probability of a negative value.
+
+    For a variance-reduced run pass its ``"replicate_paths"``; the standard
+    error then comes from the replicates, and ``"variance_reduction"`` is
+    how many times more independent paths the same standard error needs.
+    """
+    values = np.asarray(values)
+    p5, p50, p95 = np.percentile(values, [5, 50, 95])
+    variance = values.var(ddof=1) if values.size > 1 else float("nan")
+    summary = {
+        "mean": float(values.mean()),
+        "std_error": float(np.sqrt(variance / values.size)),
+        "p5": float(p5),
+        "p50": float(p50),
+        "p95": float(p95),
+        "prob_negative": float(np.count_nonzero(values < 0) / values.size),
+    }
+    if replicate_paths:
+        summary["std_error"] = replicate_std_error(values, replicate_paths)
+        summary["variance_reduction"] = float(variance / values.size / summary["std_error"] ** 2)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo savings for one warehouse.")
+    parser.add_argument("--units-per-week", type=float, default=30_000)
+    parser.add_argument("--units-per-worker-per-week", type=float, default=600)
+    parser.add_argument("--hourly-rate", type=float, default=12.50)
+    parser.add_argument("--hours-per-week", type=float, default=40)
+    parser.add_argument("--overtime-multiplier", type=float, default=1.25)
+    parser.add_argument("--misallocation-no-forecast", type=float, default=20)
+    parser.add_argument("--misallocation-with-forecast", type=float, default=5)
+    parser.add_argument("--sla-penalty-per-miss", type=float, default=500)
+    parser.add_argument("--paths", type=int, default=100_000, help="simulated years (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=None, help="omit for a fresh seed; it is printed")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes (default: all cores); adaptive runs are serial")
+    parser.add_argument("--granularity", choices=list(GRANULARITIES), default="weekly")
+    parser.add_argument("--seasonality", choices=list(demand_model.SEASONALITIES), default="flat")
+    parser.add_argument("--trend", type=float, default=0.0, help="annual demand growth, e.g. 0.05")
+    parser.add_argument("--ar1", type=float, default=0.0, help="week-to-week demand autocorrelation")
+    parser.add_argument("--peak-promotions", action="store_true", help="add Black Friday and Christmas spikes")
+    parser.add_argument("--sampling", choices=SAMPLINGS, default="independent",
+                        help="variance reduction for the savings (default: %(default)s)")
+    parser.add_argument("--precision", type=float,
+                        help="stop once the 95%% interval of the mean savings is within ± this many €; "
+                             "--paths is then the most simulated")
+    parser.add_argument("--time-budget", type=float, help="stop after about this many seconds")
+    rules = parser.add_argument_group("piecewise labour rules (see engine.LABOUR_RULES)")
+    rules.add_argument("--overtime-cap-hours", type=float, help="overtime hours per worker per week")
+    rules.add_argument("--agency-tier", action="append", default=[], metavar="WORKERS:MULTIPLIER",
+                       help="agency capacity and wage multiplier; repeat for more tiers, cheapest first")
+    rules.add_argument("--min-shift-workers", type=float, default=0)
+    rules.add_argument("--hiring-lead-weeks", type=float, default=0)
+    rules.add_argument("--ramp-weeks", type=float, default=0)
+    args = parser.parse_args(argv)
+    labour_rules = {
+        "overtime_cap_hours": args.overtime_cap_hours,
+        "agency_tiers": tuple(tuple(float(x) for x in tier.split(":")) for tier in args.agency_tier),
+        "min_shift_workers": args.min_shift_workers,
+        "hiring_lead_weeks": args.hiring_lead_weeks,
+        "ramp_weeks": args.ramp_weeks,
+    }
+
+    adaptive = args.precision is not None or args.time_budget is not None
+    if adaptive and args.workers is not None:
+        parser.error("--workers can't be combined with --precision or --time-budget")
+    run = adaptive_monte_carlo if adaptive else monte_carlo
+    options = (
+        dict(precision=args.precision, time_budget=args.time_budget) if adaptive
+        else dict(workers=args.workers or os.cpu_count() or 1)
+    )
+    mc = run(
+        args.units_per_week, args.units_per_worker_per_week, args.hourly_rate, args.hours_per_week,
+        args.overtime_multiplier, args.misallocation_no_forecast, args.misallocation_with_forecast,
+        args.sla_penalty_per_miss,
+        n_paths=args.paths, seed=args.seed, granularity=args.granularity,
+        profile={
+            "seasonality": args.seasonality,
+            "trend": args.trend,
+            "ar1": args.ar1,
+            "promotions": demand_model.PEAK_PROMOTIONS if args.peak_promotions else (),
+        },
+        rules=labour_rules if labour_rules != engine.LABOUR_RULES else None,
+        sampling=args.sampling,
+        **options,
+    )
+    report = {
+        "paths": mc["annual_savings"].size,
+        "granularity": args.granularity,
+        "sampling": args.sampling,
+        "seed": mc["seed"],
+        "no_fc_annual_total": float(mc["no_fc_annual_total"].mean()),
+        "with_fc_annual_total": float(mc["with_fc_annual_total"].mean()),
+        "annual_savings": summarize(mc["annual_savings"], mc["replicate_paths"]),
+    }
+    if adaptive:
+        report["stop_reason"] = mc["stop_reason"]
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Cost-minimizing headcount per week.
+
+Weekly need is modelled as normal, ``D ~ N(mean, sd)`` workers. Scheduling
+``s`` workers costs
+
+    c * E[s - D]+  +  c * (overtime_multiplier - 1) * E[D - s]+  +  P * Pr(D > s)
+
+with ``c`` the weekly worker cost and ``P`` the SLA penalty per missed week.
+Without the SLA term this is the newsvendor problem, solved by the
+critical fractile. The SLA term pushes the optimum above it; the first-order
+condition then has a single root, found by a bracketed Newton iteration run
+on every site x week cell at once.
+"""
+import numpy as np
+
+import demand as demand_model
+from engine import WEEKS_PER_YEAR
+
+# Abramowitz & Stegun 7.1.26 (max abs error 1.5e-7); avoids a scipy dependency.
+_ERF_P = 0.3275911
+_ERF_A = (0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429)
+_SQRT2 = np.sqrt(2.0)
+_SQRT2PI = np.sqrt(2.0 * np.pi)
+
+Z_BOUNDS = (-8.0, 8.0)
+NEWTON_ITERATIONS = 20
+NEWTON_TOLERANCE = 1e-9
+
+
+def norm_cdf(z):
+    x = np.abs(z) / _SQRT2
+    t = 1.0 / (1.0 + _ERF_P * x)
+    a1, a2, a3, a4, a5 = _ERF_A
+    erf = 1.0 - ((((a5 * t + a4) * t + a3) * t + a2) * t + a1) * t * np.exp(-x * x)
+    return 0.5 * (1.0 + np.copysign(erf, z))
+
+
+def norm_pdf(z):
+    return np.exp(-0.5 * np.square(z)) / _SQRT2PI
+
+
+def critical_fractile(overtime_multiplier):
+    """Service level that minimizes idle + overtime cost, ignoring SLA."""
+    premium = np.asarray(overtime_multiplier, dtype=float) - 1
+    return premium / (premium + 1)
+
+
+def demand_distribution(
+    units_per_week,
+    units_per_worker_per_week,
+    profile=demand_model.FLAT_PROFILE,
+    n_buckets=WEEKS_PER_YEAR,
+    cv=demand_model.DEMAND_CV,
+):
+    """Mean and standard deviation of workers needed, ``(..., n_buckets)``.
+
+    Site inputs broadcast against the bucket axis, so pass ``(n_sites, 1)``
+    arrays for many sites.
+    """
+    workers = np.asarray(units_per_week, dtype=float) / units_per_worker_per_week
+    mean = workers * demand_model.mean_curve(profile, n_buckets)
+    return mean, mean * cv
+
+
+def expected_cost(staff, mean, sd, weekly_worker_cost, overtime_multiplier, sla_penalty_per_miss):
+    """Expected weekly cost of scheduling ``staff`` workers."""
+    z = (staff - mean) / sd
+    cdf, pdf = norm_cdf(z), norm_pdf(z)
+    expected_over = sd * (z * cdf + pdf)
+    expected_under = expected_over - (staff - mean)
+    return (
+        weekly_worker_cost * expected_over
+        + weekly_worker_cost * (overtime_multiplier - 1) * expected_under
+        + sla_penalty_per_miss * (1 - cdf)
+    )
+
+
+def optimal_headcount(mean, sd, weekly_worker_cost, overtime_multiplier, sla_penalty_per_miss):
+    """Cost-minimizing staff for every cell of the broadcast inputs."""
+    mean, sd = np.broadcast_arrays(np.asarray(mean, dtype=float), np.asarray(sd, dtype=float))
+    overtime_multiplier = np.asarray(overtime_multiplier, dtype=float)
+    # Divided through by the idle cost, the problem only depends on the
+    # overtime multiplier and the penalty in units of ``c * sd``.
+    under_cost = overtime_multiplier - 1
+    k = np.asarray(sla_penalty_per_miss, dtype=float) / (np.asarray(weekly_worker_cost, dtype=float) * sd)
+
+    # Marginal cost in z units is h(z) = overtime_multiplier * cdf - under_cost
+    # - k * pdf. It is negative up to a single root and positive after it, so
+    # the root stays bracketed; Newton steps that leave the bracket fall back
+    # to bisection. Converged cells drop out of later iterations.
+    shape = mean.shape
+    ot, under_cost, k = (np.broadcast_to(x, shape).ravel() for x in (overtime_multiplier, under_cost, k))
+    z = np.broadcast_to(np.clip(norm_ppf(critical_fractile(overtime_multiplier)), *Z_BOUNDS), shape).ravel()
+    lo = np.full(z.size, Z_BOUNDS[0])
+    hi = np.full(z.size, Z_BOUNDS[1])
+    active = np.arange(z.size)
+    for _ in range(NEWTON_ITERATIONS):
+        za, ota, ka = z[active], ot[active], k[active]
+        cdf, pdf = norm_cdf(za), norm_pdf(za)
+        h = ota * cdf - under_cost[active] - ka * pdf
+        slope = pdf * (ota + ka * za)
+        lo_a = np.where(h <= 0, za, lo[active])
+        hi_a = np.where(h > 0, za, hi[active])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = h / slope
+        za = za - step
+        inside = (za >= lo_a) & (za <= hi_a)
+        za = np.where(inside, za, 0.5 * (lo_a + hi_a))
+        z[active], lo[active], hi[active] = za, lo_a, hi_a
+        active = active[~(inside & (np.abs(step) < NEWTON_TOLERANCE)) & (hi_a - lo_a > NEWTON_TOLERANCE)]
+        if not active.size:
+            break
+    z = z.reshape(shape)
+
+    return np.maximum(mean + z * sd, 0.0)
+
+
+def norm_ppf(p):
+    """Standard normal quantile, Abramowitz & Stegun 26.2.23 (abs error < 4.5e-4).
+
+    Only used as a Newton starting point.
+    """
+    p = np.clip(np.asarray(p, dtype=float), 1e-12, 1 - 1e-12)
+    q = np.minimum(p, 1 - p)
+    t = np.sqrt(-2.0 * np.log(q))
+    z = t - (2.515517 + 0.802853 * t + 0.010328 * t * t) / (
+        1 + 1.432788 * t + 0.189269 * t * t + 0.001308 * t * t * t
+    )
+    return np.where(p < 0.5, -z, z)
+
+
+def solve(
+    units_per_week,
+    units_per_worker_per_week,
+    hourly_rate,
+    hours_per_week,
+    overtime_multiplier,
+    sla_penalty_per_miss,
+    profile=demand_model.FLAT_PROFILE,
+    n_buckets=WEEKS_PER_YEAR,
+) -> dict:
+    """Optimal weekly headcount and its expected annual cost.
+
+    Also returns the cost of scheduling exactly the expected need, for
+    comparison. Arrays are ``(..., n_buckets)``.
+    """
+    mean, sd = demand_distribution(units_per_week, units_per_worker_per_week, profile, n_buckets)
+    worker_cost = np.asarray(hourly_rate, dtype=float) * hours_per_week * WEEKS_PER_YEAR / n_buckets
+    sla = np.asarray(sla_penalty_per_miss, dtype=float) * WEEKS_PER_YEAR / n_buckets
+
+    staff = optimal_headcount(mean, sd, worker_cost, overtime_multiplier, sla)
+    return {
+        "mean_needed": mean,
+        "optimal_staff": staff,
+        "annual_cost_optimal": expected_cost(staff, mean, sd, worker_cost, overtime_multiplier, sla).sum(axis=-1),
+        "annual_cost_at_mean": expected_cost(mean, mean, sd, worker_cost, overtime_multiplier, sla).sum(axis=-1),
+    }
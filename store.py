@@ -0,0 +1,260 @@
+"""On-disk store for simulation runs.
+
+Each run is a directory of ``.npy`` arrays, ``(n_paths, n_buckets)``
+float32, named after a hash of its inputs; ``manifest.json`` at the root
+lists every run with its inputs. Arrays are written block by block
+through memory maps and reopened read-only with ``mmap_mode="r"``, so
+slicing some paths or weeks, or re-costing at another wage, only reads
+the pages it touches.
+
+    python store.py run --paths 100000 --granularity daily
+    python store.py list
+    python store.py recost <key> --hourly-rate 14 --weeks 40-52
+
+The store lives in ``STAFFING_STORE`` (default ``./.runs``).
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+import demand as demand_model
+import simulation
+from engine import WEEKS_PER_YEAR
+
+STORE_DIR = os.environ.get("STAFFING_STORE", ".runs")
+MANIFEST = "manifest.json"
+# Per-bucket arrays of a run. Costs are not stored: Run.recost derives them
+# from these at any wage and penalty.
+ARRAYS = ("demand", "no_fc_staff", "with_fc_staff")
+DTYPE = np.float32
+COST_INPUTS = ("hourly_rate", "hours_per_week", "overtime_multiplier", "sla_penalty_per_miss")
+
+
+def _plain(o):
+    """``json.dumps`` default: NumPy scalars and arrays, and other sequences, as plain values."""
+    return o.tolist() if hasattr(o, "tolist") else list(o)
+
+
+def run_key(inputs: dict) -> str:
+    """Stable hash of a run's inputs."""
+    canonical = json.dumps(inputs, sort_keys=True, default=_plain)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+class Run:
+    """A stored run; arrays are opened lazily as read-only memory maps."""
+
+    def __init__(self, path: Path, meta: dict):
+        self.path = path
+        self.key = meta["key"]
+        self.inputs = meta["inputs"]
+        self.shape = tuple(meta["shape"])
+        self._arrays = {}
+
+    def __getitem__(self, name) -> np.ndarray:
+        if name not in self._arrays:
+            self._arrays[name] = np.load(self.path / f"{name}.npy", mmap_mode="r")
+        return self._arrays[name]
+
+    def actual_needed(self, paths=slice(None), buckets=slice(None)) -> np.ndarray:
+        return self["demand"][paths, buckets] / DTYPE(self.inputs["units_per_worker_per_week"])
+
+    def recost(self, paths=slice(None), buckets=slice(None), **changes) -> dict:
+        """Per-path costs of both scenarios over a slice, with some cost inputs changed.
+
+        ``changes`` may override any of ``COST_INPUTS``; staffing and
+        demand are reused as stored. Returns ``{"<scenario>_<field>": array}``
+        like ``simulation.monte_carlo``, over the selected buckets only.
+        """
+        unknown = set(changes) - set(COST_INPUTS)
+        if unknown:
+            raise ValueError(f"Cannot re-cost with {', '.join(sorted(unknown))}; use one of {COST_INPUTS}")
+        inputs = {**self.inputs, **changes}
+        actual_needed = self.actual_needed(paths, buckets)
+        out = {}
+        for scenario in simulation.SCENARIOS:
+            costs = simulation.gap_costs(
+                actual_needed, self[f"{scenario}_staff"][paths, buckets],
+                inputs["hourly_rate"] * inputs["hours_per_week"], inputs["overtime_multiplier"],
+                inputs["sla_penalty_per_miss"], buckets_per_year=self.shape[1],
+            )
+            out.update({f"{scenario}_{field}": values for field, values in costs.items()})
+        out["annual_savings"] = out["no_fc_annual_total"] - out["with_fc_annual_total"]
+        return out
+
+
+class ResultStore:
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def manifest(self) -> dict:
+        try:
+            with open(self.root / MANIFEST) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _add_to_manifest(self, meta):
+        manifest = self.manifest()
+        manifest[meta["key"]] = meta
+        tmp = self.root / f".{MANIFEST}.{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2, default=_plain)
+        os.replace(tmp, self.root / MANIFEST)
+
+    def open(self, key) -> Run:
+        meta = self.manifest().get(key)
+        if meta is None:
+            raise KeyError(f"No stored run {key!r}")
+        return Run(self.root / key, meta)
+
+    def simulate(
+        self,
+        units_per_week,
+        units_per_worker_per_week,
+        hourly_rate,
+        hours_per_week,
+        overtime_multiplier,
+        misallocation_no_forecast,
+        misallocation_with_forecast,
+        sla_penalty_per_miss,
+        n_paths=10_000,
+        seed=simulation.SEED,
+        granularity="weekly",
+        profile=demand_model.FLAT_PROFILE,
+    ) -> Run:
+        """Open the stored run for these inputs, simulating it first if needed.
+
+        Paths come from the same seeded blocks as ``simulation.monte_carlo``.
+        The arrays don't depend on ``COST_INPUTS``, so runs differing only
+        in those share one key; the returned run re-costs at the given ones
+        by default. With ``seed=None`` the run is keyed on, and records, the
+        fresh entropy drawn for it.
+        """
+        # Plain floats, so 30000 and np.float64(30000) are the same run.
+        inputs = {
+            "units_per_week": float(units_per_week),
+            "units_per_worker_per_week": float(units_per_worker_per_week),
+            "hourly_rate": float(hourly_rate),
+            "hours_per_week": float(hours_per_week),
+            "overtime_multiplier": float(overtime_multiplier),
+            "misallocation_no_forecast": float(misallocation_no_forecast),
+            "misallocation_with_forecast": float(misallocation_with_forecast),
+            "sla_penalty_per_miss": float(sla_penalty_per_miss),
+            "n_paths": int(n_paths),
+            "seed": np.random.SeedSequence(seed).entropy,
+            "granularity": granularity,
+            "profile": profile,
+        }
+        key = run_key({name: value for name, value in inputs.items() if name not in COST_INPUTS})
+        meta = self.manifest().get(key)
+        if meta is not None:
+            costs = {name: inputs[name] for name in COST_INPUTS}
+            return Run(self.root / key, {**meta, "inputs": {**meta["inputs"], **costs}})
+
+        n_buckets = simulation.GRANULARITIES[granularity]
+        path = self.root / key
+        path.mkdir(exist_ok=True)
+        arrays = {
+            name: np.lib.format.open_memmap(path / f"{name}.npy", mode="w+", dtype=DTYPE, shape=(n_paths, n_buckets))
+            for name in ARRAYS
+        }
+        seed_seq = np.random.SeedSequence(inputs["seed"])
+        size = simulation.block_paths(n_buckets)
+        for block in range(-(-n_paths // size)):
+            start = block * size
+            stop = min(start + size, n_paths)
+            paths = simulation.simulate_paths(
+                simulation.block_rng(seed_seq, block), stop - start,
+                units_per_week, units_per_worker_per_week,
+                misallocation_no_forecast, misallocation_with_forecast,
+                n_buckets, profile,
+            )
+            arrays["demand"][start:stop] = paths["demand"]
+            for scenario in simulation.SCENARIOS:
+                arrays[f"{scenario}_staff"][start:stop] = paths[f"{scenario}_staff"]
+        for array in arrays.values():
+            array.flush()
+        del arrays
+
+        meta = {"key": key, "inputs": inputs, "shape": [n_paths, n_buckets], "created": time.time()}
+        self._add_to_manifest(meta)
+        return Run(path, meta)
+
+
+def _span(text, n_buckets):
+    """``"40-52"`` (weeks, inclusive) as a bucket slice."""
+    if not text:
+        return slice(None)
+    first, _, last = text.partition("-")
+    per_week = n_buckets / WEEKS_PER_YEAR
+    return slice(int((int(first) - 1) * per_week), int(int(last or first) * per_week))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Persisted simulation runs.")
+    parser.add_argument("--store", default=STORE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="simulate and store a run (reused if already stored)")
+    run.add_argument("--units-per-week", type=float, default=30_000)
+    run.add_argument("--units-per-worker-per-week", type=float, default=600)
+    run.add_argument("--hourly-rate", type=float, default=12.50)
+    run.add_argument("--hours-per-week", type=float, default=40)
+    run.add_argument("--overtime-multiplier", type=float, default=1.25)
+    run.add_argument("--misallocation-no-forecast", type=float, default=20)
+    run.add_argument("--misallocation-with-forecast", type=float, default=5)
+    run.add_argument("--sla-penalty-per-miss", type=float, default=500)
+    run.add_argument("--paths", type=int, default=10_000)
+    run.add_argument("--seed", type=int, default=simulation.SEED)
+    run.add_argument("--granularity", choices=list(simulation.GRANULARITIES), default="weekly")
+
+    sub.add_parser("list", help="list stored runs")
+
+    recost = sub.add_parser("recost", help="re-cost a stored run over some paths/weeks")
+    recost.add_argument("key")
+    recost.add_argument("--paths", help="first-last path, 0-based inclusive (default: all)")
+    recost.add_argument("--weeks", help="first-last week, 1-52 inclusive (default: all)")
+    for name in COST_INPUTS:
+        recost.add_argument(f"--{name.replace('_', '-')}", type=float)
+
+    args = parser.parse_args(argv)
+    store = ResultStore(args.store)
+    if args.command == "list":
+        report = {key: {**meta["inputs"], "shape": meta["shape"]} for key, meta in store.manifest().items()}
+    elif args.command == "run":
+        r = store.simulate(
+            args.units_per_week, args.units_per_worker_per_week, args.hourly_rate, args.hours_per_week,
+            args.overtime_multiplier, args.misallocation_no_forecast, args.misallocation_with_forecast,
+            args.sla_penalty_per_miss, n_paths=args.paths, seed=args.seed, granularity=args.granularity,
+        )
+        report = {"key": r.key, "path": str(r.path), "shape": list(r.shape)}
+    else:
+        r = store.open(args.key)
+        paths = slice(None)
+        if args.paths:
+            first, _, last = args.paths.partition("-")
+            paths = slice(int(first), int(last or first) + 1)
+        buckets = _span(args.weeks, r.shape[1])
+        changes = {name: getattr(args, name) for name in COST_INPUTS if getattr(args, name) is not None}
+        costs = r.recost(paths, buckets, **changes)
+        report = {
+            "key": r.key,
+            "changes": changes,
+            "no_fc_total": float(costs["no_fc_annual_total"].mean()),
+            "with_fc_total": float(costs["with_fc_annual_total"].mean()),
+            "savings": simulation.summarize(costs["annual_savings"]),
+        }
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Monte Carlo runs in a background thread, published as they progress.
+
+A ``Run`` iterates ``simulation.iter_monte_carlo`` in a daemon thread and
+publishes a snapshot of the paths done so far (``simulation.summarize`` of
+the savings plus ``"paths"``) once it has a standard error (after the first
+block, or two replicates of a variance-reduced sampling), then at most
+every ``SNAPSHOT_SECONDS``, and when it finishes. The page polls ``snapshot()``
+from a fragment, so it renders straight away and the estimate tightens as
+paths complete. NumPy releases the GIL inside the block computations, so
+the thread does not stall the server.
+
+``cancel()`` stops the thread after its current block; the app cancels a
+run as soon as its inputs change. A run nobody has asked for a snapshot
+for in ``ABANDON_SECONDS`` (its browser session has ended) cancels itself.
+An adaptive run (``precision`` or ``time_budget``) publishes its last block
+as soon as it stops.
+"""
+import threading
+import time
+
+import simulation
+
+# Percentiles over all paths so far cost O(paths); don't redo them per block.
+SNAPSHOT_SECONDS = 0.2
+# Well above a polling interval, even one a browser throttles in a hidden tab.
+ABANDON_SECONDS = 120
+
+
+class Run:
+    def __init__(self, key, *args, abandon_after=ABANDON_SECONDS, **kwargs):
+        """Start simulating; ``args``/``kwargs`` are ``simulation.iter_monte_carlo``'s."""
+        self.key = key
+        self.abandon_after = abandon_after
+        self.n_paths = kwargs.get("n_paths", 10_000)
+        self.precision = kwargs.get("precision")
+        self.history = []
+        self.error = None
+        self._snapshot = None
+        self._seen = time.perf_counter()
+        self._lock = threading.Lock()
+        self._first = threading.Event()
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=args, kwargs=kwargs, daemon=True)
+        self._thread.start()
+
+    def _run(self, *args, **kwargs):
+        published = float("-inf")
+        try:
+            for done, out in simulation.iter_monte_carlo(*args, **kwargs):
+                if time.perf_counter() - self._seen > self.abandon_after:
+                    self.cancel()
+                if self._cancelled.is_set():
+                    return
+                replicates = done // (out["replicate_paths"] or 1)
+                if (
+                    done == self.n_paths or out["stop_reason"]
+                    or replicates >= 2 and time.perf_counter() - published >= SNAPSHOT_SECONDS
+                ):
+                    self._publish(done, out)
+                    published = time.perf_counter()
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self._finished.set()
+            self._first.set()
+
+    def _publish(self, done, out):
+        snapshot = {
+            "paths": done,
+            **simulation.summarize(out["annual_savings"][:done], out["replicate_paths"]),
+            "half_width": out["half_width"],
+            "stop_reason": out["stop_reason"],
+        }
+        with self._lock:
+            self._snapshot = snapshot
+            self.history.append(snapshot)
+        self._first.set()
+
+    def snapshot(self, timeout=0.0):
+        """Latest snapshot, or ``None`` if none arrives within ``timeout`` seconds."""
+        self._seen = time.perf_counter()
+        self._first.wait(timeout)
+        with self._lock:
+            return self._snapshot
+
+    def series(self) -> dict:
+        """Every snapshot so far as ``{field: list}``, for a convergence chart."""
+        with self._lock:
+            history = list(self.history)
+        return {field: [s[field] for s in history] for field in (history[0] if history else ())}
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
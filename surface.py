@@ -0,0 +1,230 @@
+"""Precomputed response surface for the simulated cost model.
+
+Without labour rules, ``simulation.gap_costs`` is linear in the wage, the
+overtime premium and the SLA penalty: a path costs its surplus
+worker-weeks times the weekly worker cost, its shortfall times that cost
+times ``overtime_multiplier - 1``, and its missed weeks times the penalty.
+Demand and both staffing plans also scale with the required workers, so
+the surplus and shortfall per required worker depend on the headcount only
+through the one-worker floor. A scenario's expected costs therefore come
+from three statistics on a small grid of misallocation x required workers,
+simulated once per granularity and demand profile; every other input is
+applied exactly at lookup.
+
+The grid covers misallocation at every whole percent (the sliders' step,
+so that axis is exact) and required workers on a log scale from
+``WORKERS_RANGE``. Near the floor the costs bend and hinge on rare missed
+buckets, so below three required workers :func:`covers` is false and the
+caller must simulate. Above it, :func:`check` finds lookups within about
+0.05% of the no-forecast cost against a 40k-path simulation with a flat
+profile, and 0.3% with seasonality, trend, AR(1) demand and promotions. A
+surface is a few tens of kB of float32 and a lookup is microseconds,
+against tens of milliseconds or more for a fresh simulation.
+
+    python surface.py --granularity daily -o surface_daily.npz --check
+"""
+import argparse
+import bisect
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+import demand as demand_model
+import simulation
+from engine import MONTHS_PER_YEAR, WEEKS_PER_YEAR
+
+# Both misallocation sliders lie within this range.
+MISALLOCATION_RANGE = (0, 50)
+# Required workers covered, up to units_per_week / units_per_worker_per_week
+# at the sidebar bounds. Closer to the one-worker floor, missed buckets are
+# rare events that a surface's paths can't pin down (errors reach 60% below
+# one worker), so smaller sites need the full simulation.
+WORKERS_RANGE = (3, 500_000 / 100)
+WORKER_POINTS = 25
+# Paths x buckets simulated per grid point, with Sobol sampling (see
+# simulation.standard_normals).
+SURFACE_CELLS = 1024 * WEEKS_PER_YEAR
+# Annual surplus and shortfall in worker-weeks per required worker, and
+# annual missed weeks.
+STATS = ("overstaffing", "overtime", "sla")
+# Random scenarios check() compares, and the paths x buckets simulated for
+# each; every other one has fewer required workers than CHECK_NEAR_FLOOR.
+CHECK_POINTS = 40
+CHECK_CELLS = 40_000 * WEEKS_PER_YEAR
+CHECK_NEAR_FLOOR = 10
+
+
+def build(granularity="weekly", profile=demand_model.FLAT_PROFILE, seed=simulation.SEED) -> dict:
+    """Simulate the grid for one granularity and demand ``profile``.
+
+    Returns ``{"misallocation", "workers", "stats"}``; ``stats`` is
+    ``(len(SCENARIOS), len(STATS), n_misallocation, n_workers)`` float32.
+    """
+    n_buckets = simulation.GRANULARITIES[granularity]
+    n_paths = max(2, SURFACE_CELLS // n_buckets)
+    misallocation = np.arange(MISALLOCATION_RANGE[0], MISALLOCATION_RANGE[1] + 1, dtype=float)
+    workers = np.geomspace(*WORKERS_RANGE, WORKER_POINTS)
+    stats = np.empty((len(simulation.SCENARIOS), len(STATS), misallocation.size, workers.size), dtype=np.float32)
+
+    # The same numbers at every point (common random numbers) keep the
+    # surface smooth between neighbouring points.
+    noise = simulation.standard_normals(np.random.default_rng(seed), "sobol", n_paths, n_buckets)
+    for j, required in enumerate(workers):
+        for i, misalloc in enumerate(misallocation):
+            paths = simulation.simulate_paths(
+                np.random.default_rng(seed), n_paths, required, 1, misalloc, misalloc, n_buckets, profile,
+                noise=noise,
+            )
+            for s, scenario in enumerate(simulation.SCENARIOS):
+                costs = simulation.gap_costs(paths["actual_needed"], paths[f"{scenario}_staff"], 1.0, 2.0, 1.0)
+                stats[s, 0, i, j] = costs["annual_overstaffing"].mean() / required
+                stats[s, 1, i, j] = costs["annual_overtime"].mean() / required
+                stats[s, 2, i, j] = costs["annual_sla"].mean()
+    return {"misallocation": misallocation, "workers": workers, "stats": stats}
+
+
+def covers(units_per_week, units_per_worker_per_week) -> bool:
+    """Whether :func:`lookup` serves these inputs; otherwise simulate them."""
+    return units_per_week / units_per_worker_per_week >= WORKERS_RANGE[0]
+
+
+def _bracket(grid, x, log=False):
+    """Index ``i`` and weight ``w`` with ``x ~ (1 - w) * grid[i] + w * grid[i + 1]``, clamped."""
+    if log:
+        grid, x = grid["log"], math.log(x)
+    else:
+        grid = grid["linear"]
+    i = min(max(bisect.bisect_right(grid, x) - 1, 0), len(grid) - 2)
+    w = min(max((x - grid[i]) / (grid[i + 1] - grid[i]), 0.0), 1.0)
+    return i, w
+
+
+def _axes(surface):
+    # Python lists: bisect on them beats NumPy for a single value.
+    axes = surface.get("_axes")
+    if axes is None:
+        axes = surface["_axes"] = (
+            {"linear": surface["misallocation"].tolist()},
+            {"log": np.log(surface["workers"]).tolist()},
+        )
+    return axes
+
+
+def lookup(
+    surface,
+    units_per_week,
+    units_per_worker_per_week,
+    hourly_rate,
+    hours_per_week,
+    overtime_multiplier,
+    misallocation_pct,
+    sla_penalty_per_miss,
+    scenario,
+) -> dict:
+    """Expected costs of ``scenario``, shaped like ``engine.scenario_costs``, from the surface."""
+    if not covers(units_per_week, units_per_worker_per_week):
+        raise ValueError(f"the surface covers {WORKERS_RANGE[0]} or more required workers")
+    misallocation_axis, workers_axis = _axes(surface)
+    required = units_per_week / units_per_worker_per_week
+    i, wi = _bracket(misallocation_axis, misallocation_pct)
+    j, wj = _bracket(workers_axis, required, log=True)
+    corners = surface["stats"][simulation.SCENARIOS.index(scenario), :, i:i + 2, j:j + 2]
+    over, under, misses = (corners @ (1 - wj, wj)) @ (1 - wi, wi)
+
+    worker_cost = hourly_rate * hours_per_week
+    costs = {
+        "workers_over": float(over) * required / WEEKS_PER_YEAR,
+        "workers_under": float(under) * required / WEEKS_PER_YEAR,
+        "annual_overstaffing": float(over) * required * worker_cost,
+        "annual_overtime": float(under) * required * worker_cost * (overtime_multiplier - 1),
+        "annual_sla": float(misses) * sla_penalty_per_miss,
+    }
+    for component in ("overstaffing", "overtime", "sla"):
+        costs[f"monthly_{component}"] = costs[f"annual_{component}"] / MONTHS_PER_YEAR
+    costs["annual_total"] = costs["annual_overstaffing"] + costs["annual_overtime"] + costs["annual_sla"]
+    return costs
+
+
+def check(
+    surface, granularity="weekly", profile=demand_model.FLAT_PROFILE, n_points=CHECK_POINTS, seed=0,
+) -> dict:
+    """Worst errors of :func:`lookup` against ``simulation.monte_carlo``.
+
+    Inputs are drawn over the covered ranges, half of them close to the
+    floor. Errors are relative to the no-forecast cost, since the
+    with-forecast one can be near zero.
+    """
+    rng = np.random.default_rng(seed)
+    n_paths = max(2, CHECK_CELLS // simulation.GRANULARITIES[granularity])
+    upper = np.where(np.arange(n_points) % 2, WORKERS_RANGE[1], CHECK_NEAR_FLOOR)
+    worst = {"no_fc": 0.0, "with_fc": 0.0, "savings": 0.0, "required_workers": None}
+    for required in np.exp(rng.uniform(math.log(WORKERS_RANGE[0]), np.log(upper))):
+        units_per_worker_per_week = float(rng.integers(100, 5_001))
+        inputs = (
+            required * units_per_worker_per_week, units_per_worker_per_week,
+            rng.uniform(5, 50), float(rng.integers(20, 61)), rng.uniform(1, 3),
+            float(rng.integers(10, 51)), float(rng.integers(0, 21)), float(rng.integers(0, 50_001)),
+        )
+        mc = simulation.monte_carlo(
+            *inputs, n_paths=n_paths, seed=seed, granularity=granularity, profile=profile, sampling="sobol",
+        )
+        scale = mc["no_fc_annual_total"].mean()
+        errors = {}
+        for scenario, misallocation in zip(simulation.SCENARIOS, inputs[5:7]):
+            approx = lookup(surface, *inputs[:5], misallocation, inputs[7], scenario)["annual_total"]
+            errors[scenario] = approx - mc[f"{scenario}_annual_total"].mean()
+        errors["savings"] = errors["no_fc"] - errors["with_fc"]
+        for key, error in errors.items():
+            if abs(error) / scale > worst[key]:
+                worst[key] = abs(error) / scale
+                if key == "savings":
+                    worst["required_workers"] = float(required)
+    return worst
+
+
+def save(surface, path):
+    np.savez_compressed(path, **{key: surface[key] for key in ("misallocation", "workers", "stats")})
+
+
+def load(path) -> dict:
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the simulated cost model's response surface.")
+    parser.add_argument("--granularity", choices=list(simulation.GRANULARITIES), default="weekly")
+    parser.add_argument("--seasonality", choices=list(demand_model.SEASONALITIES), default="flat")
+    parser.add_argument("--trend", type=float, default=0.0, help="annual demand growth, e.g. 0.05")
+    parser.add_argument("--ar1", type=float, default=0.0, help="week-to-week demand autocorrelation")
+    parser.add_argument("--peak-promotions", action="store_true", help="add Black Friday and Christmas spikes")
+    parser.add_argument("-o", "--output", required=True, help=".npz file to write")
+    parser.add_argument("--check", action="store_true", help="compare lookups against fresh simulations")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    profile = {
+        "seasonality": args.seasonality,
+        "trend": args.trend,
+        "ar1": args.ar1,
+        "promotions": demand_model.PEAK_PROMOTIONS if args.peak_promotions else (),
+    }
+    surface = build(args.granularity, profile)
+    save(surface, args.output)
+    report = {
+        "output": args.output,
+        "grid": list(surface["stats"].shape),
+        "bytes": surface["stats"].nbytes,
+        "seconds": time.perf_counter() - start,
+    }
+    if args.check:
+        report["check"] = check(surface, args.granularity, profile)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Workspace of N named scenarios, recomputed incrementally.
+
+A scenario is a plain dict with a ``name`` and the ``SCENARIO_FIELDS``;
+the site volume (``units_per_week``, ``units_per_worker_per_week``) is
+shared by all of them. The dependency graph is small and fixed:
+
+    site inputs + scenario params  ->  scenario costs  ->  comparison figure
+
+Each scenario's costs are kept with the inputs they were computed from.
+``update`` recomputes only the scenarios whose inputs changed, in one
+vectorized engine call, and the figure is rebuilt only when a cost it
+plots changed. One workspace lives in each browser session.
+"""
+from collections import Counter
+
+import numpy as np
+
+import charts
+import engine
+
+SCENARIO_FIELDS = (
+    "misallocation",
+    "hourly_rate",
+    "hours_per_week",
+    "overtime_multiplier",
+    "sla_penalty_per_miss",
+)
+PLOTTED_FIELDS = ("annual_overstaffing", "annual_overtime", "annual_sla")
+
+
+def scenario_key(site, scenario) -> tuple:
+    return tuple(float(site[f]) for f in ("units_per_week", "units_per_worker_per_week")) + tuple(
+        float(scenario[f]) for f in SCENARIO_FIELDS
+    )
+
+
+class DuplicateNames(ValueError):
+    """Scenarios are keyed by name, so two rows may not share one."""
+
+    def __init__(self, names):
+        super().__init__(f"Duplicate scenario names: {', '.join(names)}")
+        self.names = names
+
+
+class Workspace:
+    def __init__(self):
+        self.costs = {}
+        self.recomputed = ()
+        self._keys = {}
+        self._figure = None
+        self._figure_key = None
+
+    def update(self, site, scenarios) -> dict:
+        """Bring every scenario's costs up to date; returns ``{name: costs}``.
+
+        Rows without a name or with a missing value are skipped; a name
+        used twice raises :class:`DuplicateNames` and changes nothing.
+        Names of the scenarios that were actually recomputed are in
+        ``recomputed``.
+        """
+        valid = [
+            s for s in scenarios
+            if s.get("name") and all(s.get(f) is not None and np.isfinite(s[f]) for f in SCENARIO_FIELDS)
+        ]
+        names = [s["name"] for s in valid]
+        duplicates = [name for name, count in Counter(names).items() if count > 1]
+        if duplicates:
+            raise DuplicateNames(duplicates)
+        keys = {s["name"]: scenario_key(site, s) for s in valid}
+        stale = [name for name in names if self._keys.get(name) != keys[name]]
+
+        if stale:
+            rows = np.array([keys[name] for name in stale])
+            (
+                units_per_week, units_per_worker_per_week, misallocation,
+                hourly_rate, hours_per_week, overtime_multiplier, sla_penalty_per_miss,
+            ) = rows.T
+            costs = engine.scenario_costs(
+                units_per_week, units_per_worker_per_week, hourly_rate, hours_per_week,
+                overtime_multiplier, misallocation, sla_penalty_per_miss,
+            )
+            for i, name in enumerate(stale):
+                self.costs[name] = {field: float(values[i]) for field, values in costs.items()}
+                self._keys[name] = keys[name]
+
+        for name in set(self.costs) - set(names):
+            del self.costs[name], self._keys[name]
+        self.recomputed = tuple(stale)
+        return {name: self.costs[name] for name in names}
+
+    def figure(self, names):
+        """Stacked annual cost per scenario, rebuilt only when its data changed."""
+        key = tuple((name, *(self.costs[name][f] for f in PLOTTED_FIELDS)) for name in names)
+        if key != self._figure_key:
+            self._figure = charts.scenarios_figure(
+                list(names), *(np.array([self.costs[name][f] for name in names]) for f in PLOTTED_FIELDS)
+            )
+            self._figure_key = key
+        return self._figure